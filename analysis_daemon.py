@@ -0,0 +1,172 @@
+"""
+상주 분석 서비스
+
+cron으로 매번 새 프로세스를 띄우는 대신 한 프로세스가 계속 실행되면서
+라이브러리 import, 거래소 객체(연결/마켓 정보), 캔들 저장소, 증분 지표 엔진 상태를 유지합니다.
+캔들 마감 시각(타임프레임 경계 + 지연 시간)에 맞춰 분석을 실행하므로
+한 번의 실행 비용은 새 캔들 수신(since 이후만)과 새 봉의 증분 지표 계산 정도입니다.
+
+사용법:
+    python analysis_daemon.py                             # 매 시 정각 + 15초, 리포트 생성
+    python analysis_daemon.py --actions report email      # 리포트 생성 + 변화 시 이메일
+    python analysis_daemon.py --interval 1d --delay 60    # 일봉 마감(UTC 00:00) 직후
+    python analysis_daemon.py --once                      # 한 번만 실행 (동작 확인용)
+"""
+
+import argparse
+import signal
+import threading
+import time
+import traceback
+
+import pandas as pd
+
+from bitcoin_analysis import (
+    OHLCV_COLUMNS, analyze_and_send, calculate_indicators_cached, get_bitcoin_data, get_kst_now,
+)
+from indicator_engine import IncrementalIndicatorEngine
+from pipeline_metrics import measure, pipeline_run, set_label
+
+# 타임프레임 -> 초
+TIMEFRAME_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+# 기본 실행 주기 (기존 cron과 같은 매 시 정각)
+DEFAULT_INTERVAL = "1h"
+
+# 캔들 마감 후 대기 시간 (거래소가 마감 봉을 반영할 시간, 초)
+DEFAULT_DELAY_SECONDS = 15
+
+# 실행할 작업 (report: index.html/analysis.json 생성, email: 변화 시 이메일 전송)
+ACTIONS = ('report', 'email')
+
+
+# '1h', '4h', '1d' -> 초
+def parse_interval(interval):
+    unit = interval[-1]
+    if unit not in TIMEFRAME_SECONDS or not interval[:-1].isdigit():
+        raise ValueError(f"지원하지 않는 주기입니다: {interval} (예: 15m, 1h, 4h, 1d)")
+    return int(interval[:-1]) * TIMEFRAME_SECONDS[unit]
+
+
+# 다음 실행 시각 (UTC epoch 기준 주기 경계 + 지연 시간, 이미 지났으면 다음 경계)
+def next_run_time(now, interval_seconds, delay_seconds=DEFAULT_DELAY_SECONDS):
+    boundary = (now // interval_seconds) * interval_seconds + delay_seconds
+    if boundary <= now:
+        boundary += interval_seconds
+    return boundary
+
+
+# 증분 지표 프레임 (이전 실행의 지표 프레임 + 엔진 상태 유지)
+class IncrementalIndicatorFrame:
+    """
+    새로 받은 OHLCV에서 마지막으로 반영한 봉 이후(마지막 봉 포함)만 증분 엔진으로 계산해
+    기존 지표 프레임에 덧붙입니다. 이전 봉이 바뀌었으면(다른 거래소 데이터 등) 전체를 다시 계산합니다.
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.engine = None
+
+    # 전체 다시 계산 (지표 캐시 사용) 후 엔진 상태 준비
+    def rebuild(self, raw):
+        self.frame = calculate_indicators_cached(raw)
+        self.engine = IncrementalIndicatorEngine.from_frame(raw[OHLCV_COLUMNS])
+        return self.frame
+
+    def update(self, raw):
+        if self.frame is None or raw.empty:
+            return self.rebuild(raw)
+
+        last_timestamp = self.engine.last_timestamp
+        known = raw.index[raw.index < last_timestamp]
+        if (last_timestamp not in raw.index or not known.isin(self.frame.index).all()
+                or not raw.loc[known, OHLCV_COLUMNS].equals(self.frame.loc[known, OHLCV_COLUMNS])):
+            return self.rebuild(raw)
+
+        rows = {}
+        for row in raw[raw.index >= last_timestamp].itertuples():
+            values = self.engine.update(row.Index, row.open, row.high, row.low, row.close, row.volume)
+            rows[row.Index] = {'open': row.open, 'high': row.high, 'low': row.low,
+                               'close': row.close, 'volume': row.volume, **values}
+
+        update = pd.DataFrame.from_dict(rows, orient='index')[self.frame.columns]
+        frame = pd.concat([self.frame[self.frame.index < last_timestamp], update])
+        # 받아온 데이터와 같은 기간만 유지 (가장 오래된 봉 제거)
+        self.frame = frame[frame.index >= raw.index[0]]
+        return self.frame
+
+
+# 상주 분석 서비스
+class AnalysisDaemon:
+    def __init__(self, interval=DEFAULT_INTERVAL, delay_seconds=DEFAULT_DELAY_SECONDS, actions=('report',)):
+        self.interval_seconds = parse_interval(interval)
+        self.delay_seconds = delay_seconds
+        self.actions = tuple(actions)
+        self.indicators = IncrementalIndicatorFrame()
+        self._stop = threading.Event()
+
+    def log(self, message):
+        print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] [daemon] {message}")
+
+    # 한 번 실행 (데이터 수신 -> 증분 지표 -> 작업, 단계별 실행 지표 기록)
+    @pipeline_run("daemon")
+    def run_once(self):
+        start = time.perf_counter()
+        with measure("fetch"):
+            raw = get_bitcoin_data()
+        if raw is None or raw.empty:
+            self.log("데이터를 가져올 수 없어 이번 실행을 건너뜁니다.")
+            return False
+        fetched = time.perf_counter()
+
+        with measure("indicators"):
+            df = self.indicators.update(raw[OHLCV_COLUMNS])
+        computed = time.perf_counter()
+        set_label(bars=len(df))
+
+        if 'report' in self.actions:
+            from generate_for_github import generate_index_html
+            generate_index_html(df=df)
+        if 'email' in self.actions:
+            analyze_and_send(df=df)
+
+        self.log(f"완료: 수신 {(fetched - start) * 1000:.0f}ms, 지표 {(computed - fetched) * 1000:.0f}ms, "
+                 f"전체 {(time.perf_counter() - start) * 1000:.0f}ms")
+        return True
+
+    def stop(self, *args):
+        self._stop.set()
+
+    # 캔들 마감 시각마다 실행 (종료 신호까지 반복)
+    def run_forever(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.log(f"시작: 주기 {self.interval_seconds}초, 마감 후 {self.delay_seconds}초, 작업 {', '.join(self.actions)}")
+
+        while not self._stop.is_set():
+            run_at = next_run_time(time.time(), self.interval_seconds, self.delay_seconds)
+            self.log(f"다음 실행: {pd.Timestamp(run_at, unit='s', tz='UTC').tz_convert('Asia/Seoul'):%Y-%m-%d %H:%M:%S} KST")
+            if self._stop.wait(max(0.0, run_at - time.time())):
+                break
+            try:
+                self.run_once()
+            except (Exception, SystemExit):
+                # 한 번의 실패(generate_index_html의 sys.exit 포함)로 서비스가 멈추지 않도록 기록만 남김
+                traceback.print_exc()
+
+        self.log("종료")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="비트코인 분석 상주 서비스")
+    parser.add_argument("--interval", default=DEFAULT_INTERVAL, help="실행 주기 (캔들 타임프레임, 예: 1h, 4h, 1d)")
+    parser.add_argument("--delay", type=float, default=DEFAULT_DELAY_SECONDS, help="캔들 마감 후 대기 시간 (초)")
+    parser.add_argument("--actions", nargs="+", choices=ACTIONS, default=['report'], help="실행할 작업")
+    parser.add_argument("--once", action="store_true", help="한 번만 실행하고 종료")
+    args = parser.parse_args()
+
+    daemon = AnalysisDaemon(args.interval, args.delay, args.actions)
+    if args.once:
+        daemon.run_once()
+    else:
+        daemon.run_forever()
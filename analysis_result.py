@@ -0,0 +1,214 @@
+"""
+분석 결과 객체
+
+analyze_market_position의 결과를 숫자 원본 그대로 담는 __slots__ 객체입니다.
+지표 값과 목표가는 (원본 값 dict, 표시 형식) 쌍으로 보관하고
+문자열 포맷은 HTML/콘솔 출력 시점(format_display_value)에만 수행합니다.
+to_json / to_msgpack으로 직렬화하면 다른 봇이 index.html을 파싱하지 않고 결과를 읽을 수 있습니다.
+
+기존 코드와의 호환을 위해 8-튜플처럼 언패킹, 인덱스/슬라이스 접근, len()을 사용할 수 있습니다:
+    final_position, indicators, recommendation, score, action, targets, cycle_info, peak_info = result
+    score = result[3]
+"""
+
+import hashlib
+import json
+import math
+from datetime import date, datetime
+
+import numpy as np
+
+# msgpack 출력 (선택 사항)
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # msgpack이 없으면 JSON만 사용
+
+# 결과 파일 이름 (확장자 제외)
+RESULT_BASENAME = "analysis"
+
+# 결과 형식 버전 (필드 구조가 바뀌면 올림)
+RESULT_VERSION = 1
+
+# 내용 해시에 사용할 목표가 유효 숫자 자릿수 (실시간 가격/거래소에 따른 작은 차이 무시)
+HASH_SIGNIFICANT_DIGITS = 3
+
+
+# 지연 포맷 값 -> 표시 문자열 ((값 dict, 형식) 쌍이면 포맷, 문자열은 그대로)
+def format_display_value(entry):
+    if isinstance(entry, tuple):
+        values, template = entry
+        return template.format(**values)
+    return entry
+
+
+# 지연 포맷 값 -> 원본 값 (문자열은 그대로)
+def raw_value(entry):
+    if isinstance(entry, tuple):
+        return entry[0]
+    return entry
+
+
+# 숫자를 유효 숫자 digits자리로 반올림 (숫자가 아니면 그대로, dict는 값마다 적용)
+def round_significant(value, digits=HASH_SIGNIFICANT_DIGITS):
+    if isinstance(value, dict):
+        return {key: round_significant(item, digits) for key, item in value.items()}
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool) and math.isfinite(value):
+        return float(f"{float(value):.{digits}g}")
+    return value
+
+
+# 직렬화 가능한 기본 타입으로 변환 (NumPy 스칼라, 날짜, NaN 처리)
+def to_plain(value):
+    if isinstance(value, dict):
+        return {str(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class AnalysisResult:
+    """시장 위치 분석 결과 (원본 숫자, 점수, 판단, 목표가)"""
+
+    __slots__ = (
+        'generated_at', 'candle_time', 'price',
+        'position_category', 'final_position', 'recommendation', 'action',
+        'base_score', 'total_score',
+        'indicators', 'targets', 'cycle_info', 'peak_info',
+    )
+
+    def __init__(self, generated_at, candle_time, price, position_category, final_position,
+                 recommendation, action, base_score, total_score, indicators, targets,
+                 cycle_info=None, peak_info=None):
+        self.generated_at = generated_at
+        self.candle_time = candle_time
+        self.price = price
+        self.position_category = position_category
+        self.final_position = final_position
+        self.recommendation = recommendation
+        self.action = action
+        self.base_score = base_score
+        self.total_score = total_score
+        self.indicators = indicators
+        self.targets = targets
+        self.cycle_info = cycle_info
+        self.peak_info = peak_info
+
+    # 기존 8-튜플 (언패킹, 인덱스, 길이 모두 이 순서 기준)
+    def as_tuple(self):
+        return (self.final_position, self.indicators, self.recommendation, self.total_score,
+                self.action, self.targets, self.cycle_info, self.peak_info)
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __getitem__(self, index):
+        return self.as_tuple()[index]
+
+    def __len__(self):
+        return 8
+
+    def __repr__(self):
+        return (f"AnalysisResult({self.position_category}, score={self.total_score:.2f}, "
+                f"price={self.price:.2f}, candle_time={self.candle_time})")
+
+    # 원본 값만 담은 dict (표시 문자열 제외)
+    def to_dict(self):
+        indicators = {}
+        for name, data in self.indicators.items():
+            entry = {'values': raw_value(data.get('value')), 'signal': data.get('signal'), 'score': data.get('score')}
+            if 'details' in data:
+                entry['details'] = raw_value(data['details'])
+            indicators[name] = entry
+
+        peak_info = None
+        if self.peak_info:
+            peak_info = {key: value for key, value in self.peak_info.items() if key != 'details'}
+
+        return to_plain({
+            'version': RESULT_VERSION,
+            'generated_at': self.generated_at,
+            'candle_time': self.candle_time,
+            'price': self.price,
+            'position_category': self.position_category,
+            'final_position': self.final_position,
+            'recommendation': self.recommendation,
+            'action': self.action,
+            'base_score': self.base_score,
+            'total_score': self.total_score,
+            'indicators': indicators,
+            'targets': {key: raw_value(value) for key, value in self.targets.items()},
+            'cycle': self.cycle_info,
+            'peak': peak_info,
+        })
+
+    # 해시 대상 (판단, 점수, 신호, 반올림한 목표가 - 실시간 가격과 지표 원본 값 제외)
+    def stable_payload(self):
+        cycle = None
+        if self.cycle_info:
+            cycle = {key: self.cycle_info.get(key) for key in ('cycle_phase', 'phase_score', 'last_halving')}
+        peak = None
+        if self.peak_info:
+            peak = {key: self.peak_info.get(key) for key in ('peak_score', 'peak_status', 'sell_recommendation')}
+
+        return to_plain({
+            'version': RESULT_VERSION,
+            'candle_time': self.candle_time,
+            'position_category': self.position_category,
+            'final_position': self.final_position,
+            'recommendation': self.recommendation,
+            'action': self.action,
+            'base_score': round(float(self.base_score), 2),
+            'total_score': round(float(self.total_score), 2),
+            'indicators': {name: [data.get('signal'), data.get('score')] for name, data in self.indicators.items()},
+            'targets': {key: round_significant(raw_value(value)) for key, value in self.targets.items()},
+            'cycle': cycle,
+            'peak': peak,
+        })
+
+    # 분석 내용 해시 (같은 일봉에서 판단/점수/신호/목표가 수준이 같으면 같은 값)
+    def content_hash(self):
+        """
+        진행 중인 일봉의 실시간 가격과 지표 원본 값, 응답한 거래소(USD/USDT)에 따라 매번 달라지지 않도록
+        stable_payload()만 해시합니다. 따라서 가격만 조금 움직인 실행은 변경 없음으로 판단되어
+        게시된 리포트의 가격/지표 값이 다음 변경 때까지 갱신되지 않습니다.
+        """
+        text = json.dumps(self.stable_payload(), ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def to_json(self, indent=None):
+        separators = None if indent else (',', ':')
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent, separators=separators)
+
+    def to_msgpack(self):
+        if msgpack is None:
+            raise RuntimeError("msgpack 출력에는 msgpack 패키지가 필요합니다 (pip install msgpack)")
+        return msgpack.packb(self.to_dict(), use_bin_type=True)
+
+    # JSON (+ msgpack 설치 시 msgpack) 파일 저장, 저장한 경로 목록 반환
+    def write(self, basename=RESULT_BASENAME):
+        paths = [f"{basename}.json"]
+        with open(paths[0], 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+        if msgpack is not None:
+            paths.append(f"{basename}.msgpack")
+            with open(paths[1], 'wb') as f:
+                f.write(self.to_msgpack())
+        return paths
+
+
+# 저장된 결과 파일 읽기 (.json / .msgpack -> dict)
+def read_result(path):
+    if path.endswith(".msgpack"):
+        if msgpack is None:
+            raise RuntimeError("msgpack 입력에는 msgpack 패키지가 필요합니다 (pip install msgpack)")
+        with open(path, 'rb') as f:
+            return msgpack.unpackb(f.read(), raw=False)
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
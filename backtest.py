@@ -0,0 +1,363 @@
+"""
+포지션 판단 백테스트
+
+analyze_market_position_history의 봉별 position_category로 진입/청산하고
+calculate_price_targets의 분할 목표가, 손절가, 예상 고점 기반 분할 매도 규칙으로
+매매를 시뮬레이션합니다. 시간 축은 봉 단위로 진행하고
+파라미터 조합(수천 개)은 NumPy 배열의 한 축으로 동시에 계산합니다.
+
+매매 규칙 (long 전용, 종가 기준 진입):
+  - 진입: 포지션이 없고 카테고리 순위가 entry_rank 이상이면 종가에 전액 매수
+  - 목표가: 진입 카테고리의 목표가(STRONG_BUY/BUY: +15/30/50/100%,
+    WEAK_BUY/NEUTRAL_BUY: +10/20/35%)에 target_scale을 곱한 가격에 같은 비율로 분할 매도
+  - 손절: max(볼린저 하단, 진입가 x (1 - 손절폭 x stop_scale), 200일선 x 계수)
+  - 분할 매도: 카테고리 순위가 exit_rank 이하로 내려가면 남은 물량을
+    예상 고점 기준 매도 단계(SELL 이하: 30/30/30/10%, 그 외: 20/30/30/20%)로 전환
+  - 보유 기간 제한: max_hold 봉이 지나면 남은 물량 종가 매도 (0이면 제한 없음)
+
+사용법:
+    python backtest.py                    # 최근 4년 실제 데이터로 기본 파라미터 그리드 실행
+    python backtest.py --years 8          # 최근 8년 (캔들 저장소에 과거 기록을 채워 사용)
+    python backtest.py --synthetic 3000   # 합성 데이터로 실행
+"""
+
+import argparse
+import itertools
+import math
+import time
+import numpy as np
+import pandas as pd
+
+from bitcoin_analysis import analyze_market_position_history, predict_peak_price_history
+from rolling_stats import RollingStatsCache
+
+# 200일 이동평균이 채워지기 전 구간 (판단 기록이 불완전, 검증 기간에서 제외)
+WARMUP_BARS = 200
+
+# 연간 일봉 수 (암호화폐는 매일 거래)
+BARS_PER_YEAR = 365
+
+# 카테고리 순위 (높을수록 매수)
+CATEGORY_RANK = {
+    "STRONG_SELL": -4,
+    "SELL": -3,
+    "WEAK_SELL": -2,
+    "NEUTRAL_SELL": -1,
+    "NEUTRAL": 0,
+    "NEUTRAL_BUY": 1,
+    "WEAK_BUY": 2,
+    "BUY": 3,
+    "STRONG_BUY": 4,
+}
+
+# 매수 카테고리별 목표가 상승률, 손절폭, 200일선 손절 계수 (calculate_price_targets와 동일)
+BUY_TARGETS = {
+    'strong': ([0.15, 0.30, 0.50, 1.00], 0.12, 0.95),  # STRONG_BUY, BUY
+    'weak': ([0.10, 0.20, 0.35], 0.10, 0.97),          # WEAK_BUY, NEUTRAL_BUY
+}
+
+# 매도 카테고리별 예상 고점 대비 매도 가격과 비율 (calculate_price_targets와 동일)
+# 가격이 None이면 현재가 즉시 매도
+SELL_STAGES = {
+    'strong': [(None, 0.30), (0.85, 0.30), (0.95, 0.30), (1.00, 0.10)],  # STRONG_SELL, SELL
+    'weak': [(0.90, 0.20), (0.95, 0.30), (1.00, 0.30), (1.03, 0.20)],    # WEAK_SELL, NEUTRAL_SELL
+}
+
+# 파라미터 기본값
+DEFAULT_PARAMS = {
+    'entry_rank': 3,      # 진입 최소 순위 (3 = BUY 이상)
+    'exit_rank': -3,      # 분할 매도 전환 순위 (-3 = SELL 이하)
+    'target_scale': 1.0,  # 목표가 상승률 배수
+    'stop_scale': 1.0,    # 손절폭 배수
+    'indicator_stop': 1,  # 볼린저 하단/200일선 손절 사용 여부
+    'max_hold': 0,        # 최대 보유 봉 수 (0 = 제한 없음)
+}
+
+# 기본 파라미터 그리드 (3 x 3 x 6 x 6 x 2 x 4 = 2,592개 조합)
+DEFAULT_GRID = {
+    'entry_rank': [1, 2, 3],
+    'exit_rank': [-1, -2, -3],
+    'target_scale': [0.5, 0.75, 1.0, 1.25, 1.5, 2.0],
+    'stop_scale': [0.5, 0.75, 1.0, 1.25, 1.5, 2.0],
+    'indicator_stop': [0, 1],
+    'max_hold': [0, 30, 90, 180],
+}
+
+
+# 파라미터 그리드 생성 (모든 조합)
+def make_param_grid(**grid):
+    """키별 후보값 목록의 모든 조합을 DataFrame으로 반환 (지정하지 않은 키는 기본값)"""
+    grid = {key: grid.get(key, [value]) for key, value in DEFAULT_PARAMS.items()}
+    rows = list(itertools.product(*grid.values()))
+    return pd.DataFrame(rows, columns=list(grid.keys()))
+
+
+# 시뮬레이션에 필요한 봉별 가격 배열
+def prepare_market(df, stats=None):
+    stats = RollingStatsCache.for_frame(df, stats)
+    return {
+        'open': df['open'].to_numpy(dtype=float),
+        'high': df['high'].to_numpy(dtype=float),
+        'low': df['low'].to_numpy(dtype=float),
+        'close': df['close'].to_numpy(dtype=float),
+        'bb_lower': df['bb_lower'].to_numpy(dtype=float),
+        'ma200': df['ma200'].to_numpy(dtype=float),
+        'predicted_peak': predict_peak_price_history(df, stats),
+    }
+
+
+# 포지션 카테고리 -> 순위 배열
+def category_ranks(position_category):
+    return pd.Series(position_category).map(CATEGORY_RANK).to_numpy(dtype=np.int64)
+
+
+# 지표 준비 구간을 뺀 검증 가능 봉 수가 기간(봉 수)보다 짧으면 중단
+def require_history(df, required_bars, label="백테스트"):
+    usable = len(df) - WARMUP_BARS
+    if usable < required_bars:
+        raise SystemExit(f"[오류] {label}에 필요한 데이터 부족: 준비 구간 {WARMUP_BARS}봉 제외 {max(usable, 0):,}봉 "
+                         f"(필요 {required_bars:,}봉, 전체 {len(df):,}봉)")
+    return usable
+
+
+# 백테스트 실행
+def run_backtest(df, params=None, history=None, fee=0.001, cycle="bar"):
+    """
+    df: 지표가 계산된 OHLCV DataFrame
+    params: make_param_grid 결과 (None이면 기본 파라미터 1개)
+    history: analyze_market_position_history 결과 (None이면 새로 계산)
+    fee: 매매 1회당 수수료율
+    cycle: history를 새로 계산할 때 4년 주기 점수 기준 ("bar": 봉 날짜별, "now": 현재 시점)
+
+    파라미터 조합별 수익률, 최대 낙폭, 거래 수, 승률, 목표가/손절 도달률을 DataFrame으로 반환
+    """
+    if params is None:
+        params = make_param_grid()
+    stats = RollingStatsCache(df)
+    if history is None:
+        history = analyze_market_position_history(df, stats, cycle)
+
+    return simulate(prepare_market(df, stats), category_ranks(history['position_category']), params, fee)
+
+
+# 매매 시뮬레이션 (파라미터 조합 축 벡터화)
+def simulate(market, rank, params, fee=0.001):
+    """
+    market: prepare_market 결과
+    rank: 봉별 카테고리 순위 (n_bars,) 또는 조합마다 다른 순위 (n_variants, n_bars)
+    """
+    open_ = market['open']
+    high = market['high']
+    low = market['low']
+    close = market['close']
+    bb_lower = market['bb_lower']
+    ma200 = market['ma200']
+    predicted_peak = market['predicted_peak']
+    rank = np.atleast_2d(rank)
+    n_bars = len(close)
+
+    entry_rank = params['entry_rank'].to_numpy(dtype=np.int64)
+    exit_rank = params['exit_rank'].to_numpy(dtype=np.int64)
+    target_scale = params['target_scale'].to_numpy(dtype=float)
+    stop_scale = params['stop_scale'].to_numpy(dtype=float)
+    indicator_stop = params['indicator_stop'].to_numpy(dtype=bool)
+    max_hold = params['max_hold'].to_numpy(dtype=np.int64)
+    n_variants = len(params)
+    n_orders = max(len(BUY_TARGETS['strong'][0]), len(SELL_STAGES['strong']))
+
+    # 매수 카테고리별 목표가 테이블 (n_orders칸, 없는 칸은 비율 0)
+    def order_table(levels, sizes):
+        table_levels = np.full(n_orders, np.inf)
+        table_sizes = np.zeros(n_orders)
+        table_levels[:len(levels)] = levels
+        table_sizes[:len(sizes)] = sizes
+        return table_levels, table_sizes
+
+    buy_tables = {}
+    for tier, (gains, stop_pct, ma_factor) in BUY_TARGETS.items():
+        buy_tables[tier] = order_table(gains, [1 / len(gains)] * len(gains)) + (stop_pct, ma_factor)
+    sell_tables = {}
+    for tier, stages in SELL_STAGES.items():
+        ratios = [np.nan if ratio is None else ratio for ratio, _ in stages]
+        sell_tables[tier] = order_table(ratios, [size for _, size in stages])
+
+    # 파라미터 조합별 상태
+    cash = np.ones(n_variants)
+    units = np.zeros(n_variants)
+    entry_units = np.zeros(n_variants)
+    entry_cost = np.zeros(n_variants)
+    proceeds = np.zeros(n_variants)
+    stop = np.full(n_variants, -np.inf)
+    entry_bar = np.zeros(n_variants, dtype=np.int64)
+    exiting = np.zeros(n_variants, dtype=bool)
+    order_level = np.full((n_variants, n_orders), np.inf)
+    order_units = np.zeros((n_variants, n_orders))
+
+    # 결과 집계
+    equity_peak = np.ones(n_variants)
+    max_drawdown = np.zeros(n_variants)
+    trades = np.zeros(n_variants, dtype=np.int64)
+    wins = np.zeros(n_variants, dtype=np.int64)
+    targets_offered = np.zeros(n_variants, dtype=np.int64)
+    targets_hit = np.zeros(n_variants, dtype=np.int64)
+    stops_hit = np.zeros(n_variants, dtype=np.int64)
+    bars_held = np.zeros(n_variants, dtype=np.int64)
+
+    def sell(mask, sold_units, fill_price):
+        value = sold_units[mask] * fill_price[mask] * (1 - fee)
+        cash[mask] += value
+        proceeds[mask] += value
+        units[mask] -= sold_units[mask]
+
+    def close_finished(bar_mask):
+        # 남은 물량이 없으면 거래 종료
+        finished = bar_mask & (units <= entry_units * 1e-9)
+        if finished.any():
+            units[finished] = 0.0
+            trades[finished] += 1
+            wins[finished] += proceeds[finished] > entry_cost[finished]
+            order_units[finished] = 0.0
+            order_level[finished] = np.inf
+            exiting[finished] = False
+        return finished
+
+    for t in range(n_bars):
+        rank_t = np.broadcast_to(rank[:, t], (n_variants,))
+        holding = units > 0
+        flat_at_open = ~holding
+
+        if holding.any():
+            # 1. 손절 (갭 하락이면 시가 체결, 목표가보다 먼저 확인)
+            stopped = holding & (low[t] <= stop)
+            if stopped.any():
+                fill = np.minimum(open_[t], stop)
+                sell(stopped, units.copy(), fill)
+                stops_hit[stopped] += 1
+                close_finished(stopped)
+
+            # 2. 분할 목표가/매도 단계 (갭 상승이면 시가 체결)
+            holding = units > 0
+            hit = holding[:, None] & (order_units > 0) & (high[t] >= order_level)
+            if hit.any():
+                fill = np.where(hit, np.maximum(open_[t], order_level), 0.0)
+                sold = np.where(hit, np.minimum(order_units, units[:, None]), 0.0)
+                value = (sold * fill * (1 - fee)).sum(axis=1)
+                cash += value
+                proceeds += value
+                units -= sold.sum(axis=1)
+                targets_hit += (hit & ~exiting[:, None]).sum(axis=1)
+                order_units[hit] = 0.0
+                close_finished(holding)
+
+            # 3. 매도 신호 -> 예상 고점 기준 매도 단계로 전환
+            holding = units > 0
+            start_exit = holding & ~exiting & (rank_t <= exit_rank)
+            if start_exit.any():
+                strong = (rank_t <= CATEGORY_RANK["SELL"])[:, None]
+                ratios = np.where(strong, sell_tables['strong'][0], sell_tables['weak'][0])
+                sizes = np.where(strong, sell_tables['strong'][1], sell_tables['weak'][1])
+                levels = np.where(np.isnan(ratios), close[t], predicted_peak[t] * ratios)
+                order_level[start_exit] = levels[start_exit]
+                order_units[start_exit] = units[start_exit, None] * sizes[start_exit]
+                exiting[start_exit] = True
+
+                # 현재가 이하 단계는 종가에 즉시 매도
+                immediate = start_exit[:, None] & (order_units > 0) & (order_level <= close[t])
+                sold = np.where(immediate, order_units, 0.0)
+                value = (sold * close[t] * (1 - fee)).sum(axis=1)
+                cash += value
+                proceeds += value
+                units -= sold.sum(axis=1)
+                order_units[immediate] = 0.0
+                close_finished(start_exit)
+
+            # 4. 보유 기간 제한
+            holding = units > 0
+            expired = holding & (max_hold > 0) & (t - entry_bar >= max_hold)
+            if expired.any():
+                sell(expired, units.copy(), np.full(n_variants, close[t]))
+                close_finished(expired)
+
+        # 5. 신규 진입 (이번 봉 시작 시 포지션이 없던 경우만)
+        enter = flat_at_open & (rank_t >= entry_rank) & (rank_t > 0)
+        if enter.any():
+            strong = rank_t >= CATEGORY_RANK["BUY"]
+            gains = np.where(strong[:, None], buy_tables['strong'][0], buy_tables['weak'][0])
+            sizes = np.where(strong[:, None], buy_tables['strong'][1], buy_tables['weak'][1])
+            stop_pct = np.where(strong, buy_tables['strong'][2], buy_tables['weak'][2])
+            ma_factor = np.where(strong, buy_tables['strong'][3], buy_tables['weak'][3])
+            price = close[t]
+            bought = cash * (1 - fee) / price
+            entry_units[enter] = bought[enter]
+            units[enter] = bought[enter]
+            entry_cost[enter] = cash[enter]
+            proceeds[enter] = 0.0
+            cash[enter] = 0.0
+            entry_bar[enter] = t
+            exiting[enter] = False
+            order_level[enter] = price * (1 + gains[enter] * target_scale[enter, None])
+            order_units[enter] = bought[enter, None] * sizes[enter]
+            targets_offered[enter] += np.count_nonzero(sizes[enter], axis=1)
+
+            price_stop = price * (1 - stop_pct * stop_scale)
+            chart_stop = np.fmax(bb_lower[t], ma200[t] * ma_factor)
+            stop[enter] = np.where(indicator_stop, np.fmax(price_stop, chart_stop), price_stop)[enter]
+
+        # 평가금액과 최대 낙폭
+        equity = cash + units * close[t]
+        equity_peak = np.maximum(equity_peak, equity)
+        max_drawdown = np.maximum(max_drawdown, 1 - equity / equity_peak)
+        bars_held += units > 0
+
+    final_equity = cash + units * close[-1] if n_bars else cash
+
+    result = params.reset_index(drop=True).copy()
+    result['total_return'] = final_equity - 1
+    result['buy_and_hold'] = close[-1] / close[0] - 1 if n_bars else 0.0
+    result['max_drawdown'] = max_drawdown
+    result['trades'] = trades
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['win_rate'] = np.where(trades > 0, wins / trades, np.nan)
+        result['target_hit_rate'] = np.where(targets_offered > 0, targets_hit / targets_offered, np.nan)
+        result['stop_rate'] = np.where(trades > 0, stops_hit / trades, np.nan)
+    result['exposure'] = bars_held / max(n_bars, 1)
+    result['open_position'] = units > 0
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="포지션 판단 백테스트")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="실제 데이터 대신 사용할 합성 데이터 봉 개수")
+    parser.add_argument("--years", type=float, default=4, help="검증할 기간 (년, 준비 구간 제외)")
+    parser.add_argument("--fee", type=float, default=0.001, help="매매 1회당 수수료율")
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 조합 수")
+    parser.add_argument("--cycle", choices=["bar", "now"], default="bar",
+                        help="4년 주기 점수 기준 (bar: 봉 날짜별, now: 현재 시점)")
+    args = parser.parse_args()
+
+    from bitcoin_analysis import calculate_indicators, get_bitcoin_history
+
+    required_bars = math.ceil(args.years * BARS_PER_YEAR)
+    if args.synthetic:
+        from benchmark import make_synthetic_ohlcv
+        raw = make_synthetic_ohlcv(args.synthetic)
+    else:
+        raw = get_bitcoin_history(WARMUP_BARS + required_bars)
+        if raw is None:
+            raise SystemExit(1)
+
+    df = calculate_indicators(raw)
+    usable = require_history(df, required_bars)
+    params = make_param_grid(**DEFAULT_GRID)
+
+    start = time.perf_counter()
+    result = run_backtest(df, params, fee=args.fee, cycle=args.cycle)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(df):,}개 봉 x {len(params):,}개 조합: {elapsed:.2f}초")
+    print(f"검증 기간: {str(df.index[WARMUP_BARS])[:10]} ~ {str(df.index[-1])[:10]} "
+          f"({usable:,}봉, {usable / BARS_PER_YEAR:.1f}년)")
+    print(f"단순 보유 수익률: {result['buy_and_hold'].iloc[0] * 100:+.1f}%")
+    columns = list(DEFAULT_PARAMS) + ['total_return', 'max_drawdown', 'trades', 'win_rate', 'target_hit_rate', 'stop_rate']
+    print(result.sort_values('total_return', ascending=False)[columns].head(args.top).to_string(index=False))
@@ -0,0 +1,520 @@
+"""
+비트코인 분석 벤치마크
+
+시드 고정 합성 OHLCV 데이터(기하 랜덤워크)로 분석 함수의 실행 시간을 측정합니다.
+
+사용법:
+    python benchmark.py                      # 기본 크기(500, 50000, 1000000)로 측정
+    python benchmark.py --sizes 500 50000    # 크기 지정
+    python benchmark.py --only incremental   # 특정 항목만 측정
+    python benchmark.py --only render        # 리포트 HTML 렌더링 시간
+    python benchmark.py --only startup --startup-budget-ms 600   # import 시간 (-X importtime, 초과 시 실패)
+
+회귀 비교용 벤치마크 모음 (500 / 10k / 100k / 1M봉, 결과는 benchmark_results/<커밋>.json):
+    python benchmark.py --suite                                   # 현재 커밋 측정 후 저장
+    python benchmark.py --suite --sizes 500 10000 --output a.json
+    python benchmark.py --compare 1a2b3c4 5d6e7f8                 # 커밋(또는 JSON 파일) 비교, 회귀 시 종료 코드 1
+    python benchmark.py --compare a.json b.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+from bitcoin_analysis import (
+    analyze_market_position, analyze_peak_proximity, calculate_indicators, calculate_fear_greed_index,
+    calculate_price_targets, format_analysis_result_html,
+)
+from indicator_engine import IncrementalIndicatorEngine
+from monte_carlo import MC_HORIZON_DAYS, MC_PATHS, monte_carlo_targets
+
+
+# 합성 OHLCV 데이터 생성 (BTC와 비슷한 변동성의 기하 랜덤워크)
+def make_synthetic_ohlcv(n_bars, seed=42, start_price=30000.0, daily_vol=0.035):
+    rng = np.random.default_rng(seed)
+
+    log_returns = rng.normal(0.0005, daily_vol, n_bars)
+
+    # 로그 가격을 $3,000~$150,000 구간에서 반사시켜 긴 기록에서도 값이 발산하지 않게 함
+    low_bound, high_bound = np.log(3000.0), np.log(150000.0)
+    width = high_bound - low_bound
+    log_price = (np.log(start_price) - low_bound + np.cumsum(log_returns)) % (2 * width)
+    close = np.exp(low_bound + np.where(log_price > width, 2 * width - log_price, log_price))
+    open_ = np.concatenate([[start_price], close[:-1]])
+
+    # 고가/저가는 시가·종가 바깥으로 일중 변동폭만큼 확장
+    intraday = np.abs(rng.normal(0, daily_vol / 2, n_bars))
+    high = np.maximum(open_, close) * (1 + intraday)
+    low = np.minimum(open_, close) * (1 - intraday)
+
+    # 거래량은 가격 변동이 클수록 증가
+    volume = rng.lognormal(10, 0.5, n_bars) * (1 + 10 * np.abs(log_returns))
+
+    index = pd.date_range(end="2024-01-01", periods=n_bars, freq="D")
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+    }, index=index)
+
+
+# 기존 반복문 방식의 공포/탐욕 지수 (비교 기준)
+def fear_greed_index_loop(df):
+    fear_greed = pd.Series(index=df.index, dtype=float)
+
+    for i in range(len(df)):
+        if i < 20:
+            fear_greed.iloc[i] = 50
+            continue
+
+        rsi = df['rsi'].iloc[i]
+        rsi_score = rsi if not pd.isna(rsi) else 50
+
+        bb_upper = df['bb_upper'].iloc[i]
+        bb_lower = df['bb_lower'].iloc[i]
+        price = df['close'].iloc[i]
+        if not pd.isna(bb_upper) and not pd.isna(bb_lower) and bb_upper != bb_lower:
+            bb_position = ((price - bb_lower) / (bb_upper - bb_lower)) * 100
+        else:
+            bb_position = 50
+
+        vol_ma = df['volume'].iloc[max(0, i-20):i].mean()
+        current_vol = df['volume'].iloc[i]
+        vol_ratio = (current_vol / vol_ma * 50) if vol_ma > 0 else 50
+        vol_score = min(100, max(0, vol_ratio))
+
+        ma20 = df['ma20'].iloc[i]
+        ma50 = df['ma50'].iloc[i]
+        if not pd.isna(ma20) and not pd.isna(ma50) and ma50 != 0:
+            trend_score = ((ma20 - ma50) / ma50 * 500) + 50
+            trend_score = min(100, max(0, trend_score))
+        else:
+            trend_score = 50
+
+        fear_greed.iloc[i] = (rsi_score * 0.3 + bb_position * 0.3 +
+                             vol_score * 0.2 + trend_score * 0.2)
+
+    return fear_greed
+
+
+# 실행 시간 측정 (최소값 사용)
+def time_call(func, *args, repeat=3, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# 공포/탐욕 지수 벤치마크
+def bench_fear_greed(sizes, loop_limit=50000, **kwargs):
+    print("=" * 70)
+    print("공포/탐욕 지수: 반복문 vs 벡터화")
+    print("=" * 70)
+
+    for n in sizes:
+        df = calculate_indicators(make_synthetic_ohlcv(n), backend='numpy')
+        vectorized = time_call(calculate_fear_greed_index, df)
+
+        # 반복문 방식은 큰 데이터에서 너무 느리므로 loop_limit까지만 측정
+        if n <= loop_limit:
+            loop = time_call(fear_greed_index_loop, df, repeat=1)
+            same = np.allclose(fear_greed_index_loop(df), calculate_fear_greed_index(df), rtol=0, atol=0, equal_nan=True)
+            print(f"{n:>9,}개 봉 | 반복문 {loop * 1000:10.1f}ms | 벡터화 {vectorized * 1000:8.2f}ms | "
+                  f"{loop / vectorized:7.0f}배 | 동일 결과: {'예' if same else '아니오'}")
+        else:
+            print(f"{n:>9,}개 봉 | 반복문 {'(생략)':>12} | 벡터화 {vectorized * 1000:8.2f}ms")
+
+
+# 증분 엔진 벤치마크 (전체 재계산 vs 마지막 봉 갱신, 일괄 계산 대비 오차)
+def bench_incremental(sizes, updates=1000, **kwargs):
+    print("=" * 70)
+    print("증분 지표 엔진: 전체 재계산 vs 봉 단위 갱신")
+    print("=" * 70)
+
+    compare_columns = [
+        'rsi', 'macd', 'macd_signal', 'ma20', 'ma50', 'ma200', 'ema12', 'ema26', 'ema50', 'ema100',
+        'bb_upper', 'bb_lower', 'stoch_k', 'stoch_d', 'atr', 'obv', 'obv_ma', 'adx', 'adx_pos', 'adx_neg',
+        'ichimoku_a', 'ichimoku_b', 'fib_236', 'fib_618', 'fear_greed',
+    ]
+
+    for n in sizes:
+        raw = make_synthetic_ohlcv(n)
+        batch_time = time_call(calculate_indicators, raw.copy(), repeat=1)
+        batch = calculate_indicators(raw.copy())
+
+        engine = IncrementalIndicatorEngine.from_frame(raw)
+        latest = raw.iloc[-1]
+        start = time.perf_counter()
+        for i in range(updates):
+            engine.update(raw.index[-1], latest['open'], latest['high'], latest['low'],
+                          latest['close'] * (1 + 1e-4 * (i % 7)), latest['volume'])
+        engine.update(raw.index[-1], latest['open'], latest['high'], latest['low'], latest['close'], latest['volume'])
+        update_time = (time.perf_counter() - start) / (updates + 1)
+
+        max_error = max(
+            abs(engine.latest[c] - batch[c].iloc[-1]) / max(abs(batch[c].iloc[-1]), 1e-9)
+            for c in compare_columns
+        )
+        print(f"{n:>9,}개 봉 | 전체 재계산 {batch_time * 1000:10.1f}ms | 봉 갱신 {update_time * 1e6:7.1f}us | "
+              f"최대 상대오차 {max_error:.1e}")
+
+
+# 지표 계산 백엔드 벤치마크 (ta vs NumPy 커널)
+def bench_backends(sizes, ta_limit=200000, **kwargs):
+    print("=" * 70)
+    print("지표 계산 백엔드: ta vs numpy (float64/float32)")
+    print("=" * 70)
+
+    for n in sizes:
+        raw = make_synthetic_ohlcv(n)
+        numpy64 = time_call(calculate_indicators, raw.copy(), backend='numpy')
+        numpy32 = time_call(calculate_indicators, raw.copy(), backend='numpy', dtype='float32')
+        memory64 = calculate_indicators(raw.copy(), backend='numpy').memory_usage(deep=True).sum()
+        memory32 = calculate_indicators(raw.copy(), backend='numpy', dtype='float32').memory_usage(deep=True).sum()
+
+        # ta 경로는 ATR/ADX가 파이썬 반복문이라 ta_limit까지만 측정
+        if n <= ta_limit:
+            ta_time = time_call(calculate_indicators, raw.copy(), backend='ta', repeat=1)
+            reference = calculate_indicators(raw.copy(), backend='ta')
+            candidate = calculate_indicators(raw.copy(), backend='numpy')
+            max_error = 0.0
+            for column in reference.columns:
+                expected = reference[column].to_numpy(dtype=float)
+                actual = candidate[column].to_numpy(dtype=float)
+                mask = ~np.isnan(expected) & ~np.isnan(actual)
+                if mask.any():
+                    scale = np.maximum(np.abs(expected[mask]), 1e-9)
+                    max_error = max(max_error, float(np.max(np.abs(expected[mask] - actual[mask]) / scale)))
+            print(f"{n:>9,}개 봉 | ta {ta_time * 1000:9.1f}ms | numpy {numpy64 * 1000:8.1f}ms "
+                  f"({ta_time / numpy64:5.1f}배) | float32 {numpy32 * 1000:8.1f}ms | "
+                  f"메모리 {memory64 / 1e6:7.1f}MB -> {memory32 / 1e6:7.1f}MB | 최대 상대오차 {max_error:.1e}")
+        else:
+            print(f"{n:>9,}개 봉 | ta {'(생략)':>11} | numpy {numpy64 * 1000:8.1f}ms "
+                  f"| float32 {numpy32 * 1000:8.1f}ms | 메모리 {memory64 / 1e6:7.1f}MB -> {memory32 / 1e6:7.1f}MB")
+
+
+# 몬테카를로 목표가 벤치마크 (경로 수별, 부트스트랩 기간은 MC_LOOKBACK_DAYS로 고정)
+def bench_monte_carlo(sizes, **kwargs):
+    print("=" * 70)
+    print(f"몬테카를로 목표가: 경로 수 x {MC_HORIZON_DAYS}일")
+    print("=" * 70)
+
+    df = calculate_indicators(make_synthetic_ohlcv(500), backend='numpy')
+    for n_paths in sorted({MC_PATHS // 4, MC_PATHS, MC_PATHS * 4}):
+        elapsed = time_call(monte_carlo_targets, df, n_paths=n_paths)
+        print(f"{n_paths:>9,}개 경로 | {elapsed * 1000:8.1f}ms")
+
+
+# 리포트 렌더링 벤치마크 (분석 1회 후 HTML 조립 / JSON 직렬화 반복)
+def bench_render(sizes, renders=200, **kwargs):
+    print("=" * 70)
+    print(f"리포트 렌더링: 분석 결과 1개를 {renders}회 조립")
+    print("=" * 70)
+
+    df = calculate_indicators(make_synthetic_ohlcv(500), backend='numpy')
+    result = analyze_market_position(df)
+    final_position, indicators, recommendation, score, action, targets, cycle_info, peak_info = result
+    price = df['close'].iloc[-1]
+
+    def render():
+        for _ in range(renders):
+            format_analysis_result_html(final_position, indicators, recommendation, price, "2024-01-01 00:00:00 KST",
+                                        action, targets, score, cycle_info, peak_info)
+
+    def serialize():
+        for _ in range(renders):
+            result.to_json()
+
+    html = format_analysis_result_html(final_position, indicators, recommendation, price, "2024-01-01 00:00:00 KST",
+                                       action, targets, score, cycle_info, peak_info)
+    print(f"HTML {len(html):>9,}자 | {time_call(render) / renders * 1e6:8.1f}us/리포트")
+    print(f"JSON {len(result.to_json()):>9,}자 | {time_call(serialize) / renders * 1e6:8.1f}us/리포트")
+
+
+# 시작 시간 측정 대상 (진입점 모듈)
+STARTUP_MODULES = ('bitcoin_analysis', 'generate_for_github', 'analysis_daemon')
+
+# 시작 시 import되면 안 되는 모듈 (실제로 쓰는 코드 경로에서만 import)
+LAZY_MODULES = ('ccxt', 'ta', 'smtplib', 'email.mime.multipart')
+
+
+# -X importtime 출력 -> [(모듈, 깊이, 자체 us, 누적 us), ...]
+def parse_importtime(stderr):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+# 새 프로세스에서 모듈 하나를 import하는 시간 (-X importtime)
+def measure_import(module):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+
+# 거래소 하나만 불러온 뒤 다른 코드가 ccxt 전체를 import해도 정상 동작하는지 확인하는 스크립트
+CCXT_FULL_IMPORT_CHECK = (
+    "import bitcoin_analysis as b\n"
+    "cls = b.load_exchange_class('kraken')\n"
+    "import ccxt, ccxt.pro\n"
+    "assert ccxt.kraken is cls and ccxt.NetworkError and ccxt.exchanges\n"
+)
+
+
+# 지연 로드 후 전체 import ccxt 확인 (실패 시 오류 메시지, 성공 시 None)
+def check_ccxt_full_import():
+    result = subprocess.run([sys.executable, "-c", CCXT_FULL_IMPORT_CHECK], capture_output=True, text=True)
+    if result.returncode == 0:
+        return None
+    return (result.stderr.strip().splitlines() or ["알 수 없는 오류"])[-1]
+
+
+# 시작(import) 시간 벤치마크
+def bench_startup(sizes, startup_repeat=5, startup_budget_ms=None, top=5, **kwargs):
+    print(f"\n=== 시작 시간 (python -X importtime, {startup_repeat}회 중 최소) ===")
+    over_budget = []
+    for module in STARTUP_MODULES:
+        runs = [measure_import(module) for _ in range(startup_repeat)]
+        rows = min(runs, key=lambda rows: rows[-1][3])
+        total_ms = rows[-1][3] / 1000
+        loaded = [name for name in LAZY_MODULES if any(row[0] == name for row in rows)]
+        print(f"{module:20s} | {total_ms:8.1f}ms | 지연 대상 로드: {', '.join(loaded) or '없음'}")
+
+        # 진입점이 직접 import하는 모듈 중 누적 시간이 큰 순서 (하위 모듈이 상위보다 먼저 출력됨)
+        start = max((i for i, row in enumerate(rows[:-1]) if row[1] == 0), default=-1) + 1
+        children = sorted((row for row in rows[start:-1] if row[1] == 1), key=lambda row: -row[3])
+        for name, _, _, cumulative_us in children[:top]:
+            print(f"    {name:30s} {cumulative_us / 1000:8.1f}ms")
+
+        if startup_budget_ms is not None and total_ms > startup_budget_ms:
+            over_budget.append(f"{module} {total_ms:.1f}ms")
+        if startup_budget_ms is not None and loaded:
+            over_budget.append(f"{module}이(가) {', '.join(loaded)} import")
+
+    error = check_ccxt_full_import()
+    print(f"거래소 지연 로드 후 import ccxt | {'정상' if error is None else '실패: ' + error}")
+    if error is not None:
+        raise SystemExit(f"거래소 지연 로드 후 import ccxt 실패: {error}")
+
+    if over_budget:
+        raise SystemExit(f"시작 시간 기준({startup_budget_ms}ms) 위반: {', '.join(over_budget)}")
+
+
+BENCHMARKS = {
+    'fear_greed': bench_fear_greed,
+    'incremental': bench_incremental,
+    'backends': bench_backends,
+    'monte_carlo': bench_monte_carlo,
+    'render': bench_render,
+    'startup': bench_startup,
+}
+
+
+# 벤치마크 모음 기본 크기 (봉 개수)
+SUITE_SIZES = (500, 10000, 100000, 1000000)
+
+# 벤치마크 모음 결과 저장 위치
+BENCHMARK_RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR", "benchmark_results")
+
+# 회귀로 판단할 느려짐 비율 (0.10 = 기준보다 10% 이상 느려짐)
+REGRESSION_THRESHOLD = 0.10
+
+# 이보다 짧은 측정값은 차이가 비율을 넘어도 회귀로 보지 않음 (타이머/스케줄링 잡음, 초)
+REGRESSION_MIN_SECONDS = 0.0005
+
+# 결과 형식 버전 (필드 구조가 바뀌면 올림)
+SUITE_FORMAT_VERSION = 1
+
+
+# 실행 시간 목록 (준비 실행 1회 후 최소 repeat회, 짧은 함수는 합계가 min_time초가 될 때까지 반복)
+def time_runs(func, repeat=3, min_time=0.2, max_runs=1000):
+    func()
+    runs = []
+    while len(runs) < repeat or (sum(runs) < min_time and len(runs) < max_runs):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+# 현재 git 커밋 (git이 없으면 None)
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                    text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, dirty
+
+
+# 벤치마크 모음 실행 (크기별로 같은 합성 데이터에서 각 함수 측정)
+def run_suite(sizes=SUITE_SIZES, repeat=3, ta_limit=100000, seed=42):
+    """
+    calculate_indicators는 numpy 백엔드와 ta 백엔드(ta_limit봉까지, ATR/ADX가 파이썬 반복문)를 따로 측정하고,
+    나머지 함수는 numpy 백엔드로 계산한 지표 프레임을 입력으로 사용합니다.
+    RollingStatsCache는 매 호출마다 새로 만들어 캐시 재사용 없이 측정합니다.
+    """
+    results = []
+
+    def record(name, n, runs):
+        results.append({'benchmark': name, 'bars': n, 'min_seconds': min(runs),
+                        'median_seconds': float(np.median(runs)), 'runs': len(runs)})
+        print(f"{name:32s} {n:>9,}봉 | 최소 {min(runs) * 1000:10.2f}ms | 중앙값 {np.median(runs) * 1000:10.2f}ms")
+
+    for n in sizes:
+        raw = make_synthetic_ohlcv(n, seed=seed)
+        record("calculate_indicators[numpy]", n,
+               time_runs(lambda: calculate_indicators(raw.copy(), backend='numpy'), repeat))
+        if n <= ta_limit:
+            record("calculate_indicators[ta]", n,
+                   time_runs(lambda: calculate_indicators(raw.copy(), backend='ta'), repeat))
+
+        df = calculate_indicators(raw.copy(), backend='numpy')
+        result = analyze_market_position(df)
+        final_position, indicators, recommendation, score, action, targets, cycle_info, peak_info = result
+        latest = df.iloc[-1]
+
+        record("calculate_fear_greed_index", n, time_runs(lambda: calculate_fear_greed_index(df), repeat))
+        record("analyze_market_position", n, time_runs(lambda: analyze_market_position(df), repeat))
+        record("analyze_peak_proximity", n, time_runs(lambda: analyze_peak_proximity(df, indicators), repeat))
+        record("calculate_price_targets", n,
+               time_runs(lambda: calculate_price_targets(df, latest, result.position_category, mode='fixed'), repeat))
+        record("format_analysis_result_html", n, time_runs(
+            lambda: format_analysis_result_html(final_position, indicators, recommendation, latest['close'],
+                                                "2024-01-01 00:00:00 KST", action, targets, score, cycle_info,
+                                                peak_info), repeat))
+
+    commit, dirty = git_revision()
+    return {
+        'version': SUITE_FORMAT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'dirty': dirty,
+        'seed': seed,
+        'repeat': repeat,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor() or None,
+            'system': platform.system(),
+        },
+        'results': results,
+    }
+
+
+# 결과 파일 경로 (JSON 파일 경로 또는 BENCHMARK_RESULTS_DIR 안의 커밋 이름)
+def resolve_suite_path(name):
+    if os.path.exists(name) or name.endswith(".json"):
+        return name
+    return os.path.join(BENCHMARK_RESULTS_DIR, f"{name}.json")
+
+
+def load_suite(name):
+    with open(resolve_suite_path(name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+# 두 결과 비교 -> [(함수, 봉 개수, 기준 초, 비교 초, 비율, 판정), ...] (초와 비율은 최소 실행 시간 기준)
+def compare_suites(base, new, threshold=REGRESSION_THRESHOLD, min_seconds=REGRESSION_MIN_SECONDS):
+    """
+    최소 실행 시간과 중앙값이 모두 threshold 이상 느려졌을 때만 회귀로 판정합니다.
+    (한쪽 실행에서만 운 좋게 빨랐던 측정값으로 회귀가 잡히지 않도록)
+    판정: regression, improvement, same, missing (한쪽에만 있음)
+    """
+    def timings(suite):
+        return {(row['benchmark'], row['bars']): (row['min_seconds'], row['median_seconds'])
+                for row in suite['results']}
+
+    base_times, new_times = timings(base), timings(new)
+
+    rows = []
+    for key in list(base_times) + [key for key in new_times if key not in base_times]:
+        if key not in base_times or key not in new_times:
+            before, after = base_times.get(key, (None,))[0], new_times.get(key, (None,))[0]
+            rows.append((*key, before, after, None, 'missing'))
+            continue
+        (before, before_median), (after, after_median) = base_times[key], new_times[key]
+        ratio = after / before if before > 0 else float('inf')
+        median_ratio = after_median / before_median if before_median > 0 else float('inf')
+        if min(ratio, median_ratio) >= 1 + threshold and after - before >= min_seconds:
+            verdict = 'regression'
+        elif max(ratio, median_ratio) <= 1 / (1 + threshold) and before - after >= min_seconds:
+            verdict = 'improvement'
+        else:
+            verdict = 'same'
+        rows.append((*key, before, after, ratio, verdict))
+    return rows
+
+
+def print_comparison(base, new, rows, threshold):
+    labels = {'regression': '느려짐', 'improvement': '빨라짐', 'same': '', 'missing': '한쪽만 있음'}
+    print(f"기준 {base.get('commit')}{' (수정됨)' if base.get('dirty') else ''} -> "
+          f"비교 {new.get('commit')}{' (수정됨)' if new.get('dirty') else ''} (회귀 기준 {threshold:.0%})")
+    if base.get('environment') != new.get('environment'):
+        print(f"[주의] 측정 환경이 다릅니다: {base.get('environment')} / {new.get('environment')}")
+    for name, bars, before, after, ratio, verdict in rows:
+        before_text = "-" if before is None else f"{before * 1000:.2f}ms"
+        after_text = "-" if after is None else f"{after * 1000:.2f}ms"
+        ratio_text = "" if ratio is None else f"{ratio:6.2f}x"
+        print(f"{name:32s} {bars:>9,}봉 | {before_text:>11} -> {after_text:>11} {ratio_text:>8} {labels[verdict]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="비트코인 분석 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help="합성 데이터 봉 개수 목록 (기본 500 50000 1000000, --suite는 500 10000 100000 1000000)")
+    parser.add_argument("--loop-limit", type=int, default=50000,
+                        help="기존 반복문 방식을 측정할 최대 봉 개수")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="측정할 항목")
+    parser.add_argument("--startup-budget-ms", type=float, default=None,
+                        help="진입점 import 시간 상한 (ms, 초과하면 종료 코드 1)")
+    parser.add_argument("--suite", action="store_true", help="회귀 비교용 벤치마크 모음 실행 후 JSON 저장")
+    parser.add_argument("--repeat", type=int, default=3, help="벤치마크 모음의 함수별 반복 횟수")
+    parser.add_argument("--ta-limit", type=int, default=100000, help="벤치마크 모음에서 ta 백엔드를 측정할 최대 봉 개수")
+    parser.add_argument("--output", default=None, help="벤치마크 모음 결과 파일 (기본 benchmark_results/<커밋>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과(커밋 또는 JSON 파일) 비교")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="회귀로 판단할 느려짐 비율 (기본 0.10)")
+    args = parser.parse_args()
+
+    if args.compare:
+        base, new = (load_suite(name) for name in args.compare)
+        rows = compare_suites(base, new, args.threshold)
+        print_comparison(base, new, rows, args.threshold)
+        regressions = [row for row in rows if row[-1] == 'regression']
+        if regressions:
+            raise SystemExit(f"\n성능 회귀 {len(regressions)}건")
+    elif args.suite:
+        suite = run_suite(args.sizes or SUITE_SIZES, repeat=args.repeat, ta_limit=args.ta_limit)
+        output = args.output or os.path.join(
+            BENCHMARK_RESULTS_DIR, f"{suite['commit'] or 'unknown'}{'-dirty' if suite['dirty'] else ''}.json")
+        if os.path.dirname(output):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(suite, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {output}")
+    else:
+        for name in args.only:
+            BENCHMARKS[name](args.sizes or [500, 50000, 1000000], loop_limit=args.loop_limit,
+                             startup_budget_ms=args.startup_budget_ms)
@@ -1,12 +1,22 @@
 import os
-import ccxt
+import sys
+import importlib
+import importlib.util
+import threading
+import time
 import pandas as pd
 import numpy as np
-import ta
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from candle_store import fetch_ohlcv_history, fetch_ohlcv_incremental
+import indicator_kernel
+from indicator_kernel import compute_indicator_arrays, rolling_max, rolling_min
+from indicator_cache import make_cache_key, load_cached_frame, store_cached_frame
+from rolling_stats import RollingStatsCache
+from monte_carlo import monte_carlo_targets
+from analysis_result import AnalysisResult, format_display_value
+from signal_state import detect_transitions, load_state, save_state, state_from_result
+from pipeline_metrics import measure, pipeline_run, set_label
 
 # .env 파일 로드 (AWS EC2 등에서 사용)
 try:
@@ -47,63 +57,288 @@ RECIPIENT_EMAIL = os.getenv("RECIPIENT_EMAIL", "")  # 수신자 이메일
 SMTP_SERVER = "smtp.gmail.com"
 SMTP_PORT = 587  # TLS 포트 사용 (기존 SSL 465 대신)
 
-# 비트코인 데이터 가져오기
-def get_bitcoin_data():
+# 지표 계산 백엔드: ta (기본, ta 라이브러리) / numpy (단일 패스 NumPy 커널)
+INDICATOR_BACKEND = os.getenv("INDICATOR_BACKEND", "ta").lower()
+
+# numpy 백엔드의 결과 자료형 (float32는 메모리 사용량 절반)
+INDICATOR_DTYPE = os.getenv("INDICATOR_DTYPE", "float64")
+
+# 지표 계산 결과 디스크 캐시 사용 여부 (같은 OHLCV면 재계산 생략)
+USE_INDICATOR_CACHE = os.getenv("USE_INDICATOR_CACHE", "true").lower() == "true"
+
+# 로컬 캔들 저장소 사용 여부 (마지막 저장 시각 이후의 캔들만 가져옴)
+USE_CANDLE_STORE = os.getenv("USE_CANDLE_STORE", "true").lower() == "true"
+
+# 시도할 거래소 목록 (순서대로)
+EXCHANGES_TO_TRY = [
+    ('kraken', 'BTC/USD'),      # Kraken (미국/유럽)
+    ('coinbase', 'BTC/USD'),    # Coinbase (미국)
+    ('bitstamp', 'BTC/USD'),    # Bitstamp (유럽)
+    ('binance', 'BTC/USDT'),    # Binance (글로벌, 일부 지역 제한)
+]
+
+# 데이터 수집 방식: hedged (모든 거래소 동시 요청, 우선순위가 가장 높은 정상 응답 사용) / sequential (순서대로 시도)
+FETCH_MODE = os.getenv("FETCH_MODE", "hedged").lower()
+
+# 거래소 요청 타임아웃 (밀리초)
+EXCHANGE_TIMEOUT_MS = int(os.getenv("EXCHANGE_TIMEOUT_MS", "10000"))
+
+# hedged 방식에서 첫 정상 응답 후 우선순위가 더 높은 거래소의 응답을 기다리는 시간 (밀리초)
+FETCH_GRACE_MS = int(os.getenv("FETCH_GRACE_MS", "1000"))
+
+# 목표가 계산 방식: fixed (현재가 고정 배수) / monte_carlo (고정 배수 + 몬테카를로 도달 확률)
+TARGET_MODE = os.getenv("TARGET_MODE", "fixed").lower()
+
+# 이메일 알림 방식: changes (판단 변화가 있을 때만, 기본) / always (매 실행마다)
+NOTIFY_MODE = os.getenv("NOTIFY_MODE", "changes").lower()
+
+# ccxt 거래소 모듈만 골라서 불러오기 (false면 import ccxt로 전체 거래소 로드)
+CCXT_LAZY_IMPORT = os.getenv("CCXT_LAZY_IMPORT", "true").lower() == "true"
+
+# 거래소 객체 (프로세스 안에서 재사용 - 상주 실행 시 연결/마켓 정보 유지)
+_exchange_clients = {}
+_exchange_lock = threading.Lock()
+
+# ccxt 거래소 클래스 불러오기 (처음 사용할 때 import)
+def load_exchange_class(exchange_name):
     """
-    여러 거래소를 시도하여 비트코인 데이터를 가져옵니다.
-    Binance가 실패하면 다른 거래소를 시도합니다.
+    ccxt 패키지의 __init__은 100개가 넘는 거래소 모듈을 모두 import합니다 (수백 ms).
+    ccxt가 아직 import되지 않았으면 __init__을 실행하지 않은 임시 패키지를 잠시 등록해
+    ccxt.<거래소> 모듈 하나만 불러온 뒤 임시 패키지를 sys.modules에서 제거합니다.
+    이후 다른 코드의 import ccxt는 __init__을 정상 실행하며, 이미 불러온 하위 모듈은 그대로 재사용합니다.
     """
-    # 시도할 거래소 목록 (순서대로)
-    exchanges_to_try = [
-        ('kraken', 'BTC/USD'),      # Kraken (미국/유럽)
-        ('coinbase', 'BTC/USD'),    # Coinbase (미국)
-        ('bitstamp', 'BTC/USD'),    # Bitstamp (유럽)
-        ('binance', 'BTC/USDT'),    # Binance (글로벌, 일부 지역 제한)
-    ]
+    ccxt = sys.modules.get('ccxt')
+    if ccxt is not None or not CCXT_LAZY_IMPORT:
+        import ccxt
+        return getattr(ccxt, exchange_name)
+
+    spec = importlib.util.find_spec('ccxt')
+    if spec is None:
+        raise ImportError("ccxt 패키지가 필요합니다 (pip install ccxt)")
+    stub = importlib.util.module_from_spec(spec)
+    sys.modules['ccxt'] = stub
+    try:
+        module = importlib.import_module(f"ccxt.{exchange_name}")
+    finally:
+        # 임시 패키지가 남아 있으면 import ccxt가 __init__ 없이 이 패키지를 돌려줌 (NetworkError 등 누락)
+        if sys.modules.get('ccxt') is stub:
+            del sys.modules['ccxt']
+    return getattr(module, exchange_name)
+
+def get_exchange_client(exchange_name):
+    # 동시 요청(fetch_hedged) 스레드가 같은 거래소/패키지를 중복 생성하지 않도록 잠금
+    with _exchange_lock:
+        exchange = _exchange_clients.get(exchange_name)
+        if exchange is None:
+            exchange_class = load_exchange_class(exchange_name)
+            exchange = exchange_class({'timeout': EXCHANGE_TIMEOUT_MS})
+            _exchange_clients[exchange_name] = exchange
+    return exchange
+
+# 한 거래소에서 일봉 데이터 가져오기
+def fetch_exchange_data(exchange_name, symbol, timeframe='1d', limit=500):
+    # 거래소 객체 (처음 사용할 때 생성)
+    exchange = get_exchange_client(exchange_name)
+    
+    # 일봉 데이터 가져오기 (최근 500일 데이터 - 사이클 분석용)
+    if USE_CANDLE_STORE:
+        ohlcv = fetch_ohlcv_incremental(exchange, exchange_name, symbol, timeframe, limit=limit)
+    else:
+        ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+    
+    return ohlcv_to_frame(ohlcv)
+
+# ccxt OHLCV 목록/배열 -> 시각 인덱스 DataFrame
+def ohlcv_to_frame(ohlcv):
+    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'].astype('int64'), unit='ms')
+    df.set_index('timestamp', inplace=True)
+    
+    return df
+
+# 받아온 데이터 이상 여부 확인 (빈 데이터, 비정상 가격, 오래된 데이터 제외)
+def is_valid_ohlcv(df, max_age=timedelta(days=3)):
+    if df is None or df.empty:
+        return False
+    if df[['open', 'high', 'low', 'close']].isna().any().any():
+        return False
+    if (df['close'] <= 0).any() or (df['high'] < df['low']).any():
+        return False
+    if not df.index.is_monotonic_increasing:
+        return False
     
+    # 마지막 봉이 너무 오래되었으면 (상장폐지/점검 중인 마켓) 제외
+    now_utc = datetime.now(timezone.utc).replace(tzinfo=None)
+    return now_utc - df.index[-1].to_pydatetime() <= max_age
+
+# 순서대로 거래소 시도 (앞 거래소가 실패해야 다음 거래소 시도)
+def fetch_sequential(exchanges_to_try):
     for exchange_name, symbol in exchanges_to_try:
         try:
             print(f"[시도] {exchange_name} 거래소에서 데이터 가져오는 중...")
+            df = fetch_exchange_data(exchange_name, symbol)
             
-            # 거래소 객체 생성
-            exchange_class = getattr(ccxt, exchange_name)
-            exchange = exchange_class()
-            
-            # 일봉 데이터 가져오기 (최근 500일 데이터 - 사이클 분석용)
-            ohlcv = exchange.fetch_ohlcv(symbol, '1d', limit=500)
-            
-            # DataFrame으로 변환
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            if not is_valid_ohlcv(df):
+                print(f"[실패] {exchange_name}: 데이터 검증 실패")
+                continue
             
             print(f"[성공] {exchange_name}에서 데이터를 성공적으로 가져왔습니다.")
+            set_label(exchange=exchange_name)
             return df
             
         except Exception as e:
             print(f"[실패] {exchange_name}: {str(e)[:100]}")
             continue
     
+    return None
+
+# 모든 거래소에 동시 요청 후 가장 먼저 도착한 정상 응답 사용
+def fetch_hedged(exchanges_to_try):
+    """
+    최악의 지연 시간이 '타임아웃의 합'에서 '정상 거래소의 응답 시간 + FETCH_GRACE_MS'로 줄어듭니다.
+    첫 정상 응답 후 FETCH_GRACE_MS 동안 목록 순서상 앞선 거래소의 응답을 더 기다린 뒤
+    그중 가장 앞선 거래소의 데이터를 사용합니다 (네트워크 타이밍에 따라 거래소가 바뀌지 않도록).
+    남은 요청은 취소되지 않습니다. shutdown(wait=False)는 기다리지 않을 뿐이라 이미 실행 중인
+    요청은 계속 진행되며, 프로그램 종료 시 최대 EXCHANGE_TIMEOUT_MS 동안 인터프리터 종료가 늦어질 수 있습니다.
+    """
+    print(f"[시도] {', '.join(name for name, _ in exchanges_to_try)} 거래소에 동시 요청 중...")
+    
+    executor = ThreadPoolExecutor(max_workers=len(exchanges_to_try))
+    futures = {
+        executor.submit(fetch_exchange_data, exchange_name, symbol): (index, exchange_name)
+        for index, (exchange_name, symbol) in enumerate(exchanges_to_try)
+    }
+    
+    best = None  # (목록 순서, 거래소 이름, 데이터)
+    deadline = None
+    pending = set(futures)
+    try:
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break  # 대기 시간 종료
+            
+            for future in done:
+                index, exchange_name = futures[future]
+                try:
+                    df = future.result()
+                except Exception as e:
+                    print(f"[실패] {exchange_name}: {str(e)[:100]}")
+                    continue
+                
+                if not is_valid_ohlcv(df):
+                    print(f"[실패] {exchange_name}: 데이터 검증 실패")
+                    continue
+                
+                if best is None or index < best[0]:
+                    best = (index, exchange_name, df)
+            
+            if best is not None:
+                # 남은 요청이 모두 우선순위가 낮으면 더 기다리지 않음
+                if all(futures[future][0] > best[0] for future in pending):
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + FETCH_GRACE_MS / 1000
+    finally:
+        # 나머지 요청은 기다리지 않음 (실행 중인 요청은 취소되지 않고 타임아웃까지 진행)
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    if best is None:
+        return None
+    
+    _, exchange_name, df = best
+    print(f"[성공] {exchange_name}에서 데이터를 성공적으로 가져왔습니다.")
+    set_label(exchange=exchange_name)
+    return df
+
+# 비트코인 데이터 가져오기
+def get_bitcoin_data(mode=None):
+    """
+    여러 거래소를 시도하여 비트코인 데이터를 가져옵니다.
+    기본은 모든 거래소에 동시 요청(hedged)하며, FETCH_MODE=sequential이면
+    Kraken부터 순서대로 시도합니다.
+    """
+    mode = mode or FETCH_MODE
+    
+    if mode == "sequential":
+        df = fetch_sequential(EXCHANGES_TO_TRY)
+    else:
+        df = fetch_hedged(EXCHANGES_TO_TRY)
+    
+    if df is not None:
+        return df
+    
     # 모든 거래소 시도 실패
     print(f"[오류] 모든 거래소에서 데이터를 가져올 수 없습니다.")
     return None
 
+# 장기 비트코인 데이터 가져오기 (백테스트/가중치 최적화용)
+def get_bitcoin_history(min_bars, timeframe='1d'):
+    """
+    리포트용 최근 500봉 대신 캔들 저장소에 과거 기록을 채워(since) 최근 min_bars봉 이상을 가져옵니다.
+    EXCHANGES_TO_TRY 순서대로 시도해 min_bars봉 이상을 제공하는 첫 거래소의 데이터를 반환하고,
+    모두 부족하면 가장 긴 데이터를 반환합니다. (Kraken은 최근 720봉만 제공)
+    """
+    best = None
+    for exchange_name, symbol in EXCHANGES_TO_TRY:
+        try:
+            exchange = get_exchange_client(exchange_name)
+            timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+            since = exchange.milliseconds() - (min_bars + 1) * timeframe_ms
+            df = ohlcv_to_frame(fetch_ohlcv_history(exchange, exchange_name, symbol, timeframe, since=since))
+        except Exception as e:
+            print(f"[실패] {exchange_name}: {str(e)[:100]}")
+            continue
+        
+        if not is_valid_ohlcv(df):
+            print(f"[실패] {exchange_name}: 데이터 검증 실패")
+            continue
+        
+        df = df.iloc[-min_bars:]
+        if best is None or len(df) > len(best):
+            best = df
+        if len(df) >= min_bars:
+            break
+        print(f"[부족] {exchange_name}: {len(df)}개 봉 (필요 {min_bars}개)")
+    
+    if best is None:
+        print(f"[오류] 모든 거래소에서 데이터를 가져올 수 없습니다.")
+    return best
+
+# 반감기 날짜 테이블 (확정된 날짜만, 오름차순, 모듈 로드 시 한 번만 파싱)
+HALVING_DATETIMES = sorted(
+    datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=KST)
+    for date in HALVING_DATES.keys() if "XX" not in date
+)
+
+# np.searchsorted용 반감기 시각 (KST 기준 naive datetime64)
+HALVING_TABLE = np.array([date.replace(tzinfo=None) for date in HALVING_DATETIMES], dtype='datetime64[ns]')
+
+# 4년 주기 길이 (일)
+CYCLE_DAYS = 365.25 * 4
+
+# 사이클 단계 (주기 내 위치 % 상한, 단계, 점수) - 마지막 구간은 상한 없음
+CYCLE_PHASES = [
+    (15, "축적기 (반감기 직후)", 2),  # 매수 적극 권장
+    (40, "상승 초기 (강세장 시작)", 1.5),  # 매수 권장
+    (60, "상승 중기 (강세장 한복판)", 0.5),  # 보유 권장
+    (75, "상승 후기 (과열 구간)", -0.5),  # 일부 매도 시작
+    (90, "고점 근접 (분할 매도 구간)", -1.5),  # 분할 매도 적극 권장
+    (None, "사이클 말기 (약세장 전환)", -2),  # 매도 완료 권장
+]
+
 # 비트코인 4년 주기 분석
-def analyze_bitcoin_cycle():
-    """현재 비트코인이 4년 주기 중 어디에 위치하는지 분석"""
-    current_date = get_kst_now()
+def analyze_bitcoin_cycle(current_date=None):
+    """현재(또는 current_date) 비트코인이 4년 주기 중 어디에 위치하는지 분석"""
+    if current_date is None:
+        current_date = get_kst_now()
     
     # 가장 최근 반감기 찾기
     last_halving = None
     next_halving = None
     
-    # naive datetime을 aware datetime으로 변환 (KST 기준)
-    halving_dates_sorted = sorted([
-        datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=KST) 
-        for date in HALVING_DATES.keys() if "XX" not in date
-    ])
-    
-    for halving_date in halving_dates_sorted:
+    for halving_date in HALVING_DATETIMES:
         if halving_date <= current_date:
             last_halving = halving_date
         elif halving_date > current_date and next_halving is None:
@@ -117,28 +352,12 @@ def analyze_bitcoin_cycle():
     days_since_halving = (current_date - last_halving).days
     
     # 4년 주기에서의 위치 (%)
-    cycle_days = 365.25 * 4  # 4년
-    cycle_position_pct = (days_since_halving / cycle_days) * 100
+    cycle_position_pct = (days_since_halving / CYCLE_DAYS) * 100
     
     # 사이클 단계 판단
-    if cycle_position_pct < 15:
-        cycle_phase = "축적기 (반감기 직후)"
-        phase_score = 2  # 매수 적극 권장
-    elif cycle_position_pct < 40:
-        cycle_phase = "상승 초기 (강세장 시작)"
-        phase_score = 1.5  # 매수 권장
-    elif cycle_position_pct < 60:
-        cycle_phase = "상승 중기 (강세장 한복판)"
-        phase_score = 0.5  # 보유 권장
-    elif cycle_position_pct < 75:
-        cycle_phase = "상승 후기 (과열 구간)"
-        phase_score = -0.5  # 일부 매도 시작
-    elif cycle_position_pct < 90:
-        cycle_phase = "고점 근접 (분할 매도 구간)"
-        phase_score = -1.5  # 분할 매도 적극 권장
-    else:
-        cycle_phase = "사이클 말기 (약세장 전환)"
-        phase_score = -2  # 매도 완료 권장
+    for upper, cycle_phase, phase_score in CYCLE_PHASES:
+        if upper is None or cycle_position_pct < upper:
+            break
     
     cycle_info = {
         "last_halving": last_halving,
@@ -151,23 +370,60 @@ def analyze_bitcoin_cycle():
     
     return cycle_info
 
+# 봉별 4년 주기 위치 (analyze_bitcoin_cycle의 벡터화 버전)
+def analyze_bitcoin_cycle_history(dates):
+    """
+    dates: 날짜 배열 (DatetimeIndex 등, timezone 없는 값은 UTC로 간주 - 거래소 캔들 시각)
+    봉별 last_halving, days_since_halving, cycle_position_pct, cycle_phase, phase_score DataFrame 반환
+    (첫 반감기 이전 날짜는 NaN / None)
+    """
+    index = pd.DatetimeIndex(dates)
+    dates = index.tz_localize('UTC') if index.tz is None else index
+    kst_dates = dates.tz_convert(KST).tz_localize(None).to_numpy(dtype='datetime64[ns]')
+    
+    # 각 날짜 이전(같은 시각 포함)의 마지막 반감기 위치
+    halving_idx = np.searchsorted(HALVING_TABLE, kst_dates, side='right') - 1
+    has_halving = halving_idx >= 0
+    last_halving = np.where(has_halving, HALVING_TABLE[np.maximum(halving_idx, 0)], np.datetime64('NaT'))
+    
+    # 경과 일수 (timedelta.days와 같이 내림)
+    elapsed = (kst_dates - last_halving).astype('timedelta64[ns]').astype(np.int64)
+    days_since_halving = np.where(has_halving, np.floor_divide(elapsed, 86_400 * 10**9), 0).astype(float)
+    days_since_halving[~has_halving] = np.nan
+    cycle_position_pct = (days_since_halving / CYCLE_DAYS) * 100
+    
+    # 사이클 단계 (구간 상한 테이블에서 위치 탐색)
+    uppers = np.array([upper for upper, _, _ in CYCLE_PHASES[:-1]], dtype=float)
+    phase_idx = np.searchsorted(uppers, np.nan_to_num(cycle_position_pct), side='right')
+    phase_names = np.array([phase for _, phase, _ in CYCLE_PHASES], dtype=object)
+    phase_scores = np.array([score for _, _, score in CYCLE_PHASES], dtype=float)
+    
+    return pd.DataFrame({
+        'last_halving': last_halving,
+        'days_since_halving': days_since_halving,
+        'cycle_position_pct': cycle_position_pct,
+        'cycle_phase': np.where(has_halving, phase_names[phase_idx], None),
+        'phase_score': np.where(has_halving, phase_scores[phase_idx], np.nan),
+    }, index=index)
+
 # 고점 근접도 분석 (과매수 및 과열 신호 종합)
-def analyze_peak_proximity(df, indicators):
+def analyze_peak_proximity(df, indicators, stats=None):
     """현재 가격이 사이클 고점에 얼마나 가까운지 분석"""
+    stats = RollingStatsCache.for_frame(df, stats)
     
     latest = df.iloc[-1]
     current_price = latest['close']
     
     # 1. 역사적 최고가 대비 비율
-    max_price_52w = df['high'].tail(365).max()  # 52주 최고가
-    max_price_all = df['high'].max()  # 전체 기간 최고가
+    max_price_52w = stats.last('max', 'high', 365)  # 52주 최고가
+    max_price_all = stats.last('max', 'high')  # 전체 기간 최고가
     
     price_vs_52w_high = (current_price / max_price_52w) * 100
     price_vs_all_high = (current_price / max_price_all) * 100
     
     # 2. RSI 극단값 (70 이상이 지속되는 정도)
     rsi = latest['rsi']
-    rsi_readings_above_70 = (df['rsi'].tail(30) > 70).sum()  # 최근 30일 중 RSI 70 이상 일수
+    rsi_readings_above_70 = stats.last('count', 'rsi', 30, above=70)  # 최근 30일 중 RSI 70 이상 일수
     
     # 3. 200일 이평선 대비 괴리율
     ma200 = latest['ma200']
@@ -177,10 +433,10 @@ def analyze_peak_proximity(df, indicators):
     bb_upper = latest['bb_upper']
     bb_lower = latest['bb_lower']
     bb_position = ((current_price - bb_lower) / (bb_upper - bb_lower)) * 100 if (bb_upper - bb_lower) > 0 else 50
-    days_near_bb_upper = (((df['close'].tail(30) - df['bb_lower'].tail(30)) / (df['bb_upper'].tail(30) - df['bb_lower'].tail(30)) * 100) > 80).sum()
+    days_near_bb_upper = stats.last('count', 'bb_position', 30, above=80)
     
     # 5. 거래량 폭증 (고점 신호)
-    volume_ma = df['volume'].tail(30).mean()
+    volume_ma = stats.last('mean', 'volume', 30)
     current_volume = latest['volume']
     volume_surge = (current_volume / volume_ma) if volume_ma > 0 else 1
     
@@ -274,126 +530,485 @@ def analyze_peak_proximity(df, indicators):
     
     return peak_info
 
-# 기술적 지표 계산
-def calculate_indicators(df):
-    if df is None or df.empty:
-        return None
-    
-    # 1. RSI (14)
+# 고점 근접도 분석 - 전체 구간 (봉마다 세부 지표와 점수)
+def analyze_peak_proximity_history(df, stats=None):
+    """
+    analyze_peak_proximity의 tail(30)/tail(365) 계산을 이동 합계/최대값으로 바꿔
+    모든 봉의 세부 지표, 항목별 점수, peak_score를 O(n)으로 계산합니다.
+    마지막 행은 analyze_peak_proximity의 결과와 같습니다.
+    """
+    stats = RollingStatsCache.for_frame(df, stats)
+    close = stats.column('close')
+    volume = stats.column('volume')
+    rsi = stats.column('rsi')
+    ma200 = stats.column('ma200')
+    fear_greed = stats.column('fear_greed')
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 1. 52주(365봉) 최고가 / 전체 기간 최고가 대비 비율
+        price_vs_52w_high = close / stats.max('high', 365) * 100
+        price_vs_all_high = close / stats.max('high') * 100
+        
+        # 2. 최근 30봉 중 RSI 70 초과 일수
+        rsi_overheating = stats.count('rsi', 30, above=70)
+        
+        # 3. 200일선 괴리율
+        price_deviation_ma200 = (close - ma200) / ma200 * 100
+        
+        # 4. 최근 30봉 중 볼린저밴드 80% 위치 초과 일수
+        bb_days_near_upper = stats.count('bb_position', 30, above=80)
+        
+        # 5. 최근 30봉 평균 거래량 대비 배수
+        volume_ma = stats.mean('volume', 30)
+        volume_surge = np.where(volume_ma > 0, volume / volume_ma, 1)
+    
+    # 항목별 점수
+    points = {
+        'price_points': np.select([price_vs_52w_high > 95, price_vs_52w_high > 90, price_vs_52w_high > 85], [20, 15, 10], 0),
+        'rsi_points': np.select([rsi > 80, (rsi > 70) & (rsi_overheating > 15), rsi > 70], [20, 20, 15], 0),
+        'ma200_points': np.select([price_deviation_ma200 > 100, price_deviation_ma200 > 70, price_deviation_ma200 > 50], [20, 15, 10], 0),
+        'bb_points': np.select([bb_days_near_upper > 20, bb_days_near_upper > 15, bb_days_near_upper > 10], [20, 15, 10], 0),
+        'volume_points': np.select([volume_surge > 3, volume_surge > 2, volume_surge > 1.5], [20, 15, 10], 0),
+        'fear_greed_points': np.select([fear_greed > 85, fear_greed > 75], [10, 5], 0),
+    }
+    peak_score = np.minimum(100, sum(points.values()))
+    
+    return pd.DataFrame({
+        'price_vs_52w_high': price_vs_52w_high,
+        'price_vs_all_high': price_vs_all_high,
+        'rsi_overheating': rsi_overheating,
+        'price_deviation_ma200': price_deviation_ma200,
+        'bb_days_near_upper': bb_days_near_upper,
+        'volume_surge': volume_surge,
+        **points,
+        'peak_score': peak_score,
+    }, index=df.index)
+
+# 1. RSI (14)
+def _indicator_rsi(df):
+    import ta
     df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
-    
-    # 2. MACD
+
+# 2. MACD
+def _indicator_macd(df):
+    import ta
     macd = ta.trend.MACD(df['close'])
     df['macd'] = macd.macd()
     df['macd_signal'] = macd.macd_signal()
     df['macd_histogram'] = macd.macd_diff()
-    
-    # 3. 이동평균선 (20일, 50일, 200일)
+
+# 3. 이동평균선 (20일, 50일, 200일)
+def _indicator_sma(df):
+    import ta
     df['ma20'] = ta.trend.SMAIndicator(df['close'], window=20).sma_indicator()
     df['ma50'] = ta.trend.SMAIndicator(df['close'], window=50).sma_indicator()
     df['ma200'] = ta.trend.SMAIndicator(df['close'], window=200).sma_indicator()
-    
-    # 4. 지수 이동평균선 (12일, 26일, 50일, 100일) - 중장기 트레이드에 적합
+
+# 4. 지수 이동평균선 (12일, 26일, 50일, 100일) - 중장기 트레이드에 적합
+def _indicator_ema(df):
+    import ta
     df['ema12'] = ta.trend.EMAIndicator(df['close'], window=12).ema_indicator()
     df['ema26'] = ta.trend.EMAIndicator(df['close'], window=26).ema_indicator()
     df['ema50'] = ta.trend.EMAIndicator(df['close'], window=50).ema_indicator()
     df['ema100'] = ta.trend.EMAIndicator(df['close'], window=100).ema_indicator()
-    
-    # 5. 볼린저 밴드
+
+# 5. 볼린저 밴드
+def _indicator_bollinger(df):
+    import ta
     bollinger = ta.volatility.BollingerBands(df['close'])
     df['bb_upper'] = bollinger.bollinger_hband()
     df['bb_middle'] = bollinger.bollinger_mavg()
     df['bb_lower'] = bollinger.bollinger_lband()
     df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
-    
-    # 6. 스토캐스틱 오실레이터
+
+# 6. 스토캐스틱 오실레이터
+def _indicator_stoch(df):
+    import ta
     stoch = ta.momentum.StochasticOscillator(df['high'], df['low'], df['close'])
     df['stoch_k'] = stoch.stoch()
     df['stoch_d'] = stoch.stoch_signal()
-    
-    # 7. ATR (Average True Range) - 변동성 측정
+
+# 7. ATR (Average True Range) - 변동성 측정
+def _indicator_atr(df):
+    import ta
     df['atr'] = ta.volatility.AverageTrueRange(df['high'], df['low'], df['close'], window=14).average_true_range()
-    
-    # 8. OBV (On Balance Volume) - 거래량 기반 지표
+
+# 8. OBV (On Balance Volume) - 거래량 기반 지표
+def _indicator_obv(df):
+    import ta
     df['obv'] = ta.volume.OnBalanceVolumeIndicator(df['close'], df['volume']).on_balance_volume()
     df['obv_ma'] = ta.trend.SMAIndicator(df['obv'], window=20).sma_indicator()
-    
-    # 9. ADX (Average Directional Index) - 추세 강도 측정
+
+# 9. ADX (Average Directional Index) - 추세 강도 측정
+def _indicator_adx(df):
+    import ta
     adx = ta.trend.ADXIndicator(df['high'], df['low'], df['close'], window=14)
     df['adx'] = adx.adx()
     df['adx_pos'] = adx.adx_pos()
     df['adx_neg'] = adx.adx_neg()
-    
-    # 10. 일목균형표 (Ichimoku Cloud) - 중장기 트레이드에 매우 유용
+
+# 10. 일목균형표 (Ichimoku Cloud) - 중장기 트레이드에 매우 유용
+def _indicator_ichimoku(df):
+    import ta
     ichimoku = ta.trend.IchimokuIndicator(df['high'], df['low'])
     df['ichimoku_a'] = ichimoku.ichimoku_a()  # 선행스팬A (구름 상단/하단)
     df['ichimoku_b'] = ichimoku.ichimoku_b()  # 선행스팬B (구름 상단/하단)
     df['ichimoku_base'] = ichimoku.ichimoku_base_line()  # 기준선
     df['ichimoku_conversion'] = ichimoku.ichimoku_conversion_line()  # 전환선
-    
-    # 11. 피보나치 되돌림 레벨 계산 (최근 52주 기준)
-    recent_high = df['high'].tail(52).max()
-    recent_low = df['low'].tail(52).min()
+
+# 11. 피보나치 되돌림 레벨 계산 (봉마다 최근 52봉 기준)
+def _indicator_fibonacci(df):
+    # O(n) 이동 최대/최소 - 과거 봉도 그 시점의 레벨을 가짐 (마지막 봉은 tail(52)와 동일)
+    recent_high = pd.Series(rolling_max(df['high'].to_numpy(dtype=float), 52, min_periods=1), index=df.index)
+    recent_low = pd.Series(rolling_min(df['low'].to_numpy(dtype=float), 52, min_periods=1), index=df.index)
     diff = recent_high - recent_low
     
     df['fib_236'] = recent_high - 0.236 * diff
     df['fib_382'] = recent_high - 0.382 * diff
     df['fib_500'] = recent_high - 0.500 * diff
     df['fib_618'] = recent_high - 0.618 * diff
-    
-    # 12. 공포/탐욕 지수 계산 (간이버전 - RSI, 볼린저밴드 위치, 거래량 기반)
+
+# 12. 공포/탐욕 지수 계산 (간이버전 - RSI, 볼린저밴드 위치, 거래량 기반)
+def _indicator_fear_greed(df):
     df['fear_greed'] = calculate_fear_greed_index(df)
+
+# 지표 의존성 그래프 (지표 묶음 -> 생성 컬럼, 입력 컬럼, ta 계산 함수)
+# 선언 순서가 곧 계산 순서이며, 입력은 항상 앞쪽 묶음이나 원본 OHLCV 컬럼입니다.
+INDICATOR_GRAPH = {
+    'rsi': {
+        'columns': ['rsi'],
+        'inputs': ['close'],
+        'compute': _indicator_rsi,
+    },
+    'macd': {
+        'columns': ['macd', 'macd_signal', 'macd_histogram'],
+        'inputs': ['close'],
+        'compute': _indicator_macd,
+    },
+    'sma': {
+        'columns': ['ma20', 'ma50', 'ma200'],
+        'inputs': ['close'],
+        'compute': _indicator_sma,
+    },
+    'ema': {
+        'columns': ['ema12', 'ema26', 'ema50', 'ema100'],
+        'inputs': ['close'],
+        'compute': _indicator_ema,
+    },
+    'bollinger': {
+        'columns': ['bb_upper', 'bb_middle', 'bb_lower', 'bb_width'],
+        'inputs': ['close'],
+        'compute': _indicator_bollinger,
+    },
+    'stoch': {
+        'columns': ['stoch_k', 'stoch_d'],
+        'inputs': ['high', 'low', 'close'],
+        'compute': _indicator_stoch,
+    },
+    'atr': {
+        'columns': ['atr'],
+        'inputs': ['high', 'low', 'close'],
+        'compute': _indicator_atr,
+    },
+    'obv': {
+        'columns': ['obv', 'obv_ma'],
+        'inputs': ['close', 'volume'],
+        'compute': _indicator_obv,
+    },
+    'adx': {
+        'columns': ['adx', 'adx_pos', 'adx_neg'],
+        'inputs': ['high', 'low', 'close'],
+        'compute': _indicator_adx,
+    },
+    'ichimoku': {
+        'columns': ['ichimoku_a', 'ichimoku_b', 'ichimoku_base', 'ichimoku_conversion'],
+        'inputs': ['high', 'low'],
+        'compute': _indicator_ichimoku,
+    },
+    'fibonacci': {
+        'columns': ['fib_236', 'fib_382', 'fib_500', 'fib_618'],
+        'inputs': ['high', 'low'],
+        'compute': _indicator_fibonacci,
+    },
+    'fear_greed': {
+        'columns': ['fear_greed'],
+        'inputs': ['rsi', 'bb_upper', 'bb_lower', 'ma20', 'ma50', 'close', 'volume'],
+        'compute': _indicator_fear_greed,
+    },
+}
+
+# 컬럼 -> 지표 묶음
+INDICATOR_COLUMN_FAMILY = {
+    column: family for family, node in INDICATOR_GRAPH.items() for column in node['columns']
+}
+
+# 원본 OHLCV 컬럼
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# 요청한 컬럼(또는 지표 묶음 이름)에 필요한 지표 묶음을 계산 순서대로 반환
+def resolve_indicator_families(columns=None, available=()):
+    """
+    available에 이미 있는 컬럼만으로 충족되는 의존 묶음은 건너뜁니다.
+    (직접 요청한 묶음은 항상 다시 계산)
+    """
+    if columns is None:
+        return list(INDICATOR_GRAPH)
+    
+    available = set(available)
+    needed = set()
+    
+    def visit(name, requested):
+        if name in OHLCV_COLUMNS:
+            return
+        family = name if name in INDICATOR_GRAPH else INDICATOR_COLUMN_FAMILY.get(name)
+        if family is None:
+            raise KeyError(f"알 수 없는 지표: {name}")
+        if family in needed:
+            return
+        if not requested and set(INDICATOR_GRAPH[family]['columns']) <= available:
+            return
+        needed.add(family)
+        for dependency in INDICATOR_GRAPH[family]['inputs']:
+            visit(dependency, False)
+    
+    for column in columns:
+        visit(column, True)
+    
+    return [family for family in INDICATOR_GRAPH if family in needed]
+
+# 기술적 지표 계산
+def calculate_indicators(df, columns=None, backend=None, dtype=None):
+    """
+    columns를 지정하면 (예: ["rsi", "macd"]) 해당 컬럼과 그 입력에 필요한 지표만 계산합니다.
+    backend='ta'는 ta 라이브러리로, backend='numpy'는 단일 패스 NumPy 커널로 계산합니다.
+    (기본값은 INDICATOR_BACKEND 환경 변수)
+    """
+    if df is None or df.empty:
+        return None
+    
+    families = resolve_indicator_families(columns, available=df.columns)
+    
+    backend = backend or INDICATOR_BACKEND
+    if backend == 'numpy':
+        return calculate_indicators_numpy(df, dtype or INDICATOR_DTYPE, families)
+    
+    for family in families:
+        with measure(family):
+            INDICATOR_GRAPH[family]['compute'](df)
+    
+    return df
+
+# 기술적 지표 계산 (NumPy 커널 - 대용량 기록용)
+def calculate_indicators_numpy(df, dtype='float64', families=None):
+    dtype = np.dtype(dtype)
+    families = list(INDICATOR_GRAPH) if families is None else families
+    
+    # 1~11. 공통 중간값을 공유하며 한 번에 계산
+    kernel_families = [family for family in families if family != 'fear_greed']
+    with measure("numpy_kernel"):
+        for name, values in compute_indicator_arrays(df, dtype, kernel_families).items():
+            df[name] = values
+    
+    # 12. 공포/탐욕 지수
+    if 'fear_greed' in families:
+        with measure("fear_greed"):
+            df['fear_greed'] = calculate_fear_greed_index(df).astype(dtype)
+    
+    return df
+
+# 지연 계산 지표 프레임 (컬럼에 처음 접근할 때 필요한 지표만 계산)
+class LazyIndicatorFrame:
+    """
+    빠른 가격 확인이나 단일 지표 알림처럼 일부 지표만 쓰는 경우에 사용합니다.
+    
+    사용 예:
+        frame = LazyIndicatorFrame(df)
+        frame['rsi'].iloc[-1]   # RSI만 계산
+        frame['fear_greed']     # RSI는 재사용, 볼린저/이동평균만 추가 계산
+    """
+    
+    def __init__(self, df, backend=None, dtype=None):
+        self.frame = df
+        self.backend = backend
+        self.dtype = dtype
+    
+    def materialize(self, columns):
+        missing = [column for column in columns if column not in self.frame.columns]
+        if missing:
+            calculate_indicators(self.frame, columns=missing, backend=self.backend, dtype=self.dtype)
+        return self.frame
+    
+    def __getitem__(self, column):
+        if isinstance(column, list):
+            return self.materialize(column)[column]
+        return self.materialize([column])[column]
+    
+    def __contains__(self, column):
+        return column in self.frame.columns or column in INDICATOR_COLUMN_FAMILY
+    
+    def __len__(self):
+        return len(self.frame)
+    
+    def __getattr__(self, name):
+        # index, iloc 등은 원본 DataFrame으로 전달
+        return getattr(self.frame, name)
+
+# 지표 계산 코드 지문 (계산식이 바뀌면 캐시 키도 바뀜)
+_indicator_code_fingerprint = None
+
+def get_indicator_code_fingerprint():
+    global _indicator_code_fingerprint
+    if _indicator_code_fingerprint is None:
+        import hashlib
+        import inspect
+        digest = hashlib.sha256()
+        for node in INDICATOR_GRAPH.values():
+            digest.update(inspect.getsource(node['compute']).encode())
+        digest.update(inspect.getsource(calculate_fear_greed_index).encode())
+        digest.update(inspect.getsource(indicator_kernel).encode())
+        _indicator_code_fingerprint = digest.hexdigest()[:16]
+    return _indicator_code_fingerprint
+
+# 기술적 지표 계산 (디스크 캐시 사용)
+def calculate_indicators_cached(df, columns=None, backend=None, dtype=None):
+    """
+    OHLCV 원본과 계산 조건이 이전 실행과 같으면 저장된 결과를 그대로 반환합니다.
+    """
+    if df is None or df.empty:
+        return None
+    if not USE_INDICATOR_CACHE:
+        return calculate_indicators(df, columns=columns, backend=backend, dtype=dtype)
+    
+    backend = backend or INDICATOR_BACKEND
+    dtype = dtype or INDICATOR_DTYPE
+    ta_version = None
+    if backend == 'ta':
+        import ta
+        ta_version = getattr(ta, '__version__', None)
+    params = {
+        'columns': sorted(columns) if columns is not None else None,
+        'backend': backend,
+        'dtype': str(dtype) if backend == 'numpy' else None,
+        'ta_version': ta_version,
+        'code': get_indicator_code_fingerprint(),
+    }
+    
+    try:
+        key = make_cache_key(df[OHLCV_COLUMNS], params)
+        cached = load_cached_frame(key)
+    except Exception as e:
+        print(f"[캐시] 조회 실패: {str(e)[:100]}")
+        key, cached = None, None
+    
+    if cached is not None:
+        print(f"[캐시] 지표 계산 결과 재사용 ({key[:12]})")
+        set_label(indicator_cache="hit")
+        return cached
+    set_label(indicator_cache="miss")
+    
+    df = calculate_indicators(df, columns=columns, backend=backend, dtype=dtype)
+    
+    if key is not None:
+        try:
+            store_cached_frame(key, df)
+        except Exception as e:
+            print(f"[캐시] 저장 실패: {str(e)[:100]}")
     
     return df
 
 # 공포/탐욕 지수 계산 (0-100, 0=극단적 공포, 100=극단적 탐욕)
 def calculate_fear_greed_index(df):
-    fear_greed = pd.Series(index=df.index, dtype=float)
-    
-    for i in range(len(df)):
-        if i < 20:  # 최소 20일 데이터 필요
-            fear_greed.iloc[i] = 50
-            continue
-            
+    """
+    행 단위 반복 없이 전체 구간을 한 번에 계산합니다. (기존 반복문과 동일한 결과)
+    """
+    close = df['close'].to_numpy(dtype=float)
+    volume = df['volume'].to_numpy(dtype=float)
+    rsi = df['rsi'].to_numpy(dtype=float)
+    bb_upper = df['bb_upper'].to_numpy(dtype=float)
+    bb_lower = df['bb_lower'].to_numpy(dtype=float)
+    ma20 = df['ma20'].to_numpy(dtype=float)
+    ma50 = df['ma50'].to_numpy(dtype=float)
+    n = len(close)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
         # RSI 기여도 (30%)
-        rsi = df['rsi'].iloc[i]
-        rsi_score = rsi if not pd.isna(rsi) else 50
+        rsi_score = np.where(np.isnan(rsi), 50.0, rsi)
         
         # 볼린저밴드 위치 기여도 (30%)
-        bb_upper = df['bb_upper'].iloc[i]
-        bb_lower = df['bb_lower'].iloc[i]
-        price = df['close'].iloc[i]
-        if not pd.isna(bb_upper) and not pd.isna(bb_lower) and bb_upper != bb_lower:
-            bb_position = ((price - bb_lower) / (bb_upper - bb_lower)) * 100
-        else:
-            bb_position = 50
+        bb_valid = ~np.isnan(bb_upper) & ~np.isnan(bb_lower) & (bb_upper != bb_lower)
+        bb_position = np.where(bb_valid, ((close - bb_lower) / (bb_upper - bb_lower)) * 100, 50.0)
         
-        # 거래량 추세 기여도 (20%)
-        vol_ma = df['volume'].iloc[max(0, i-20):i].mean()
-        current_vol = df['volume'].iloc[i]
-        vol_ratio = (current_vol / vol_ma * 50) if vol_ma > 0 else 50
-        vol_score = min(100, max(0, vol_ratio))
+        # 거래량 추세 기여도 (20%) - 직전 20일 평균 거래량 (당일 제외)
+        vol_ma = np.full(n, np.nan)
+        if n > 20:
+            windows = np.lib.stride_tricks.sliding_window_view(volume[:-1], 20)
+            counts = (~np.isnan(windows)).sum(axis=1)
+            vol_ma[20:] = np.nansum(windows, axis=1) / np.where(counts > 0, counts, np.nan)
+        vol_ratio = volume / vol_ma * 50
+        vol_score = np.where(vol_ma > 0, np.where(np.isnan(vol_ratio), 0.0, np.clip(vol_ratio, 0, 100)), 50.0)
         
         # 추세 강도 기여도 (20%)
-        ma20 = df['ma20'].iloc[i]
-        ma50 = df['ma50'].iloc[i]
-        if not pd.isna(ma20) and not pd.isna(ma50) and ma50 != 0:
-            trend_score = ((ma20 - ma50) / ma50 * 500) + 50
-            trend_score = min(100, max(0, trend_score))
-        else:
-            trend_score = 50
-        
-        # 종합 점수
-        fear_greed.iloc[i] = (rsi_score * 0.3 + bb_position * 0.3 + 
-                             vol_score * 0.2 + trend_score * 0.2)
+        trend_valid = ~np.isnan(ma20) & ~np.isnan(ma50) & (ma50 != 0)
+        trend_score = np.where(trend_valid, np.clip(((ma20 - ma50) / ma50 * 500) + 50, 0, 100), 50.0)
+    
+    # 종합 점수
+    fear_greed = (rsi_score * 0.3 + bb_position * 0.3 +
+                  vol_score * 0.2 + trend_score * 0.2)
+    
+    # 최소 20일 데이터 필요
+    fear_greed[:20] = 50
     
-    return fear_greed
+    return pd.Series(fear_greed, index=df.index, dtype=float)
+
+# 종합 점수 지표별 가중치 (optimize_weights.py로 탐색 가능)
+SCORE_WEIGHTS = {
+    'rsi': 0.8,          # RSI
+    'macd': 1.0,         # MACD (중요)
+    'ma': 1.2,           # 이동평균선 (매우 중요)
+    'bb': 0.8,           # 볼린저밴드
+    'stoch': 0.6,        # 스토캐스틱
+    'ema': 1.2,          # EMA (중장기 투자에 중요)
+    'obv': 1.0,          # 거래량
+    'adx': 0.8,          # 추세 강도
+    'ichimoku': 1.5,     # 일목균형표 (중장기 투자에 매우 중요)
+    'volatility': 0.5,   # 변동성
+    'fg': 1.0,           # 공포/탐욕 지수
+    'fib': 0.6,          # 피보나치
+}
+
+# 4년 주기 점수 가중치
+CYCLE_SCORE_WEIGHT = 0.5
+
+# 고점 근접도 감점 (peak_score / 10)
+PEAK_PENALTY_DIVISOR = 10
+
+# 종합 점수 구간별 포지션 (위에서부터 처음 만족하는 구간, 모두 미만이면 STRONG_SELL)
+CATEGORY_THRESHOLDS = {
+    "STRONG_BUY": 10,
+    "BUY": 6,
+    "WEAK_BUY": 3,
+    "NEUTRAL_BUY": 1,
+    "NEUTRAL": -1,
+    "NEUTRAL_SELL": -3,
+    "WEAK_SELL": -6,
+    "SELL": -10,
+}
+
+# 고점 근접도 강제 판단 (점수 이상이면 종합 점수와 무관하게 적용)
+PEAK_OVERRIDE_THRESHOLDS = {
+    "STRONG_SELL": 80,
+    "SELL": 60,
+    "WEAK_SELL": 40,
+}
 
 # 시장 위치 분석
-def analyze_market_position(df):
+def analyze_market_position(df, stats=None):
     if df is None or df.empty:
         return "데이터 분석 오류", {}
     
+    # 이동 통계 캐시 (고점 근접도/예상 고점 계산에서 공유)
+    stats = RollingStatsCache.for_frame(df, stats)
+    
     # 최신 데이터 가져오기
     latest = df.iloc[-1]
     
@@ -419,7 +1034,7 @@ def analyze_market_position(df):
         rsi_score = 0  # 관망
     
     indicators["RSI"] = {
-        "value": f"{rsi:.2f}",
+        "value": ({"rsi": rsi}, "{rsi:.2f}"),
         "signal": rsi_signal,
         "score": rsi_score
     }
@@ -446,7 +1061,8 @@ def analyze_market_position(df):
         macd_score = 0  # 관망
     
     indicators["MACD"] = {
-        "value": f"{macd_val:.2f}, 시그널: {macd_signal:.2f}, 히스토그램: {macd_hist:.2f}",
+        "value": ({"macd": macd_val, "signal": macd_signal, "histogram": macd_hist},
+                  "{macd:.2f}, 시그널: {signal:.2f}, 히스토그램: {histogram:.2f}"),
         "signal": macd_signal_text,
         "score": macd_score
     }
@@ -483,7 +1099,8 @@ def analyze_market_position(df):
             ma_text.append("장기적 하락 추세 (가격 < 200일선)")
     
     indicators["이동평균선"] = {
-        "value": f"가격: {price:.2f}, 20일: {ma20:.2f}, 50일: {ma50:.2f}, 200일: {ma200:.2f}",
+        "value": ({"price": price, "ma20": ma20, "ma50": ma50, "ma200": ma200},
+                  "가격: {price:.2f}, 20일: {ma20:.2f}, 50일: {ma50:.2f}, 200일: {ma200:.2f}"),
         "signal": ma_signal,
         "details": ", ".join(ma_text),
         "score": ma_score
@@ -515,9 +1132,10 @@ def analyze_market_position(df):
         bb_score = 0  # 관망
     
     indicators["볼린저 밴드"] = {
-        "value": f"밴드 위치: {bb_position:.1f}%, 밴드폭: {bb_width:.4f}",
+        "value": ({"bb_position": bb_position, "bb_width": bb_width}, "밴드 위치: {bb_position:.1f}%, 밴드폭: {bb_width:.4f}"),
         "signal": bb_signal,
-        "details": f"상단: {bb_upper:.2f}, 중간: {bb_middle:.2f}, 하단: {bb_lower:.2f}",
+        "details": ({"bb_upper": bb_upper, "bb_middle": bb_middle, "bb_lower": bb_lower},
+                    "상단: {bb_upper:.2f}, 중간: {bb_middle:.2f}, 하단: {bb_lower:.2f}"),
         "score": bb_score
     }
     
@@ -548,7 +1166,7 @@ def analyze_market_position(df):
         stoch_score = 0
     
     indicators["스토캐스틱"] = {
-        "value": f"%K: {stoch_k:.2f}, %D: {stoch_d:.2f}",
+        "value": ({"stoch_k": stoch_k, "stoch_d": stoch_d}, "%K: {stoch_k:.2f}, %D: {stoch_d:.2f}"),
         "signal": stoch_signal,
         "score": stoch_score
     }
@@ -582,7 +1200,8 @@ def analyze_market_position(df):
         ema_text.append("지수이동평균선이 혼재된 상태")
     
     indicators["EMA 추세"] = {
-        "value": f"가격: {price:.2f}, 12일: {ema12:.2f}, 26일: {ema26:.2f}, 50일: {ema50:.2f}, 100일: {ema100:.2f}",
+        "value": ({"price": price, "ema12": ema12, "ema26": ema26, "ema50": ema50, "ema100": ema100},
+                  "가격: {price:.2f}, 12일: {ema12:.2f}, 26일: {ema26:.2f}, 50일: {ema50:.2f}, 100일: {ema100:.2f}"),
         "signal": ema_signal,
         "details": ", ".join(ema_text),
         "score": ema_score
@@ -610,7 +1229,7 @@ def analyze_market_position(df):
         obv_score = 0
     
     indicators["거래량(OBV)"] = {
-        "value": f"OBV: {obv:,.0f}, OBV MA: {obv_ma:,.0f}",
+        "value": ({"obv": obv, "obv_ma": obv_ma}, "OBV: {obv:,.0f}, OBV MA: {obv_ma:,.0f}"),
         "signal": obv_signal,
         "score": obv_score
     }
@@ -640,7 +1259,7 @@ def analyze_market_position(df):
         adx_score = 0
     
     indicators["추세강도(ADX)"] = {
-        "value": f"ADX: {adx:.2f}, +DI: {adx_pos:.2f}, -DI: {adx_neg:.2f}",
+        "value": ({"adx": adx, "adx_pos": adx_pos, "adx_neg": adx_neg}, "ADX: {adx:.2f}, +DI: {adx_pos:.2f}, -DI: {adx_neg:.2f}"),
         "signal": adx_signal,
         "score": adx_score
     }
@@ -678,7 +1297,7 @@ def analyze_market_position(df):
         ichimoku_details.append("일목균형표 계산 중")
     
     indicators["일목균형표"] = {
-        "value": f"구름 상단: {cloud_top:.2f}, 구름 하단: {cloud_bottom:.2f}",
+        "value": ({"cloud_top": cloud_top, "cloud_bottom": cloud_bottom}, "구름 상단: {cloud_top:.2f}, 구름 하단: {cloud_bottom:.2f}"),
         "signal": ichimoku_signal,
         "details": ", ".join(ichimoku_details),
         "score": ichimoku_score
@@ -702,7 +1321,7 @@ def analyze_market_position(df):
         volatility_score = 0.5
     
     indicators["변동성(ATR)"] = {
-        "value": f"ATR: {atr:.2f} ({atr_pct:.2f}%)",
+        "value": ({"atr": atr, "atr_pct": atr_pct}, "ATR: {atr:.2f} ({atr_pct:.2f}%)"),
         "signal": volatility_signal,
         "score": volatility_score
     }
@@ -727,7 +1346,7 @@ def analyze_market_position(df):
         fg_score = 2
     
     indicators["공포/탐욕지수"] = {
-        "value": f"{fear_greed:.1f} / 100",
+        "value": ({"fear_greed": fear_greed}, "{fear_greed:.1f} / 100"),
         "signal": fg_signal,
         "score": fg_score
     }
@@ -761,7 +1380,8 @@ def analyze_market_position(df):
         fib_details.append("깊은 되돌림 - 반등 시 매수 기회")
     
     indicators["피보나치"] = {
-        "value": f"23.6%: ${fib_236:.2f}, 38.2%: ${fib_382:.2f}, 50%: ${fib_500:.2f}, 61.8%: ${fib_618:.2f}",
+        "value": ({"fib_236": fib_236, "fib_382": fib_382, "fib_500": fib_500, "fib_618": fib_618},
+                  "23.6%: ${fib_236:.2f}, 38.2%: ${fib_382:.2f}, 50%: ${fib_500:.2f}, 61.8%: ${fib_618:.2f}"),
         "signal": fib_signal,
         "details": ", ".join(fib_details),
         "score": fib_score
@@ -771,41 +1391,43 @@ def analyze_market_position(df):
     cycle_info = analyze_bitcoin_cycle()
     if cycle_info:
         indicators["4년 주기"] = {
-            "value": f"{cycle_info['cycle_position_pct']:.1f}% 경과 ({cycle_info['days_since_halving']}일)",
+            "value": ({"cycle_position_pct": cycle_info['cycle_position_pct'], "days_since_halving": cycle_info['days_since_halving']},
+                      "{cycle_position_pct:.1f}% 경과 ({days_since_halving}일)"),
             "signal": cycle_info['cycle_phase'],
             "score": cycle_info['phase_score'],
-            "details": f"최근 반감기: {cycle_info['last_halving'].strftime('%Y-%m-%d')}"
+            "details": ({"last_halving": cycle_info['last_halving']}, "최근 반감기: {last_halving:%Y-%m-%d}")
         }
     
     # 고점 근접도 분석
-    peak_info = analyze_peak_proximity(df, indicators)
+    peak_info = analyze_peak_proximity(df, indicators, stats)
     if peak_info:
         indicators["고점 근접도"] = {
-            "value": f"{peak_info['peak_score']:.0f}/100점",
+            "value": ({"peak_score": peak_info['peak_score']}, "{peak_score:.0f}/100점"),
             "signal": peak_info['peak_status'],
             "score": -(peak_info['peak_score'] / 20),  # 0~100 -> 0~-5 점수로 변환 (고점 = 매도 신호)
-            "details": f"52주고가: {peak_info['details']['52주 최고가 대비']}, 200일선: {peak_info['details']['200일선 괴리율']}"
+            "details": ({"price_vs_52w_high": peak_info['price_vs_52w_high'], "price_deviation_ma200": peak_info['price_deviation_ma200']},
+                        "52주고가: {price_vs_52w_high:.1f}%, 200일선: +{price_deviation_ma200:.1f}%")
         }
     
     # 종합 점수 계산 (가중치 적용)
     base_score = (
-        rsi_score * 0.8 +           # RSI
-        macd_score * 1.0 +          # MACD (중요)
-        ma_score * 1.2 +            # 이동평균선 (매우 중요)
-        bb_score * 0.8 +            # 볼린저밴드
-        stoch_score * 0.6 +         # 스토캐스틱
-        ema_score * 1.2 +           # EMA (중장기 투자에 중요)
-        obv_score * 1.0 +           # 거래량
-        adx_score * 0.8 +           # 추세 강도
-        ichimoku_score * 1.5 +      # 일목균형표 (중장기 투자에 매우 중요)
-        volatility_score * 0.5 +    # 변동성
-        fg_score * 1.0 +            # 공포/탐욕 지수
-        fib_score * 0.6             # 피보나치
+        rsi_score * SCORE_WEIGHTS['rsi'] +
+        macd_score * SCORE_WEIGHTS['macd'] +
+        ma_score * SCORE_WEIGHTS['ma'] +
+        bb_score * SCORE_WEIGHTS['bb'] +
+        stoch_score * SCORE_WEIGHTS['stoch'] +
+        ema_score * SCORE_WEIGHTS['ema'] +
+        obv_score * SCORE_WEIGHTS['obv'] +
+        adx_score * SCORE_WEIGHTS['adx'] +
+        ichimoku_score * SCORE_WEIGHTS['ichimoku'] +
+        volatility_score * SCORE_WEIGHTS['volatility'] +
+        fg_score * SCORE_WEIGHTS['fg'] +
+        fib_score * SCORE_WEIGHTS['fib']
     )
     
     # 사이클 및 고점 근접도 반영
-    cycle_score = cycle_info['phase_score'] * 0.5 if cycle_info else 0  # 사이클 점수 가중치 낮춤 (2.0 → 0.5)
-    peak_penalty = -(peak_info['peak_score'] / 10) if peak_info else 0  # 고점 근접 시 큰 감점
+    cycle_score = cycle_info['phase_score'] * CYCLE_SCORE_WEIGHT if cycle_info else 0
+    peak_penalty = -(peak_info['peak_score'] / PEAK_PENALTY_DIVISOR) if peak_info else 0  # 고점 근접 시 큰 감점
     
     total_score = base_score + cycle_score + peak_penalty
     
@@ -816,17 +1438,17 @@ def analyze_market_position(df):
     
     # 고점 근접 시 강제 매도 신호 (최우선 판단)
     # 고점 근접도가 매우 높으면 다른 지표와 무관하게 매도 권장
-    if peak_info and peak_info['peak_score'] >= 80:
+    if peak_info and peak_info['peak_score'] >= PEAK_OVERRIDE_THRESHOLDS["STRONG_SELL"]:
         final_position = "🔴 적극 매도 (고점 경고!)"
         position_category = "STRONG_SELL"
         recommendation = f"⚠️ 고점 근접도 {peak_info['peak_score']:.0f}점! 역사적으로 이런 과열 신호는 곧 조정이 옵니다. {peak_info['sell_recommendation']}"
         action = "즉시 분할 매도 시작 (보유 물량의 80-100%)"
-    elif peak_info and peak_info['peak_score'] >= 60:
+    elif peak_info and peak_info['peak_score'] >= PEAK_OVERRIDE_THRESHOLDS["SELL"]:
         final_position = "🔴 매도 (과열 경고)"
         position_category = "SELL"
         recommendation = f"⚠️ 고점 근접도 {peak_info['peak_score']:.0f}점! 심각한 과열 구간입니다. {peak_info['sell_recommendation']}"
         action = "적극 분할 매도 (보유 물량의 50-70%)"
-    elif peak_info and peak_info['peak_score'] >= 40:
+    elif peak_info and peak_info['peak_score'] >= PEAK_OVERRIDE_THRESHOLDS["WEAK_SELL"]:
         # 고점 근접 시 매도 신호 강화
         if total_score > 0:  # 원래 매수 신호였어도
             final_position = "🟠 분할 매도 시작"
@@ -839,42 +1461,42 @@ def analyze_market_position(df):
             recommendation = f"고점 근접도 {peak_info['peak_score']:.0f}점! 과열 신호 감지. {peak_info['sell_recommendation']}"
             action = "분할 매도로 리스크 축소"
     # 일반적인 판단 (고점 근접도가 낮을 때)
-    elif total_score >= 10:
+    elif total_score >= CATEGORY_THRESHOLDS["STRONG_BUY"]:
         final_position = "🟢 적극 매수 (강력 추천)"
         position_category = "STRONG_BUY"
         recommendation = "대부분의 지표가 매우 강한 매수 신호를 보내고 있습니다. 중장기적으로 상승 추세가 명확하며, 적극적인 매수 진입을 권장합니다."
         action = "분할 매수 또는 일괄 매수 진행"
-    elif total_score >= 6:
+    elif total_score >= CATEGORY_THRESHOLDS["BUY"]:
         final_position = "🟢 매수 (추천)"
         position_category = "BUY"
         recommendation = "다수의 지표가 매수 신호를 보내고 있습니다. 상승 추세가 형성되고 있으며, 매수 진입을 고려할 시점입니다."
         action = "분할 매수로 포지션 구축"
-    elif total_score >= 3:
+    elif total_score >= CATEGORY_THRESHOLDS["WEAK_BUY"]:
         final_position = "🟡 약한 매수 (신중)"
         position_category = "WEAK_BUY"
         recommendation = "일부 지표가 매수 신호를 보내고 있으나 확신이 부족합니다. 소량 매수 후 추가 신호 확인을 권장합니다."
         action = "소량 매수 후 관망, 추가 상승 시 증액"
-    elif total_score >= 1:
+    elif total_score >= CATEGORY_THRESHOLDS["NEUTRAL_BUY"]:
         final_position = "⚪ 중립-매수 편향"
         position_category = "NEUTRAL_BUY"
         recommendation = "매수 신호가 약하게 감지됩니다. 명확한 추세 확인 후 진입하는 것이 안전합니다."
         action = "관망 우선, 강한 매수 신호 포착 시 진입"
-    elif total_score >= -1:
+    elif total_score >= CATEGORY_THRESHOLDS["NEUTRAL"]:
         final_position = "⚪ 중립 (관망)"
         position_category = "NEUTRAL"
         recommendation = "혼합된 신호가 나타나고 있으며 방향성이 불확실합니다. 명확한 추세가 나타날 때까지 관망을 권장합니다."
         action = "현재 포지션 유지, 신규 진입 보류"
-    elif total_score >= -3:
+    elif total_score >= CATEGORY_THRESHOLDS["NEUTRAL_SELL"]:
         final_position = "⚪ 중립-매도 편향"
         position_category = "NEUTRAL_SELL"
         recommendation = "매도 신호가 약하게 감지됩니다. 보유 중이라면 일부 차익실현을 고려할 수 있습니다."
         action = "일부 차익실현 고려, 손절매 라인 점검"
-    elif total_score >= -6:
+    elif total_score >= CATEGORY_THRESHOLDS["WEAK_SELL"]:
         final_position = "🟠 약한 매도"
         position_category = "WEAK_SELL"
         recommendation = "일부 지표가 매도 신호를 보내고 있습니다. 보유 중이라면 일부 매도를 고려하고, 신규 진입은 피해야 합니다."
         action = "분할 매도로 리스크 축소, 신규 매수 금지"
-    elif total_score >= -10:
+    elif total_score >= CATEGORY_THRESHOLDS["SELL"]:
         final_position = "🔴 매도 (권장)"
         position_category = "SELL"
         recommendation = "다수의 지표가 매도 신호를 보내고 있습니다. 하락 추세가 형성되고 있으며, 보유 자산 매도를 권장합니다."
@@ -886,15 +1508,188 @@ def analyze_market_position(df):
         action = "보유 중이라면 즉시 매도, 추가 하락 대비"
     
     # 목표가 및 손절가 계산
-    targets = calculate_price_targets(df, latest, position_category)
+    targets = calculate_price_targets(df, latest, position_category, stats)
+    
+    return AnalysisResult(
+        generated_at=get_kst_now(),
+        candle_time=df.index[-1],
+        price=price,
+        position_category=position_category,
+        final_position=final_position,
+        recommendation=recommendation,
+        action=action,
+        base_score=base_score,
+        total_score=total_score,
+        indicators=indicators,
+        targets=targets,
+        cycle_info=cycle_info,
+        peak_info=peak_info,
+    )
+
+# 시장 위치 분석 - 전체 구간 (봉마다 지표 점수, 종합 점수, 포지션)
+def analyze_market_position_history(df, stats=None, cycle="now"):
+    """
+    analyze_market_position의 점수 규칙을 모든 봉에 한 번에 적용합니다.
+    각 지표 점수, base_score, cycle_score, peak_score, total_score,
+    position_category 컬럼을 가진 DataFrame을 반환하며
+    마지막 행은 analyze_market_position의 결과와 같습니다.
+    cycle: "now"면 4년 주기 점수를 analyze_market_position과 같이 현재 시점 기준으로,
+           "bar"면 봉 날짜별 주기 위치(analyze_bitcoin_cycle_history) 기준으로 계산
+    """
+    stats = RollingStatsCache.for_frame(df, stats)
+    col = stats.column
+    price = col('close')
+    prev = lambda values: np.concatenate([[np.nan], values[:-1]])
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 1. RSI
+        rsi = col('rsi')
+        rsi_score = np.select([rsi > 70, rsi > 60, rsi < 30, rsi < 40], [-2, -1, 2, 1], 0)
+        
+        # 2. MACD (직전 봉 히스토그램과 비교)
+        macd, macd_signal, macd_hist = col('macd'), col('macd_signal'), col('macd_histogram')
+        macd_up = (macd > macd_signal) & (macd_hist > 0)
+        macd_down = (macd < macd_signal) & (macd_hist < 0)
+        macd_hist_prev = prev(macd_hist)
+        macd_score = np.select(
+            [macd_up & (macd_hist > macd_hist_prev), macd_up, macd_down & (macd_hist < macd_hist_prev), macd_down],
+            [2, 1, -2, -1], 0)
+        
+        # 3. 이동평균선
+        ma20, ma50, ma200 = col('ma20'), col('ma50'), col('ma200')
+        ma_score = np.select([
+            (price > ma20) & (ma20 > ma50) & (ma50 > ma200),
+            (price > ma20) & (price > ma50) & (price > ma200),
+            (price < ma20) & (ma20 < ma50) & (ma50 < ma200),
+            (price < ma20) & (price < ma50) & (price < ma200),
+        ], [2, 1, -2, -1], 0)
+        
+        # 4. 볼린저 밴드
+        bb_upper, bb_lower = col('bb_upper'), col('bb_lower')
+        bb_range = bb_upper - bb_lower
+        bb_position = np.where(bb_range > 0, ((price - bb_lower) / bb_range) * 100, 50)
+        bb_score = np.select([bb_position > 90, bb_position > 75, bb_position < 10, bb_position < 25], [-2, -1, 2, 1], 0)
+        
+        # 5. 스토캐스틱
+        stoch_k, stoch_d = col('stoch_k'), col('stoch_d')
+        stoch_score = np.select([
+            (stoch_k > 80) & (stoch_d > 80),
+            (stoch_k > 70) & (stoch_d > 70),
+            (stoch_k < 20) & (stoch_d < 20),
+            (stoch_k < 30) & (stoch_d < 30),
+            (stoch_k > stoch_d) & (stoch_k < 50),
+            (stoch_k < stoch_d) & (stoch_k > 50),
+        ], [-2, -1, 2, 1, 0.5, -0.5], 0)
+        
+        # 6. EMA 추세
+        ema12, ema26, ema50, ema100 = col('ema12'), col('ema26'), col('ema50'), col('ema100')
+        ema_score = np.select([
+            (price > ema12) & (ema12 > ema26) & (ema26 > ema50) & (ema50 > ema100),
+            (price > ema50) & (ema50 > ema100),
+            (price < ema12) & (ema12 < ema26) & (ema26 < ema50) & (ema50 < ema100),
+            (price < ema50) & (ema50 < ema100),
+        ], [2, 1.5, -2, -1.5], 0)
+        
+        # 7. 거래량 (OBV, 직전 봉과 비교)
+        obv, obv_ma = col('obv'), col('obv_ma')
+        obv_prev = prev(obv)
+        obv_score = np.select([
+            (obv > obv_ma) & (obv > obv_prev),
+            obv > obv_ma,
+            (obv < obv_ma) & (obv < obv_prev),
+            obv < obv_ma,
+        ], [1.5, 1, -1.5, -1], 0)
+        
+        # 8. 추세 강도 (ADX)
+        adx, adx_pos, adx_neg = col('adx'), col('adx_pos'), col('adx_neg')
+        adx_score = np.select([
+            (adx > 25) & (adx_pos > adx_neg),
+            (adx > 25) & (adx_neg > adx_pos),
+        ], [np.where(adx > 40, 1.5, 1), np.where(adx > 40, -1.5, -1)], 0)
+        
+        # 9. 일목균형표 (구름 값이 없으면 현재가 사용)
+        ichimoku_a, ichimoku_b = col('ichimoku_a'), col('ichimoku_b')
+        cloud_valid = ~np.isnan(ichimoku_a) & ~np.isnan(ichimoku_b)
+        cloud_top = np.where(cloud_valid, np.maximum(ichimoku_a, ichimoku_b), price)
+        cloud_bottom = np.where(cloud_valid, np.minimum(ichimoku_a, ichimoku_b), price)
+        ichimoku_score = np.select([price > cloud_top, price < cloud_bottom], [2, -2], 0)
+        
+        # 10. 변동성 (ATR)
+        atr_pct = np.where(price > 0, col('atr') / price * 100, 0)
+        volatility_score = np.select([atr_pct > 5, atr_pct > 3, atr_pct > 1.5], [-0.5, -0.25, 0], 0.5)
+        
+        # 11. 공포/탐욕 지수
+        fear_greed = col('fear_greed')
+        fg_score = np.select([fear_greed >= 75, fear_greed >= 60, fear_greed >= 40, fear_greed >= 25], [-2, -1, 0, 1], 2)
+        
+        # 12. 피보나치
+        fib_score = np.select([
+            price > col('fib_236'),
+            price > col('fib_382'),
+            price > col('fib_500'),
+            price > col('fib_618'),
+        ], [1, 0.5, 0, -0.5], 1)
+    
+    scores = {
+        'rsi': rsi_score,
+        'macd': macd_score,
+        'ma': ma_score,
+        'bb': bb_score,
+        'stoch': stoch_score,
+        'ema': ema_score,
+        'obv': obv_score,
+        'adx': adx_score,
+        'ichimoku': ichimoku_score,
+        'volatility': volatility_score,
+        'fg': fg_score,
+        'fib': fib_score,
+    }
     
-    return final_position, indicators, recommendation, total_score, action, targets, cycle_info, peak_info
+    # 종합 점수 (analyze_market_position과 같은 가중치와 합산 순서)
+    base_score = 0
+    for name, weight in SCORE_WEIGHTS.items():
+        base_score = base_score + scores[name] * weight
+    
+    if cycle == "bar":
+        phase_score = analyze_bitcoin_cycle_history(df.index)['phase_score'].to_numpy()
+        cycle_score = np.nan_to_num(phase_score) * CYCLE_SCORE_WEIGHT
+    else:
+        cycle_info = analyze_bitcoin_cycle()
+        cycle_score = np.full(len(price), cycle_info['phase_score'] * CYCLE_SCORE_WEIGHT if cycle_info else 0)
+    peak_score = analyze_peak_proximity_history(df, stats)['peak_score'].to_numpy()
+    
+    total_score = base_score + cycle_score + -(peak_score / PEAK_PENALTY_DIVISOR)
+    
+    # 포지션 판단 (고점 근접도 우선, 그 다음 종합 점수 구간)
+    conditions = [peak_score >= threshold for threshold in PEAK_OVERRIDE_THRESHOLDS.values()]
+    conditions += [total_score >= threshold for threshold in CATEGORY_THRESHOLDS.values()]
+    categories = list(PEAK_OVERRIDE_THRESHOLDS) + list(CATEGORY_THRESHOLDS)
+    position_category = np.select(conditions, categories, "STRONG_SELL")
+    
+    history = pd.DataFrame({f'{name}_score': score for name, score in scores.items()}, index=df.index)
+    return history.assign(
+        base_score=base_score,
+        cycle_score=cycle_score,
+        peak_score=peak_score,
+        total_score=total_score,
+        position_category=position_category,
+    )
+
+# 예상 고점 항목별 가중치 (peak_accuracy.py로 과거 데이터에서 재추정 가능)
+PEAK_BLEND_WEIGHTS = {
+    'bb_peak': 0.20,          # 볼린저 비중 축소
+    'high_52w_peak': 0.25,    # 52주 고점 비중 증가
+    'trend_peak': 0.25,       # 추세 비중 증가
+    'volatility_peak': 0.15,  # 변동성 유지
+    'ma200_peak': 0.15,       # 200일선 비중 축소 (너무 높게 나옴)
+}
 
 # 고점 예측 함수 (각종 지표 기반)
-def predict_peak_price(df, latest):
+def predict_peak_price(df, latest, stats=None):
     """
     여러 기술 지표를 종합하여 예상 고점을 계산
     """
+    stats = RollingStatsCache.for_frame(df, stats)
     price = latest['close']
     bb_upper = latest['bb_upper']
     
@@ -903,17 +1698,16 @@ def predict_peak_price(df, latest):
     bb_predicted_peak = bb_upper + (bb_width * 0.3)  # 밴드 폭의 30% 추가 상승 여력
     
     # 2. 52주 최고가 기반 예측
-    high_52w = df['high'].tail(365).max()
+    high_52w = stats.last('max', 'high', 365)
     if price > high_52w * 0.95:  # 현재가가 52주 고점 근처라면
         peak_from_52w = high_52w * 1.05  # 5% 돌파 여력
     else:
         peak_from_52w = high_52w * 1.02  # 2% 돌파 여력
     
     # 3. 최근 추세선 연장 예측
-    recent_highs = df['high'].tail(30)
-    if len(recent_highs) >= 10:
+    if min(len(df), 30) >= 10:
         # 최근 30일 고점들의 상승 추세
-        recent_max = recent_highs.max()
+        recent_max = stats.last('max', 'high', 30)
         # 현재가가 고점에 얼마나 가까운지에 따라
         price_to_recent_high = (price / recent_max) * 100
         if price_to_recent_high > 98:  # 고점 매우 근접
@@ -959,11 +1753,11 @@ def predict_peak_price(df, latest):
     
     # 모든 예측값의 가중 평균
     predicted_peak = (
-        bb_predicted_peak * 0.20 +     # 볼린저 비중 축소
-        peak_from_52w * 0.25 +         # 52주 고점 비중 증가
-        trend_peak * 0.25 +            # 추세 비중 증가
-        volatility_peak * 0.15 +       # 변동성 유지
-        ma200_peak * 0.15              # 200일선 비중 축소 (너무 높게 나옴)
+        bb_predicted_peak * PEAK_BLEND_WEIGHTS['bb_peak'] +
+        peak_from_52w * PEAK_BLEND_WEIGHTS['high_52w_peak'] +
+        trend_peak * PEAK_BLEND_WEIGHTS['trend_peak'] +
+        volatility_peak * PEAK_BLEND_WEIGHTS['volatility_peak'] +
+        ma200_peak * PEAK_BLEND_WEIGHTS['ma200_peak']
     ) * rsi_multiplier
     
     # 현실성 체크: 현재가의 최소 +5%, 최대 +80%
@@ -981,8 +1775,84 @@ def predict_peak_price(df, latest):
         'confidence': 'high' if rsi < 70 and price_to_ma200 < 30 else 'medium' if rsi < 80 else 'low'
     }
 
+# 예상 고점 전체 구간 계산 (predict_peak_price와 같은 기준, 봉마다)
+def predict_peak_price_history(df, stats=None):
+    """predict_peak_price의 predicted_peak을 모든 봉에 대해 계산한 배열 반환"""
+    return predict_peak_components_history(df, stats)['predicted_peak'].to_numpy()
+
+# 예상 고점 항목별 전체 구간 계산
+def predict_peak_components_history(df, stats=None):
+    """
+    predict_peak_price의 항목별 예상 고점(bb_peak, high_52w_peak, trend_peak,
+    volatility_peak, ma200_peak), rsi_multiplier, predicted_peak, confidence를
+    봉마다 계산한 DataFrame 반환 (마지막 행은 predict_peak_price와 동일)
+    """
+    stats = RollingStatsCache.for_frame(df, stats)
+    price = stats.column('close')
+    bb_upper = stats.column('bb_upper')
+    bb_lower = stats.column('bb_lower')
+    atr = stats.column('atr')
+    ma200 = stats.column('ma200')
+    rsi = stats.column('rsi')
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 1. 볼린저 밴드 확장
+        bb_predicted_peak = bb_upper + ((bb_upper - bb_lower) * 0.3)
+        
+        # 2. 52주 최고가
+        high_52w = stats.max('high', 365)
+        peak_from_52w = np.where(price > high_52w * 0.95, high_52w * 1.05, high_52w * 1.02)
+        
+        # 3. 최근 30봉 고점 추세 (10봉 미만이면 현재가 기준)
+        recent_max = stats.max('high', 30)
+        price_to_recent_high = (price / recent_max) * 100
+        trend_peak = np.select(
+            [price_to_recent_high > 98, price_to_recent_high > 95],
+            [recent_max * 1.15, recent_max * 1.12], recent_max * 1.08)
+        trend_peak[:9] = price[:9] * 1.12
+        
+        # 4. ATR 변동성
+        volatility_peak = price + (atr * 4)
+        
+        # 5. 200일선 괴리
+        price_to_ma200 = (price / ma200 - 1) * 100
+        ma200_peak = np.select(
+            [price_to_ma200 > 80, price_to_ma200 > 50, price_to_ma200 > 30, price_to_ma200 > 15],
+            [price * 1.05, price * 1.12, price * 1.20, price * 1.30], price * 1.40)
+        
+        # 6. RSI 조정
+        rsi_multiplier = np.select([rsi > 85, rsi > 75, rsi > 65, rsi > 50], [0.85, 0.95, 1.0, 1.05], 1.15)
+    
+    components = {
+        'bb_peak': bb_predicted_peak,
+        'high_52w_peak': peak_from_52w,
+        'trend_peak': trend_peak,
+        'volatility_peak': volatility_peak,
+        'ma200_peak': ma200_peak,
+    }
+    
+    blended = 0
+    for name, weight in PEAK_BLEND_WEIGHTS.items():
+        blended = blended + components[name] * weight
+    predicted_peak = blended * rsi_multiplier
+    
+    # 현실성 체크: 현재가의 +5% ~ +80% (값이 없으면 +5%)
+    min_peak = price * 1.05
+    max_peak = price * 1.80
+    predicted_peak = np.where(np.isnan(predicted_peak), min_peak, np.maximum(min_peak, np.minimum(predicted_peak, max_peak)))
+    
+    confidence = np.select([(rsi < 70) & (price_to_ma200 < 30), rsi < 80], ['high', 'medium'], 'low')
+    
+    return pd.DataFrame({
+        **components,
+        'rsi_multiplier': rsi_multiplier,
+        'predicted_peak': predicted_peak,
+        'confidence': confidence,
+    }, index=df.index)
+
 # 목표가 및 손절가 계산
-def calculate_price_targets(df, latest, position_category):
+def calculate_price_targets(df, latest, position_category, stats=None, mode=None):
+    mode = TARGET_MODE if mode is None else mode
     price = latest['close']
     atr = latest['atr']
     bb_upper = latest['bb_upper']
@@ -991,87 +1861,100 @@ def calculate_price_targets(df, latest, position_category):
     fib_236 = latest['fib_236']
     fib_618 = latest['fib_618']
     
+    # 목표가 값은 (원본 값 dict, 표시 형식) 쌍 - 표시 문자열은 format_display_value로 생성
     targets = {}
     
     if position_category in ["STRONG_BUY", "BUY"]:
         # 강력 매수 시나리오 - 공격적 목표가
-        targets["entry_zone"] = f"${price * 0.97:.2f} - ${price * 1.03:.2f}"
-        targets["target_1"] = f"${price * 1.15:.2f} (1차 목표 +15%)"
-        targets["target_2"] = f"${price * 1.30:.2f} (2차 목표 +30%)"
-        targets["target_3"] = f"${price * 1.50:.2f} (3차 목표 +50%)"
-        targets["target_4"] = f"${price * 2.00:.2f} (최종 목표 +100%)"
-        targets["stop_loss"] = f"${max(bb_lower, price * 0.88, ma200 * 0.95):.2f} (손절 -12%)"
+        targets["entry_zone"] = ({"low": price * 0.97, "high": price * 1.03}, "${low:.2f} - ${high:.2f}")
+        targets["target_1"] = ({"price": price * 1.15}, "${price:.2f} (1차 목표 +15%)")
+        targets["target_2"] = ({"price": price * 1.30}, "${price:.2f} (2차 목표 +30%)")
+        targets["target_3"] = ({"price": price * 1.50}, "${price:.2f} (3차 목표 +50%)")
+        targets["target_4"] = ({"price": price * 2.00}, "${price:.2f} (최종 목표 +100%)")
+        targets["stop_loss"] = ({"price": max(bb_lower, price * 0.88, ma200 * 0.95)}, "${price:.2f} (손절 -12%)")
         targets["risk_reward"] = "1:4.2 (고수익 전략)"
         
     elif position_category in ["WEAK_BUY", "NEUTRAL_BUY"]:
         # 약한 매수 시나리오 - 중간 공격적
-        targets["entry_zone"] = f"${price * 0.97:.2f} - ${price * 1.03:.2f}"
-        targets["target_1"] = f"${price * 1.10:.2f} (1차 목표 +10%)"
-        targets["target_2"] = f"${price * 1.20:.2f} (2차 목표 +20%)"
-        targets["target_3"] = f"${price * 1.35:.2f} (3차 목표 +35%)"
-        targets["stop_loss"] = f"${max(bb_lower, price * 0.90, ma200 * 0.97):.2f} (손절 -10%)"
+        targets["entry_zone"] = ({"low": price * 0.97, "high": price * 1.03}, "${low:.2f} - ${high:.2f}")
+        targets["target_1"] = ({"price": price * 1.10}, "${price:.2f} (1차 목표 +10%)")
+        targets["target_2"] = ({"price": price * 1.20}, "${price:.2f} (2차 목표 +20%)")
+        targets["target_3"] = ({"price": price * 1.35}, "${price:.2f} (3차 목표 +35%)")
+        targets["stop_loss"] = ({"price": max(bb_lower, price * 0.90, ma200 * 0.97)}, "${price:.2f} (손절 -10%)")
         targets["risk_reward"] = "1:3.5 (균형 전략)"
         
     elif position_category in ["STRONG_SELL", "SELL"]:
         # 강력 매도 시나리오 - 고점 예측 기반 분할 매도
-        peak_prediction = predict_peak_price(df, latest)
+        peak_prediction = predict_peak_price(df, latest, stats)
         predicted_peak = peak_prediction['predicted_peak']
         confidence = peak_prediction['confidence']
         
         # 예상 고점 기준 분할 매도 구간 설정
-        targets["predicted_peak"] = f"${predicted_peak:.2f} (예상 고점 - {confidence} 신뢰도)"
-        targets["exit_stage_1"] = f"${price:.2f} (즉시 30% 매도 - 현재가)"
-        targets["exit_stage_2"] = f"${(predicted_peak * 0.85):.2f} (추가 30% 매도 - 예상고점 85%)"
-        targets["exit_stage_3"] = f"${(predicted_peak * 0.95):.2f} (추가 30% 매도 - 예상고점 95%)"
-        targets["exit_stage_4"] = f"${predicted_peak:.2f} (최종 10% 매도 - 예상고점 도달)"
+        targets["predicted_peak"] = ({"price": predicted_peak, "confidence": confidence}, "${price:.2f} (예상 고점 - {confidence} 신뢰도)")
+        targets["exit_stage_1"] = ({"price": price}, "${price:.2f} (즉시 30% 매도 - 현재가)")
+        targets["exit_stage_2"] = ({"price": predicted_peak * 0.85}, "${price:.2f} (추가 30% 매도 - 예상고점 85%)")
+        targets["exit_stage_3"] = ({"price": predicted_peak * 0.95}, "${price:.2f} (추가 30% 매도 - 예상고점 95%)")
+        targets["exit_stage_4"] = ({"price": predicted_peak}, "${price:.2f} (최종 10% 매도 - 예상고점 도달)")
         
         # 기술 지표별 예상 고점 상세
         targets["indicator_peaks"] = (
-            f"볼린저: ${peak_prediction['bb_peak']:.0f} | "
-            f"52주고점: ${peak_prediction['high_52w_peak']:.0f} | "
-            f"추세: ${peak_prediction['trend_peak']:.0f} | "
-            f"변동성: ${peak_prediction['volatility_peak']:.0f}"
+            {name: peak_prediction[name] for name in ('bb_peak', 'high_52w_peak', 'trend_peak', 'volatility_peak')},
+            "볼린저: ${bb_peak:.0f} | 52주고점: ${high_52w_peak:.0f} | 추세: ${trend_peak:.0f} | 변동성: ${volatility_peak:.0f}"
         )
         
         # 현재가 대비 예상 고점까지 상승 여력
         upside_potential = ((predicted_peak / price - 1) * 100)
-        targets["upside_to_peak"] = f"+{upside_potential:.1f}% (현재가 → 예상 고점)"
+        targets["upside_to_peak"] = ({"pct": upside_potential}, "+{pct:.1f}% (현재가 → 예상 고점)")
         
         # 지지선 (하락 시)
-        targets["support_1"] = f"${max(bb_lower, price * 0.88):.2f} (1차 지지선)"
-        targets["support_2"] = f"${price * 0.80:.2f} (2차 지지선)"
-        targets["support_3"] = f"${price * 0.70:.2f} (3차 지지선)"
-        targets["reentry_zone"] = f"${min(fib_618, price * 0.70):.2f} 근처 (재진입 고려)"
+        targets["support_1"] = ({"price": max(bb_lower, price * 0.88)}, "${price:.2f} (1차 지지선)")
+        targets["support_2"] = ({"price": price * 0.80}, "${price:.2f} (2차 지지선)")
+        targets["support_3"] = ({"price": price * 0.70}, "${price:.2f} (3차 지지선)")
+        targets["reentry_zone"] = ({"price": min(fib_618, price * 0.70)}, "${price:.2f} 근처 (재진입 고려)")
         
     elif position_category in ["WEAK_SELL", "NEUTRAL_SELL"]:
         # 약한 매도 시나리오 - 고점 예측 기반
-        peak_prediction = predict_peak_price(df, latest)
+        peak_prediction = predict_peak_price(df, latest, stats)
         predicted_peak = peak_prediction['predicted_peak']
         confidence = peak_prediction['confidence']
         
         # 예상 고점 기준 보수적 분할 매도
-        targets["predicted_peak"] = f"${predicted_peak:.2f} (예상 고점 - {confidence} 신뢰도)"
-        targets["exit_stage_1"] = f"${(predicted_peak * 0.90):.2f} (1차 매도 20% - 예상고점 90%)"
-        targets["exit_stage_2"] = f"${(predicted_peak * 0.95):.2f} (2차 매도 30% - 예상고점 95%)"
-        targets["exit_stage_3"] = f"${predicted_peak:.2f} (3차 매도 30% - 예상고점 도달)"
-        targets["exit_stage_4"] = f"${(predicted_peak * 1.03):.2f} (최종 20% - 예상고점 초과 시)"
+        targets["predicted_peak"] = ({"price": predicted_peak, "confidence": confidence}, "${price:.2f} (예상 고점 - {confidence} 신뢰도)")
+        targets["exit_stage_1"] = ({"price": predicted_peak * 0.90}, "${price:.2f} (1차 매도 20% - 예상고점 90%)")
+        targets["exit_stage_2"] = ({"price": predicted_peak * 0.95}, "${price:.2f} (2차 매도 30% - 예상고점 95%)")
+        targets["exit_stage_3"] = ({"price": predicted_peak}, "${price:.2f} (3차 매도 30% - 예상고점 도달)")
+        targets["exit_stage_4"] = ({"price": predicted_peak * 1.03}, "${price:.2f} (최종 20% - 예상고점 초과 시)")
         
         # 상승 여력
         upside_potential = ((predicted_peak / price - 1) * 100)
-        targets["upside_to_peak"] = f"+{upside_potential:.1f}% (현재가 → 예상 고점)"
+        targets["upside_to_peak"] = ({"pct": upside_potential}, "+{pct:.1f}% (현재가 → 예상 고점)")
         
         # 지지선
-        targets["support_1"] = f"${max(bb_lower, price * 0.92):.2f} (1차 지지선)"
-        targets["support_2"] = f"${price * 0.85:.2f} (2차 지지선)"
-        targets["support_3"] = f"${price * 0.78:.2f} (3차 지지선)"
-        targets["reentry_zone"] = f"${min(fib_618, price * 0.80):.2f} 근처 (재진입 고려)"
+        targets["support_1"] = ({"price": max(bb_lower, price * 0.92)}, "${price:.2f} (1차 지지선)")
+        targets["support_2"] = ({"price": price * 0.85}, "${price:.2f} (2차 지지선)")
+        targets["support_3"] = ({"price": price * 0.78}, "${price:.2f} (3차 지지선)")
+        targets["reentry_zone"] = ({"price": min(fib_618, price * 0.80)}, "${price:.2f} 근처 (재진입 고려)")
         
     else:
         # 중립 시나리오
-        targets["current_range"] = f"${bb_lower:.2f} - ${bb_upper:.2f}"
-        targets["watch_level_up"] = f"${bb_upper:.2f} 돌파 시 매수 신호"
-        targets["watch_level_down"] = f"${bb_lower:.2f} 이탈 시 매도 신호"
-        targets["key_support"] = f"${ma200:.2f} (200일 이평선)"
+        targets["current_range"] = ({"low": bb_lower, "high": bb_upper}, "${low:.2f} - ${high:.2f}")
+        targets["watch_level_up"] = ({"price": bb_upper}, "${price:.2f} 돌파 시 매수 신호")
+        targets["watch_level_down"] = ({"price": bb_lower}, "${price:.2f} 이탈 시 매도 신호")
+        targets["key_support"] = ({"price": ma200}, "${price:.2f} (200일 이평선)")
+    
+    # 몬테카를로 목표가 (도달 확률 기준)
+    if mode == "monte_carlo":
+        mc = monte_carlo_targets(df)
+        if mc:
+            horizon = mc['horizon']
+            targets["mc_expected_peak"] = ({"price": mc['expected_peak'], "horizon": horizon}, "${price:.2f} ({horizon}일 확률 가중 고점)")
+            for i, (level, probability, before_stop) in enumerate(mc['targets'], 1):
+                targets[f"mc_target_{i}"] = ({"price": level, "probability": probability, "before_stop": before_stop},
+                                            "${price:.2f} (도달 확률 {probability:.0%}, 손절 전 {before_stop:.0%})")
+            stop_level, stop_probability = mc['stop_loss']
+            targets["mc_stop_loss"] = ({"price": stop_level, "probability": stop_probability}, "${price:.2f} (이탈 확률 {probability:.0%})")
+            low, _, high = mc['final_range']
+            targets["mc_range"] = ({"low": low, "high": high, "horizon": horizon}, "${low:.2f} - ${high:.2f} ({horizon}일 후 90% 구간)")
     
     return targets
 
@@ -1102,7 +1985,7 @@ def create_indicator_html(title, data, color):
                                             <table border="0" cellpadding="0" cellspacing="0" width="100%">
                                                 <tr>
                                                     <td width="70%" style="font-size: 14px; color: #555555; padding: 5px 0;">
-                                                        현재 수치: <span style="font-family: 'Courier New', monospace; font-weight: bold;">{data.get('value', 'N/A')}</span>
+                                                        현재 수치: <span style="font-family: 'Courier New', monospace; font-weight: bold;">{format_display_value(data.get('value', 'N/A'))}</span>
                                                     </td>
                                                     <td width="30%" style="font-size: 14px; text-align: right; font-weight: bold; color: {color};">
                                                         {data.get('signal', 'N/A')}
@@ -1128,7 +2011,7 @@ def create_indicator_html_with_details(title, data, color):
                                             <table border="0" cellpadding="0" cellspacing="0" width="100%">
                                                 <tr>
                                                     <td style="font-size: 14px; color: #555555; padding: 5px 0;">
-                                                        <span style="font-family: 'Courier New', monospace; font-weight: bold;">{data.get('value', 'N/A')}</span>
+                                                        <span style="font-family: 'Courier New', monospace; font-weight: bold;">{format_display_value(data.get('value', 'N/A'))}</span>
                                                     </td>
                                                 </tr>
                                                 <tr>
@@ -1138,7 +2021,7 @@ def create_indicator_html_with_details(title, data, color):
                                                 </tr>
                                                 <tr>
                                                     <td style="font-size: 12px; color: #777777; padding: 5px 0; font-style: italic;">
-                                                        {data.get('details', '')}
+                                                        {format_display_value(data.get('details', ''))}
                                                     </td>
                                                 </tr>
                                             </table>
@@ -1147,31 +2030,8 @@ def create_indicator_html_with_details(title, data, color):
                                 </table>
     """
 
-# HTML 이메일 형식으로 결과 포맷팅
-def format_analysis_result_html(final_position, indicators, recommendation, price, date_str, action, targets, total_score, cycle_info, peak_info):
-    # 색상 결정 (이모지 포함 문자열 처리)
-    if "적극 매수" in final_position and "강력" in final_position:
-        position_color = "#0D5E20"  # 매우 진한 녹색
-    elif "매수" in final_position and "추천" in final_position:
-        position_color = "#1B5E20"  # 진한 녹색
-    elif "약한 매수" in final_position:
-        position_color = "#4CAF50"  # 녹색
-    elif "중립-매수" in final_position:
-        position_color = "#7CB342"  # 연한 녹색
-    elif "중립" in final_position and "매도" not in final_position and "매수" not in final_position:
-        position_color = "#9E9E9E"  # 회색
-    elif "중립-매도" in final_position:
-        position_color = "#FF9800"  # 주황색
-    elif "약한 매도" in final_position:
-        position_color = "#FF5722"  # 진한 주황색
-    elif "매도" in final_position and "권장" in final_position:
-        position_color = "#F44336"  # 빨간색
-    elif "적극 매도" in final_position:
-        position_color = "#B71C1C"  # 매우 진한 빨간색
-    else:
-        position_color = "#757575"  # 기본 회색
-    
-    html = f"""
+# 리포트 HTML 정적 머리말 (DOCTYPE, CSS, <body> 시작 - 프로세스당 한 번만 생성)
+REPORT_HTML_HEAD = """
     <!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
     <html xmlns="http://www.w3.org/1999/xhtml">
     <head>
@@ -1180,15 +2040,15 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
         <title>비트코인 분석 리포트</title>
         <style type="text/css">
             /* 프린트 전용 스타일 */
-            @media print {{
+            @media print {
                 /* 페이지 설정 */
-                @page {{
+                @page {
                     size: A4;
                     margin: 1cm;
-                }}
+                }
                 
                 /* 기본 스타일 */
-                body {{
+                body {
                     margin: 0;
                     padding: 0;
                     font-family: 'Malgun Gothic', '맑은 고딕', sans-serif;
@@ -1196,23 +2056,23 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                     line-height: 1.4;
                     color: #000;
                     background: #fff !important;
-                }}
+                }
                 
                 /* 배경색 제거 */
-                * {{
+                * {
                     background: transparent !important;
                     box-shadow: none !important;
-                }}
+                }
                 
                 /* 컨테이너 */
-                table {{
+                table {
                     width: 100% !important;
                     max-width: 100% !important;
                     border-collapse: collapse;
-                }}
+                }
                 
                 /* 헤더 스타일 */
-                .print-header {{
+                .print-header {
                     background: #0052cc !important;
                     -webkit-print-color-adjust: exact;
                     print-color-adjust: exact;
@@ -1220,208 +2080,270 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                     padding: 15px !important;
                     border: 2px solid #000 !important;
                     page-break-after: avoid;
-                }}
+                }
                 
-                .print-header h1 {{
+                .print-header h1 {
                     color: #000 !important;
                     font-size: 18pt !important;
                     margin: 0 !important;
-                }}
+                }
                 
-                .print-header p {{
+                .print-header p {
                     color: #333 !important;
                     font-size: 9pt !important;
-                }}
+                }
                 
                 /* 가격 정보 */
-                .price-box {{
+                .price-box {
                     border: 2px solid #000 !important;
                     padding: 10px !important;
                     text-align: center;
                     page-break-inside: avoid;
-                }}
+                }
                 
-                .price-box p {{
+                .price-box p {
                     font-size: 24pt !important;
                     font-weight: bold !important;
                     color: #000 !important;
-                }}
+                }
                 
                 /* 투자 판단 박스 */
-                .judgment-box {{
+                .judgment-box {
                     border: 3px solid #000 !important;
                     padding: 15px !important;
                     text-align: center;
                     margin: 10px 0 !important;
                     page-break-inside: avoid;
-                }}
+                }
                 
-                .judgment-box p {{
+                .judgment-box p {
                     font-size: 16pt !important;
                     font-weight: bold !important;
                     color: #000 !important;
-                }}
+                }
                 
                 /* 섹션 제목 */
-                h2 {{
+                h2 {
                     font-size: 14pt !important;
                     color: #000 !important;
                     border-bottom: 2px solid #000 !important;
                     padding-bottom: 5px !important;
                     margin: 15px 0 10px 0 !important;
                     page-break-after: avoid;
-                }}
+                }
                 
                 /* 표 스타일 */
-                .data-table {{
+                .data-table {
                     border: 1px solid #000 !important;
                     margin: 10px 0 !important;
                     page-break-inside: avoid;
-                }}
+                }
                 
-                .data-table td {{
+                .data-table td {
                     border: 1px solid #666 !important;
                     padding: 8px !important;
                     font-size: 9pt !important;
                     color: #000 !important;
-                }}
+                }
                 
-                .table-header {{
+                .table-header {
                     background: #ddd !important;
                     -webkit-print-color-adjust: exact;
                     print-color-adjust: exact;
                     font-weight: bold !important;
-                }}
+                }
                 
                 /* 4년 주기 및 고점 근접도 박스 */
-                .warning-box {{
+                .warning-box {
                     border: 2px solid #000 !important;
                     padding: 10px !important;
                     margin: 10px 0 !important;
                     page-break-inside: avoid;
-                }}
+                }
                 
                 /* 경고 박스 */
-                .alert-box {{
+                .alert-box {
                     border: 3px double #000 !important;
                     padding: 10px !important;
                     margin: 10px 0 !important;
                     page-break-inside: avoid;
-                }}
+                }
                 
                 /* 지표 카드 */
-                .indicator-card {{
+                .indicator-card {
                     border: 1px solid #666 !important;
                     padding: 8px !important;
                     margin: 5px 0 !important;
                     page-break-inside: avoid;
-                }}
+                }
                 
                 /* 유의사항 박스 */
-                .notice-box {{
+                .notice-box {
                     border: 1px dashed #666 !important;
                     padding: 10px !important;
                     margin: 15px 0 !important;
                     page-break-inside: avoid;
-                }}
+                }
                 
-                .notice-box ul {{
+                .notice-box ul {
                     margin: 5px 0 !important;
                     padding-left: 20px !important;
-                }}
+                }
                 
-                .notice-box li {{
+                .notice-box li {
                     font-size: 8pt !important;
                     line-height: 1.4 !important;
                     color: #333 !important;
-                }}
+                }
                 
                 /* 푸터 */
-                .footer {{
+                .footer {
                     border-top: 1px solid #000 !important;
                     padding: 10px !important;
                     text-align: center;
                     font-size: 8pt !important;
                     color: #666 !important;
                     page-break-before: avoid;
-                }}
+                }
                 
                 /* 페이지 브레이크 제어 */
-                .no-break {{
+                .no-break {
                     page-break-inside: avoid;
-                }}
+                }
                 
-                .page-break {{
+                .page-break {
                     page-break-before: always;
-                }}
+                }
                 
                 /* 불필요한 요소 숨김 */
-                .no-print {{
+                .no-print {
                     display: none !important;
-                }}
+                }
                 
                 /* 링크 URL 표시 */
-                a[href]:after {{
+                a[href]:after {
                     content: none !important;
-                }}
-            }}
+                }
+            }
             
             /* 화면 표시용 스타일 */
-            @media screen {{
-                .print-only {{
+            @media screen {
+                .print-only {
                     display: none;
-                }}
-            }}
+                }
+            }
             
             /* 모바일 최적화 */
-            @media screen and (max-width: 640px) {{
+            @media screen and (max-width: 640px) {
                 /* 테이블을 100% 너비로 */
-                .email-container {{
+                .email-container {
                     width: 100% !important;
                     min-width: 100% !important;
-                }}
+                }
                 
                 /* 패딩 축소 */
-                .mobile-padding {{
+                .mobile-padding {
                     padding: 15px !important;
-                }}
+                }
                 
-                .mobile-padding-small {{
+                .mobile-padding-small {
                     padding: 10px !important;
-                }}
+                }
                 
                 /* 폰트 크기 조정 */
-                .mobile-text-large {{
+                .mobile-text-large {
                     font-size: 28px !important;
-                }}
+                }
                 
-                .mobile-text-medium {{
+                .mobile-text-medium {
                     font-size: 18px !important;
-                }}
+                }
                 
-                .mobile-text-small {{
+                .mobile-text-small {
                     font-size: 12px !important;
-                }}
+                }
                 
                 /* 가격 표시 */
-                .mobile-price {{
+                .mobile-price {
                     font-size: 28px !important;
-                }}
+                }
                 
                 /* 헤더 */
-                .mobile-header {{
+                .mobile-header {
                     padding: 20px 15px !important;
-                }}
+                }
                 
                 /* 두 열을 한 열로 */
-                .mobile-full-width {{
+                .mobile-full-width {
                     width: 100% !important;
                     display: block !important;
-                }}
-            }}
+                }
+            }
         </style>
     </head>
-    <body style="margin:0; padding:0; font-family: 'Apple SD Gothic Neo', 'Malgun Gothic', '맑은 고딕', 'Noto Sans KR', sans-serif;">
+    <body style="margin:0; padding:0; font-family: 'Apple SD Gothic Neo', 'Malgun Gothic', '맑은 고딕', 'Noto Sans KR', sans-serif;">"""
+
+# 리포트 HTML 정적 꼬리말 (투자자 유의사항, 푸터)
+REPORT_HTML_FOOTER = """
+                                <!-- 투자자 유의사항 -->
+                                <table border="0" cellpadding="0" cellspacing="0" width="100%" class="notice-box no-break" style="margin-top: 10px; background-color: #FFFDE7; border-radius: 6px; border-left: 3px solid #FFC107;">
+                                    <tr>
+                                        <td style="padding: 15px;">
+                                            <h3 style="margin: 0 0 10px 0; color: #555555; font-size: 16px;">⚠️ 중장기 투자자를 위한 유의사항</h3>
+                                            <ul style="margin: 0; padding-left: 20px; color: #555555; font-size: 13px; line-height: 1.6;">
+                                                <li><strong>기술적 분석은 참고 자료:</strong> 모든 투자 판단의 결과는 본인 책임이며, 이 분석은 참고용으로만 활용하세요.</li>
+                                                <li><strong>중장기 관점 유지:</strong> 일일 변동성에 흔들리지 말고, 주요 추세와 지지/저항선을 중심으로 판단하세요.</li>
+                                                <li><strong>분할 매수/매도 전략:</strong> 한 번에 전량 매수/매도하지 말고, 여러 차례 나누어 진행하세요.</li>
+                                                <li><strong>손절매 라인 준수:</strong> 손실을 제한하기 위해 사전에 정한 손절매 라인을 반드시 지키세요.</li>
+                                                <li><strong>강한 추세의 특징:</strong> 과매수/과매도 구간이 장기간 유지될 수 있으므로, 추세의 방향성을 함께 고려하세요.</li>
+                                                <li><strong>리스크 관리:</strong> 투자금은 손실을 감당할 수 있는 범위 내에서만 운용하세요.</li>
+                                            </ul>
+                                        </td>
+                                    </tr>
+                                </table>
+                            </td>
+                        </tr>
+                        
+                        <!-- 푸터 -->
+                        <tr>
+                            <td class="footer" style="padding: 20px 30px; background-color: #f5f5f5; border-radius: 0 0 8px 8px; text-align: center; font-size: 12px; color: #777777; border-top: 1px solid #eeeeee;">
+                                <p style="margin: 0;">© 9min 비트코인 기술적 분석 리포트</p>
+                            </td>
+                        </tr>
+                    </table>
+                </td>
+            </tr>
+        </table>
+    </body>
+    </html>
+    """
+
+# HTML 이메일 형식으로 결과 포맷팅
+def format_analysis_result_html(final_position, indicators, recommendation, price, date_str, action, targets, total_score, cycle_info, peak_info):
+    # 색상 결정 (이모지 포함 문자열 처리)
+    if "적극 매수" in final_position and "강력" in final_position:
+        position_color = "#0D5E20"  # 매우 진한 녹색
+    elif "매수" in final_position and "추천" in final_position:
+        position_color = "#1B5E20"  # 진한 녹색
+    elif "약한 매수" in final_position:
+        position_color = "#4CAF50"  # 녹색
+    elif "중립-매수" in final_position:
+        position_color = "#7CB342"  # 연한 녹색
+    elif "중립" in final_position and "매도" not in final_position and "매수" not in final_position:
+        position_color = "#9E9E9E"  # 회색
+    elif "중립-매도" in final_position:
+        position_color = "#FF9800"  # 주황색
+    elif "약한 매도" in final_position:
+        position_color = "#FF5722"  # 진한 주황색
+    elif "매도" in final_position and "권장" in final_position:
+        position_color = "#F44336"  # 빨간색
+    elif "적극 매도" in final_position:
+        position_color = "#B71C1C"  # 매우 진한 빨간색
+    else:
+        position_color = "#757575"  # 기본 회색
+    
+    parts = [REPORT_HTML_HEAD]
+    parts.append(f"""
         <table border="0" cellpadding="0" cellspacing="0" width="100%" style="background-color: #f7f7f7;">
             <tr>
                 <td class="mobile-padding-small" style="padding: 20px 0;">
@@ -1509,7 +2431,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                 <h2 class="mobile-text-medium" style="color: #D32F2F; font-size: 24px; margin: 0 0 25px 0; padding-bottom: 12px; border-bottom: 3px solid #F44336;">
                                     📊 핵심 분석: 고점 근접도 (12개 지표 종합)
                                 </h2>
-    """
+    """)
     
     # 고점 근접도 정보 (메인 - 먼저 표시)
     if peak_info:
@@ -1527,7 +2449,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
             peak_bg_color = "#E8F5E9"
             peak_border_color = "#2E7D32"
         
-        html += f"""
+        parts.append(f"""
                                 <table border="0" cellpadding="0" cellspacing="0" width="100%" class="alert-box no-break" style="margin-bottom: 20px; background-color: {peak_bg_color}; border-radius: 8px; border: 3px solid {peak_border_color};">
                                     <tr>
                                         <td style="padding: 20px;">
@@ -1582,7 +2504,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                         </td>
                                     </tr>
                                 </table>
-        """
+        """)
     
     # 4년 주기 정보 (보조 정보 - 나중에 간략하게 표시)
     if cycle_info:
@@ -1590,7 +2512,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
         days_since = cycle_info['days_since_halving']
         cycle_pct = cycle_info['cycle_position_pct']
         
-        html += f"""
+        parts.append(f"""
                                 <table border="0" cellpadding="0" cellspacing="0" width="100%" style="margin-bottom: 15px; background-color: #F5F5F5; border-radius: 6px; border-left: 3px solid {cycle_color};">
                                     <tr>
                                         <td style="padding: 12px 15px;">
@@ -1627,14 +2549,14 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                 <h2 class="mobile-text-medium" style="color: #333333; font-size: 20px; margin: 0 0 20px 0; padding-bottom: 10px; border-bottom: 2px solid #e0e0e0;">
                                     📊 가격 목표 및 전략
                                 </h2>
-    """
+    """)
     
     # 가격 목표 표시
     for key, value in targets.items():
         key_display = key.replace("_", " ").title()
         key_emoji = "🎯" if "target" in key else "🛡️" if "stop" in key else "📍" if "entry" in key or "exit" in key else "📉" if "support" in key else "👀" if "watch" in key else "🔄" if "reentry" in key else "📊"
         
-        html += f"""
+        parts.append(f"""
                                 <table border="0" cellpadding="0" cellspacing="0" width="100%" style="margin-bottom: 12px;">
                                     <tr>
                                         <td style="padding: 12px 15px; background-color: #ffffff; border: 1px solid #e0e0e0; border-radius: 6px;">
@@ -1644,16 +2566,16 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                                         {key_emoji} {key_display.replace("_", " ")}
                                                     </td>
                                                     <td width="60%" style="font-size: 14px; color: #333333; font-weight: bold; text-align: right;">
-                                                        {value}
+                                                        {format_display_value(value)}
                                                     </td>
                                                 </tr>
                                             </table>
                                         </td>
                                     </tr>
                                 </table>
-        """
+        """)
     
-    html += """
+    parts.append("""
                             </td>
                         </tr>
                         
@@ -1663,7 +2585,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                 <h2 class="mobile-text-medium" style="color: #333333; font-size: 20px; margin: 0 0 20px 0; padding-bottom: 10px; border-bottom: 2px solid #f0f0f0;">
                                     지표별 분석
                                 </h2>
-    """
+    """)
     
     # RSI 지표
     rsi_data = indicators.get("RSI", {})
@@ -1679,7 +2601,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
         elif rsi_score < 0:
             rsi_color = "#F44336"  # 부정적
             
-        html += f"""
+        parts.append(f"""
                                 <table border="0" cellpadding="0" cellspacing="0" width="100%" style="margin-bottom: 20px; border: 1px solid #f0f0f0; border-radius: 6px; overflow: hidden;">
                                     <tr>
                                         <td style="padding: 12px 15px; background-color: #f5f5f5; font-weight: bold; font-size: 16px; border-bottom: 1px solid #f0f0f0;">
@@ -1691,7 +2613,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                             <table border="0" cellpadding="0" cellspacing="0" width="100%">
                                                 <tr>
                                                     <td width="70%" style="font-size: 14px; color: #555555; padding: 5px 0;">
-                                                        현재 수치: <span style="font-family: 'Courier New', monospace; font-weight: bold;">{rsi_data.get('value', 'N/A')}</span>
+                                                        현재 수치: <span style="font-family: 'Courier New', monospace; font-weight: bold;">{format_display_value(rsi_data.get('value', 'N/A'))}</span>
                                                     </td>
                                                     <td width="30%" style="font-size: 14px; text-align: right; font-weight: bold; color: {rsi_color};">
                                                         {rsi_data.get('signal', 'N/A')}
@@ -1701,7 +2623,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                         </td>
                                     </tr>
                                 </table>
-        """
+        """)
     
     # MACD 지표
     macd_data = indicators.get("MACD", {})
@@ -1717,7 +2639,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
         elif macd_score < 0:
             macd_color = "#F44336"  # 부정적
             
-        html += f"""
+        parts.append(f"""
                                 <table border="0" cellpadding="0" cellspacing="0" width="100%" style="margin-bottom: 20px; border: 1px solid #f0f0f0; border-radius: 6px; overflow: hidden;">
                                     <tr>
                                         <td style="padding: 12px 15px; background-color: #f5f5f5; font-weight: bold; font-size: 16px; border-bottom: 1px solid #f0f0f0;">
@@ -1729,7 +2651,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                             <table border="0" cellpadding="0" cellspacing="0" width="100%">
                                                 <tr>
                                                     <td width="70%" style="font-size: 14px; color: #555555; padding: 5px 0;">
-                                                        현재 수치: <span style="font-family: 'Courier New', monospace; font-weight: bold;">{macd_data.get('value', 'N/A')}</span>
+                                                        현재 수치: <span style="font-family: 'Courier New', monospace; font-weight: bold;">{format_display_value(macd_data.get('value', 'N/A'))}</span>
                                                     </td>
                                                     <td width="30%" style="font-size: 14px; text-align: right; font-weight: bold; color: {macd_color};">
                                                         {macd_data.get('signal', 'N/A')}
@@ -1739,7 +2661,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                         </td>
                                     </tr>
                                 </table>
-        """
+        """)
     
     # 이동평균선 지표
     ma_data = indicators.get("이동평균선", {})
@@ -1755,7 +2677,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
         elif ma_score < 0:
             ma_color = "#F44336"  # 부정적
             
-        html += f"""
+        parts.append(f"""
                                 <table border="0" cellpadding="0" cellspacing="0" width="100%" style="margin-bottom: 20px; border: 1px solid #f0f0f0; border-radius: 6px; overflow: hidden;">
                                     <tr>
                                         <td style="padding: 12px 15px; background-color: #f5f5f5; font-weight: bold; font-size: 16px; border-bottom: 1px solid #f0f0f0;">
@@ -1767,7 +2689,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                             <table border="0" cellpadding="0" cellspacing="0" width="100%">
                                                 <tr>
                                                     <td style="font-size: 14px; color: #555555; padding: 5px 0;">
-                                                        <span style="font-family: 'Courier New', monospace; font-weight: bold;">{ma_data.get('value', 'N/A')}</span>
+                                                        <span style="font-family: 'Courier New', monospace; font-weight: bold;">{format_display_value(ma_data.get('value', 'N/A'))}</span>
                                                     </td>
                                                 </tr>
                                                 <tr>
@@ -1777,14 +2699,14 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                                 </tr>
                                                 <tr>
                                                     <td style="font-size: 12px; color: #777777; padding: 5px 0; font-style: italic;">
-                                                        {ma_data.get('details', '')}
+                                                        {format_display_value(ma_data.get('details', ''))}
                                                     </td>
                                                 </tr>
                                             </table>
                                         </td>
                                     </tr>
                                 </table>
-        """
+        """)
     
     # 볼린저 밴드 지표
     bb_data = indicators.get("볼린저 밴드", {})
@@ -1800,7 +2722,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
         elif bb_score < 0:
             bb_color = "#F44336"  # 부정적
             
-        html += f"""
+        parts.append(f"""
                                 <table border="0" cellpadding="0" cellspacing="0" width="100%" style="margin-bottom: 20px; border: 1px solid #f0f0f0; border-radius: 6px; overflow: hidden;">
                                     <tr>
                                         <td style="padding: 12px 15px; background-color: #f5f5f5; font-weight: bold; font-size: 16px; border-bottom: 1px solid #f0f0f0;">
@@ -1812,7 +2734,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                             <table border="0" cellpadding="0" cellspacing="0" width="100%">
                                                 <tr>
                                                     <td style="font-size: 14px; color: #555555; padding: 5px 0;">
-                                                        <span style="font-family: 'Courier New', monospace; font-weight: bold;">{bb_data.get('value', 'N/A')}</span>
+                                                        <span style="font-family: 'Courier New', monospace; font-weight: bold;">{format_display_value(bb_data.get('value', 'N/A'))}</span>
                                                     </td>
                                                 </tr>
                                                 <tr>
@@ -1822,14 +2744,14 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                                 </tr>
                                                 <tr>
                                                     <td style="font-size: 12px; color: #777777; padding: 5px 0; font-style: italic;">
-                                                        {bb_data.get('details', '')}
+                                                        {format_display_value(bb_data.get('details', ''))}
                                                     </td>
                                                 </tr>
                                             </table>
                                         </td>
                                     </tr>
                                 </table>
-        """
+        """)
     
     # 스토캐스틱 지표
     stoch_data = indicators.get("스토캐스틱", {})
@@ -1845,7 +2767,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
         elif stoch_score < 0:
             stoch_color = "#F44336"  # 부정적
             
-        html += f"""
+        parts.append(f"""
                                 <table border="0" cellpadding="0" cellspacing="0" width="100%" style="margin-bottom: 20px; border: 1px solid #f0f0f0; border-radius: 6px; overflow: hidden;">
                                     <tr>
                                         <td style="padding: 12px 15px; background-color: #f5f5f5; font-weight: bold; font-size: 16px; border-bottom: 1px solid #f0f0f0;">
@@ -1857,7 +2779,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                             <table border="0" cellpadding="0" cellspacing="0" width="100%">
                                                 <tr>
                                                     <td width="70%" style="font-size: 14px; color: #555555; padding: 5px 0;">
-                                                        현재 수치: <span style="font-family: 'Courier New', monospace; font-weight: bold;">{stoch_data.get('value', 'N/A')}</span>
+                                                        현재 수치: <span style="font-family: 'Courier New', monospace; font-weight: bold;">{format_display_value(stoch_data.get('value', 'N/A'))}</span>
                                                     </td>
                                                     <td width="30%" style="font-size: 14px; text-align: right; font-weight: bold; color: {stoch_color};">
                                                         {stoch_data.get('signal', 'N/A')}
@@ -1867,7 +2789,7 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
                                         </td>
                                     </tr>
                                 </table>
-        """
+        """)
     
     # 새로운 지표들 추가
     
@@ -1876,89 +2798,62 @@ def format_analysis_result_html(final_position, indicators, recommendation, pric
     if ema_data:
         ema_score = ema_data.get('score', 0)
         ema_color = get_indicator_color(ema_score)
-        html += create_indicator_html("EMA 추세 (지수이동평균)", ema_data, ema_color)
+        parts.append(create_indicator_html("EMA 추세 (지수이동평균)", ema_data, ema_color))
     
     # 거래량(OBV) 지표
     obv_data = indicators.get("거래량(OBV)", {})
     if obv_data:
         obv_score = obv_data.get('score', 0)
         obv_color = get_indicator_color(obv_score)
-        html += create_indicator_html("거래량 분석 (OBV)", obv_data, obv_color)
+        parts.append(create_indicator_html("거래량 분석 (OBV)", obv_data, obv_color))
     
     # 추세강도(ADX) 지표
     adx_data = indicators.get("추세강도(ADX)", {})
     if adx_data:
         adx_score = adx_data.get('score', 0)
         adx_color = get_indicator_color(adx_score)
-        html += create_indicator_html("추세 강도 (ADX)", adx_data, adx_color)
+        parts.append(create_indicator_html("추세 강도 (ADX)", adx_data, adx_color))
     
     # 일목균형표 지표
     ichimoku_data = indicators.get("일목균형표", {})
     if ichimoku_data:
         ichimoku_score = ichimoku_data.get('score', 0)
         ichimoku_color = get_indicator_color(ichimoku_score)
-        html += create_indicator_html_with_details("일목균형표 (Ichimoku Cloud)", ichimoku_data, ichimoku_color)
+        parts.append(create_indicator_html_with_details("일목균형표 (Ichimoku Cloud)", ichimoku_data, ichimoku_color))
     
     # 변동성(ATR) 지표
     atr_data = indicators.get("변동성(ATR)", {})
     if atr_data:
         atr_score = atr_data.get('score', 0)
         atr_color = get_indicator_color(atr_score)
-        html += create_indicator_html("변동성 (ATR)", atr_data, atr_color)
+        parts.append(create_indicator_html("변동성 (ATR)", atr_data, atr_color))
     
     # 공포/탐욕 지수
     fg_data = indicators.get("공포/탐욕지수", {})
     if fg_data:
         fg_score = fg_data.get('score', 0)
         fg_color = get_indicator_color(fg_score)
-        html += create_indicator_html("공포/탐욕 지수", fg_data, fg_color)
+        parts.append(create_indicator_html("공포/탐욕 지수", fg_data, fg_color))
     
     # 피보나치 레벨
     fib_data = indicators.get("피보나치", {})
     if fib_data:
         fib_score = fib_data.get('score', 0)
         fib_color = get_indicator_color(fib_score)
-        html += create_indicator_html_with_details("피보나치 되돌림", fib_data, fib_color)
+        parts.append(create_indicator_html_with_details("피보나치 되돌림", fib_data, fib_color))
     
     # 투자자 유의사항 및 푸터
-    html += f"""
-                                <!-- 투자자 유의사항 -->
-                                <table border="0" cellpadding="0" cellspacing="0" width="100%" class="notice-box no-break" style="margin-top: 10px; background-color: #FFFDE7; border-radius: 6px; border-left: 3px solid #FFC107;">
-                                    <tr>
-                                        <td style="padding: 15px;">
-                                            <h3 style="margin: 0 0 10px 0; color: #555555; font-size: 16px;">⚠️ 중장기 투자자를 위한 유의사항</h3>
-                                            <ul style="margin: 0; padding-left: 20px; color: #555555; font-size: 13px; line-height: 1.6;">
-                                                <li><strong>기술적 분석은 참고 자료:</strong> 모든 투자 판단의 결과는 본인 책임이며, 이 분석은 참고용으로만 활용하세요.</li>
-                                                <li><strong>중장기 관점 유지:</strong> 일일 변동성에 흔들리지 말고, 주요 추세와 지지/저항선을 중심으로 판단하세요.</li>
-                                                <li><strong>분할 매수/매도 전략:</strong> 한 번에 전량 매수/매도하지 말고, 여러 차례 나누어 진행하세요.</li>
-                                                <li><strong>손절매 라인 준수:</strong> 손실을 제한하기 위해 사전에 정한 손절매 라인을 반드시 지키세요.</li>
-                                                <li><strong>강한 추세의 특징:</strong> 과매수/과매도 구간이 장기간 유지될 수 있으므로, 추세의 방향성을 함께 고려하세요.</li>
-                                                <li><strong>리스크 관리:</strong> 투자금은 손실을 감당할 수 있는 범위 내에서만 운용하세요.</li>
-                                            </ul>
-                                        </td>
-                                    </tr>
-                                </table>
-                            </td>
-                        </tr>
-                        
-                        <!-- 푸터 -->
-                        <tr>
-                            <td class="footer" style="padding: 20px 30px; background-color: #f5f5f5; border-radius: 0 0 8px 8px; text-align: center; font-size: 12px; color: #777777; border-top: 1px solid #eeeeee;">
-                                <p style="margin: 0;">© 9min 비트코인 기술적 분석 리포트</p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
+    parts.append(REPORT_HTML_FOOTER)
     
-    return html
+    return "".join(parts)
 
 # 이메일 전송 함수
 def send_email(analysis_html):
+    # SMTP/MIME 모듈은 이메일을 보낼 때만 불러옴
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    
     try:
         print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 이메일 전송 시작...")
         
@@ -1998,30 +2893,51 @@ def send_email(analysis_html):
         print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 이메일 전송 실패")
         return False
 
-# 메인 분석 및 이메일 전송 함수
-def analyze_and_send():
+# 메인 분석 및 이메일 전송 함수 (단계별 실행 지표 기록)
+@pipeline_run("email")
+def analyze_and_send(df=None):
+    """df: 지표가 계산된 DataFrame (None이면 데이터를 가져와 계산, 상주 실행에서 전달)"""
     print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 비트코인 분석 시작...")
     
-    # 데이터 가져오기
-    df = get_bitcoin_data()
-    if df is None or df.empty:
-        print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 데이터를 가져올 수 없습니다.")
-        return
-    
-    # 기술적 지표 계산
-    df = calculate_indicators(df)
+    if df is None:
+        # 데이터 가져오기
+        with measure("fetch"):
+            df = get_bitcoin_data()
+        if df is None or df.empty:
+            print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 데이터를 가져올 수 없습니다.")
+            set_label(result="no_data")
+            return
+        
+        # 기술적 지표 계산
+        with measure("indicators"):
+            df = calculate_indicators_cached(df)
+    set_label(bars=len(df))
     
     # 현재 가격
     current_price = df['close'].iloc[-1]
     
     # 시장 위치 분석
-    final_position, indicators, recommendation, score, action, targets, cycle_info, peak_info = analyze_market_position(df)
+    with measure("analyze"):
+        stats = RollingStatsCache(df)
+        analysis = analyze_market_position(df, stats)
+    final_position, indicators, recommendation, score, action, targets, cycle_info, peak_info = analysis
+    
+    # 마지막 알림 대비 변화 확인 (변화가 없으면 HTML 생성/이메일 전송 생략)
+    signal_state = state_from_result(analysis)
+    transitions = detect_transitions(load_state(), signal_state)
+    if not transitions and NOTIFY_MODE != "always":
+        print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 변화 없음 ({analysis.position_category}, 점수: {score:.1f}) - 이메일 전송 생략")
+        set_label(result="unchanged")
+        return
+    for transition in transitions:
+        print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 신호 변화: {transition}")
     
     # 현재 날짜/시간 (한국 시간)
     date_str = get_kst_now().strftime("%Y-%m-%d %H:%M:%S KST")
     
     # 분석 결과 HTML 형식으로 포맷팅
-    analysis_html = format_analysis_result_html(final_position, indicators, recommendation, current_price, date_str, action, targets, score, cycle_info, peak_info)
+    with measure("render"):
+        analysis_html = format_analysis_result_html(final_position, indicators, recommendation, current_price, date_str, action, targets, score, cycle_info, peak_info)
     
     # 콘솔 출력용 텍스트 (이모지 제거)
     position_text = final_position.replace("🟢", "").replace("🟡", "").replace("⚪", "").replace("🟠", "").replace("🔴", "").strip()
@@ -2035,15 +2951,30 @@ def analyze_and_send():
     
     # 고점 예측 정보 출력 (매도 신호일 때)
     if 'predicted_peak' in targets:
-        print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 예상 고점: {targets['predicted_peak']}")
+        print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 예상 고점: {format_display_value(targets['predicted_peak'])}")
         if 'upside_to_peak' in targets:
-            print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 상승 여력: {targets['upside_to_peak']}")
+            print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 상승 여력: {format_display_value(targets['upside_to_peak'])}")
     
     print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')}] 권장 행동: {action}")
     
-    # 이메일 전송
-    send_email(analysis_html)
+    # 이메일 전송 (성공한 경우에만 알림 상태 저장 - 실패하면 다음 실행에서 다시 시도)
+    with measure("email"):
+        sent = send_email(analysis_html)
+    set_label(result="sent" if sent else "send_failed")
+    if sent:
+        save_state(signal_state)
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="비트코인 분석 및 이메일 전송")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=["cprofile", "sample"],
+                        help="프로파일링 후 bitcoin_analysis.profile.txt / bitcoin_analysis.collapsed(flamegraph) 저장")
+    args = parser.parse_args()
+    
     # 비트코인 분석 및 이메일 전송 실행
-    analyze_and_send()
\ No newline at end of file
+    if args.profile:
+        from profiling import profiled
+        with profiled(args.profile, "bitcoin_analysis"):
+            analyze_and_send()
+    else:
+        analyze_and_send()
\ No newline at end of file
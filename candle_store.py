@@ -0,0 +1,147 @@
+"""
+로컬 OHLCV 캔들 저장소
+
+거래소/심볼/타임프레임별로 캔들을 .npy 파일에 저장하고,
+다음 실행 시에는 마지막 저장 시각 이후의 캔들만 ccxt의 since로 가져와
+이어 붙입니다. 매 시간 500개 봉 전체를 다시 받는 대신 1~2개 봉만 받습니다.
+백테스트/가중치 최적화용 장기 기록은 fetch_ohlcv_history로 since부터 채웁니다.
+"""
+
+import os
+import re
+import numpy as np
+
+# 저장소 위치 (환경 변수로 변경 가능, 배포 디렉토리와 분리)
+CANDLE_STORE_DIR = os.getenv(
+    "CANDLE_STORE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bitcoin-analysis", "candles")
+)
+
+# 파일당 최대 보관 캔들 수 (일봉 기준 약 27년)
+MAX_STORED_CANDLES = int(os.getenv("CANDLE_STORE_MAX", "10000"))
+
+# 과거 캔들을 이어 받을 때 요청당 캔들 수 (Coinbase 최대 300개)
+HISTORY_FETCH_LIMIT = int(os.getenv("CANDLE_HISTORY_FETCH_LIMIT", "300"))
+
+# 저장 컬럼 순서 (ccxt fetch_ohlcv 결과와 동일)
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+# 저장 파일 경로
+def get_store_path(exchange_name, symbol, timeframe):
+    """거래소/심볼/타임프레임 조합의 저장 파일 경로 반환"""
+    key = f"{exchange_name}_{symbol}_{timeframe}"
+    key = re.sub(r"[^A-Za-z0-9_.-]", "-", key)  # 'BTC/USD' -> 'BTC-USD'
+    return os.path.join(CANDLE_STORE_DIR, f"{key}.npy")
+
+
+# 저장된 캔들 불러오기
+def load_candles(exchange_name, symbol, timeframe):
+    """저장된 캔들 배열 (n x 6) 반환, 없거나 손상되었으면 None"""
+    path = get_store_path(exchange_name, symbol, timeframe)
+    if not os.path.exists(path):
+        return None
+
+    # 메모리 맵으로 열면 Windows에서 같은 경로를 os.replace로 교체할 수 없음 (최대 수백 KB라 전체 로드)
+    try:
+        candles = np.load(path)
+    except (OSError, ValueError):
+        return None
+
+    if candles.ndim != 2 or candles.shape[1] != len(CANDLE_COLUMNS) or len(candles) == 0:
+        return None
+    return candles
+
+
+# 캔들 저장 (임시 파일에 쓴 뒤 교체하여 중간에 끊겨도 기존 파일 유지)
+def save_candles(exchange_name, symbol, timeframe, candles):
+    path = get_store_path(exchange_name, symbol, timeframe)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    candles = np.ascontiguousarray(candles[-MAX_STORED_CANDLES:], dtype=np.float64)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, candles)
+    os.replace(tmp_path, path)
+
+
+# 저장된 캔들과 새로 받은 캔들 병합
+def merge_candles(stored, fetched):
+    """
+    fetched의 첫 시각 이후의 기존 캔들은 버리고 새 캔들로 대체합니다.
+    (마지막 봉은 진행 중이던 봉일 수 있으므로 항상 새 값으로 덮어씀)
+    """
+    if stored is None or len(stored) == 0:
+        return fetched
+    if fetched is None or len(fetched) == 0:
+        return stored
+
+    keep = stored[:, 0] < fetched[0, 0]
+    return np.concatenate([stored[keep], fetched])
+
+
+# 증분 캔들 가져오기
+def fetch_ohlcv_incremental(exchange, exchange_name, symbol, timeframe='1d', limit=500):
+    """
+    저장소의 마지막 캔들 시각부터(since) 필요한 캔들만 가져와 저장소에 이어 붙이고,
+    최근 limit개의 캔들 배열 (n x 6)을 반환합니다.
+    """
+    stored = load_candles(exchange_name, symbol, timeframe)
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    now_ms = exchange.milliseconds()
+
+    # 저장소가 비었거나 보관 기간이 부족하거나 공백이 너무 길면 전체 다시 받기
+    if (stored is None or len(stored) < limit
+            or (now_ms - stored[-1, 0]) / timeframe_ms >= limit):
+        fetched = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        candles = np.asarray(fetched, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+        fetched_count = len(candles)
+    else:
+        # 마지막 저장 봉(진행 중이었을 수 있음)부터 다시 받기
+        since = int(stored[-1, 0])
+        fetched = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+        fetched = np.asarray(fetched, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+        fetched_count = len(fetched)
+        candles = merge_candles(stored, fetched)
+
+    if len(candles) == 0:
+        return candles
+
+    save_candles(exchange_name, symbol, timeframe, candles)
+    print(f"[저장소] {exchange_name} {symbol} {timeframe}: {fetched_count}개 봉 수신, 총 {len(candles)}개 보관")
+
+    return np.array(candles[-limit:])
+
+
+# 과거 캔들 채우기
+def fetch_ohlcv_history(exchange, exchange_name, symbol, timeframe='1d', since=0, limit=None):
+    """
+    저장소가 since 이전부터 보관하고 있으면 마지막 저장 봉 이후만, 아니면 since부터 현재까지
+    limit개씩 이어 받아 저장소에 병합하고 보관 중인 전체 캔들 배열 (n x 6)을 반환합니다.
+    거래소가 최근 데이터만 제공하면(Kraken은 최근 720봉) 받을 수 있는 만큼만 반환합니다.
+    """
+    limit = HISTORY_FETCH_LIMIT if limit is None else limit
+    stored = load_candles(exchange_name, symbol, timeframe)
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    now_ms = exchange.milliseconds()
+
+    start = since if stored is None or stored[0, 0] > since else int(stored[-1, 0])
+    chunks = []
+    while start <= now_ms:
+        fetched = exchange.fetch_ohlcv(symbol, timeframe, since=start, limit=limit)
+        fetched = np.asarray(fetched, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+        fetched = fetched[fetched[:, 0] >= start]
+        if len(fetched) == 0:
+            break
+        chunks.append(fetched)
+        start = int(fetched[-1, 0]) + timeframe_ms
+
+    fetched = np.concatenate(chunks) if chunks else None
+    candles = merge_candles(stored, fetched)
+    if candles is None or len(candles) == 0:
+        return np.empty((0, len(CANDLE_COLUMNS)))
+
+    save_candles(exchange_name, symbol, timeframe, candles)
+    print(f"[저장소] {exchange_name} {symbol} {timeframe}: "
+          f"{0 if fetched is None else len(fetched)}개 봉 수신, 총 {min(len(candles), MAX_STORED_CANDLES)}개 보관")
+    return candles[-MAX_STORED_CANDLES:]
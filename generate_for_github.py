@@ -2,22 +2,41 @@
 GitHub Actions용 HTML 생성 스크립트
 
 이 스크립트는 GitHub Actions에서 실행되어
-index.html 파일을 생성합니다.
+index.html 파일과 분석 결과 파일(analysis.json, msgpack 설치 시 analysis.msgpack)을 생성합니다.
+분석 결과(생성 시각 제외)가 이전 실행과 같으면 파일을 쓰지 않고
+NO_CHANGE_EXIT_CODE(3)로 종료하여 배포 단계를 건너뛰게 합니다.
+
+사용법:
+    python generate_for_github.py           # 변경이 있을 때만 생성
+    python generate_for_github.py --force   # 항상 생성
+    python generate_for_github.py --profile # 프로파일링 (index.profile.txt, index.pstats, index.collapsed)
 """
 
 from bitcoin_analysis import (
     get_bitcoin_data, 
-    calculate_indicators, 
+    calculate_indicators_cached, 
     analyze_market_position,
     format_analysis_result_html,
     get_kst_now
 )
+from rolling_stats import RollingStatsCache
+from report_manifest import NO_CHANGE_EXIT_CODE, is_unchanged, report_content_hash, save_manifest
+from pipeline_metrics import measure, pipeline_run, set_label
+import argparse
 import sys
 
 
-def generate_index_html():
+@pipeline_run("report")
+def generate_index_html(force=False, df=None):
     """
     GitHub Pages용 index.html 생성
+    
+    Args:
+        force (bool): 이전 실행과 분석 결과가 같아도 파일을 다시 생성할지 여부
+        df (DataFrame): 지표가 계산된 데이터 (None이면 데이터를 가져와 계산, 상주 실행에서 전달)
+    
+    Returns:
+        bool: 파일을 생성했으면 True, 변경이 없어 건너뛰었으면 False
     """
     print("=" * 70)
     print("비트코인 분석 리포트 생성 (GitHub Pages)")
@@ -25,16 +44,20 @@ def generate_index_html():
     print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] 분석 시작...\n")
     
     try:
-        # 데이터 가져오기
-        df = get_bitcoin_data()
-        if df is None or df.empty:
-            print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] [X] 데이터를 가져올 수 없습니다.")
-            sys.exit(1)
-        
-        print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] [OK] 데이터 로드 완료 ({len(df)}개 봉)")
-        
-        # 기술적 지표 계산
-        df = calculate_indicators(df)
+        if df is None:
+            # 데이터 가져오기
+            with measure("fetch"):
+                df = get_bitcoin_data()
+            if df is None or df.empty:
+                print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] [X] 데이터를 가져올 수 없습니다.")
+                sys.exit(1)
+            
+            print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] [OK] 데이터 로드 완료 ({len(df)}개 봉)")
+            
+            # 기술적 지표 계산
+            with measure("indicators"):
+                df = calculate_indicators_cached(df)
+        set_label(bars=len(df))
         print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] [OK] 기술적 지표 계산 완료")
         
         # 현재 가격
@@ -42,7 +65,10 @@ def generate_index_html():
         print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] 현재 비트코인 가격: ${current_price:,.2f}\n")
         
         # 시장 위치 분석
-        final_position, indicators, recommendation, score, action, targets, cycle_info, peak_info = analyze_market_position(df)
+        with measure("analyze"):
+            stats = RollingStatsCache(df)
+            analysis = analyze_market_position(df, stats)
+        final_position, indicators, recommendation, score, action, targets, cycle_info, peak_info = analysis
         
         # 콘솔 출력
         position_text = final_position.replace("🟢", "").replace("🟡", "").replace("⚪", "").replace("🟠", "").replace("🔴", "").strip()
@@ -61,22 +87,37 @@ def generate_index_html():
         
         print("=" * 70 + "\n")
         
+        # 이전 실행과 같은 분석 결과면 파일 쓰기/배포 생략
+        content_hash = report_content_hash(analysis)
+        if not force and is_unchanged(content_hash):
+            print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] 분석 결과 변경 없음 ({content_hash[:12]}) - 생성 생략\n")
+            set_label(result="unchanged")
+            return False
+        
         # 현재 날짜/시간 (한국 시간)
         date_str = get_kst_now().strftime("%Y-%m-%d %H:%M:%S KST")
         
         # HTML 생성
         print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] index.html 생성 중...")
-        analysis_html = format_analysis_result_html(
-            final_position, indicators, recommendation, 
-            current_price, date_str, action, targets, 
-            score, cycle_info, peak_info
-        )
-        
-        # index.html로 저장
-        with open('index.html', 'w', encoding='utf-8') as f:
-            f.write(analysis_html)
+        with measure("render"):
+            analysis_html = format_analysis_result_html(
+                final_position, indicators, recommendation, 
+                current_price, date_str, action, targets, 
+                score, cycle_info, peak_info
+            )
         
-        print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] [OK] index.html 생성 완료!")
+        with measure("write"):
+            # index.html로 저장
+            with open('index.html', 'w', encoding='utf-8') as f:
+                f.write(analysis_html)
+            
+            print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] [OK] index.html 생성 완료!")
+            
+            # 분석 결과 원본 값 저장 (다른 봇이 index.html 대신 읽을 수 있도록)
+            result_paths = analysis.write()
+            print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] [OK] {', '.join(result_paths)} 저장 완료")
+            save_manifest(analysis, content_hash, ['index.html'] + result_paths)
+        set_label(result="written")
         print(f"[{get_kst_now().strftime('%Y-%m-%d %H:%M:%S')} KST] GitHub Pages에 배포 준비 완료\n")
         
         return True
@@ -89,11 +130,22 @@ def generate_index_html():
 
 
 if __name__ == "__main__":
-    success = generate_index_html()
-    if success:
+    parser = argparse.ArgumentParser(description="GitHub Pages용 리포트 생성")
+    parser.add_argument("--force", action="store_true", help="분석 결과가 같아도 다시 생성")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=["cprofile", "sample"],
+                        help="프로파일링 후 index.profile.txt / index.collapsed(flamegraph) 저장")
+    args = parser.parse_args()
+    
+    if args.profile:
+        from profiling import profiled
+        with profiled(args.profile, "index"):
+            changed = generate_index_html(force=args.force)
+    else:
+        changed = generate_index_html(force=args.force)
+    if changed:
         print("\n✅ 성공적으로 완료되었습니다!")
         sys.exit(0)
     else:
-        print("\n❌ 실패했습니다.")
-        sys.exit(1)
+        print("\n⏭️ 변경 사항이 없어 배포를 건너뜁니다.")
+        sys.exit(NO_CHANGE_EXIT_CODE)
 
@@ -6,20 +6,25 @@ HTML 리포트 파일을 생성합니다. 이메일은 전송하지 않습니다
 
 사용법:
     python generate_html_report.py
+    python generate_html_report.py --profile   # 리포트 옆에 .profile.txt / .collapsed(flamegraph) 저장
 """
 
 from bitcoin_analysis import (
     get_bitcoin_data, 
-    calculate_indicators, 
+    calculate_indicators_cached, 
     analyze_market_position,
-    format_analysis_result_html
+    format_analysis_result_html,
+    format_display_value
 )
+from rolling_stats import RollingStatsCache
+from pipeline_metrics import measure, pipeline_run, set_label
 from datetime import datetime
 import os
 import webbrowser
 import sys
 
 
+@pipeline_run("html_report")
 def generate_html_report(open_browser=True):
     """
     비트코인 분석 리포트 HTML 생성
@@ -33,7 +38,8 @@ def generate_html_report(open_browser=True):
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 분석 시작...\n")
     
     # 데이터 가져오기
-    df = get_bitcoin_data()
+    with measure("fetch"):
+        df = get_bitcoin_data()
     if df is None or df.empty:
         print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [X] 데이터를 가져올 수 없습니다.")
         return None
@@ -41,7 +47,9 @@ def generate_html_report(open_browser=True):
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [OK] 데이터 로드 완료 ({len(df)}개 봉)")
     
     # 기술적 지표 계산
-    df = calculate_indicators(df)
+    with measure("indicators"):
+        df = calculate_indicators_cached(df)
+    set_label(bars=len(df))
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [OK] 기술적 지표 계산 완료")
     
     # 현재 가격
@@ -49,7 +57,9 @@ def generate_html_report(open_browser=True):
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 현재 비트코인 가격: ${current_price:,.2f}\n")
     
     # 시장 위치 분석
-    final_position, indicators, recommendation, score, action, targets, cycle_info, peak_info = analyze_market_position(df)
+    with measure("analyze"):
+        stats = RollingStatsCache(df)
+        final_position, indicators, recommendation, score, action, targets, cycle_info, peak_info = analyze_market_position(df, stats)
     
     # 콘솔 출력용 텍스트 (이모지 제거)
     position_text = final_position.replace("🟢", "").replace("🟡", "").replace("⚪", "").replace("🟠", "").replace("🔴", "").strip()
@@ -69,9 +79,9 @@ def generate_html_report(open_browser=True):
     
     # 고점 예측 정보 출력 (매도 신호일 때)
     if 'predicted_peak' in targets:
-        print(f"예상 고점: {targets['predicted_peak']}")
+        print(f"예상 고점: {format_display_value(targets['predicted_peak'])}")
         if 'upside_to_peak' in targets:
-            print(f"상승 여력: {targets['upside_to_peak']}")
+            print(f"상승 여력: {format_display_value(targets['upside_to_peak'])}")
     
     print(f"권장 행동: {action}")
     print("=" * 70 + "\n")
@@ -81,18 +91,19 @@ def generate_html_report(open_browser=True):
     
     # HTML 생성
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] HTML 리포트 생성 중...")
-    analysis_html = format_analysis_result_html(
-        final_position, indicators, recommendation, 
-        current_price, date_str, action, targets, 
-        score, cycle_info, peak_info
-    )
+    with measure("render"):
+        analysis_html = format_analysis_result_html(
+            final_position, indicators, recommendation, 
+            current_price, date_str, action, targets, 
+            score, cycle_info, peak_info
+        )
     
     # HTML 저장
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     html_filename = f"bitcoin_analysis_{timestamp}.html"
     
     try:
-        with open(html_filename, 'w', encoding='utf-8') as f:
+        with measure("write"), open(html_filename, 'w', encoding='utf-8') as f:
             f.write(analysis_html)
         
         html_path = os.path.abspath(html_filename)
@@ -136,26 +147,43 @@ def generate_html_report(open_browser=True):
 if __name__ == "__main__":
     # 명령줄 인자 확인
     open_browser = True
+    profile = None
     
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--no-open":
+    options = sys.argv[1:]
+    while options:
+        option = options.pop(0)
+        if option == "--no-open":
             # 브라우저로 열지 않음
             open_browser = False
-        elif sys.argv[1] == "--help":
+        elif option == "--profile":
+            # 방식을 생략하면 cprofile
+            profile = options.pop(0) if options and not options[0].startswith("--") else "cprofile"
+            if profile not in ("cprofile", "sample"):
+                print(f"[X] 알 수 없는 프로파일링 방식: {profile} (cprofile, sample)")
+                sys.exit(1)
+        elif option == "--help":
             print("""
 사용법:
-  python generate_html_report.py            # HTML 생성 후 브라우저로 열기 (기본값)
-  python generate_html_report.py --no-open  # HTML만 생성 (브라우저 안 열기)
-  python generate_html_report.py --help     # 도움말 표시
+  python generate_html_report.py                   # HTML 생성 후 브라우저로 열기 (기본값)
+  python generate_html_report.py --no-open         # HTML만 생성 (브라우저 안 열기)
+  python generate_html_report.py --profile [방식]  # 프로파일링 (cprofile 기본, sample)
+  python generate_html_report.py --help            # 도움말 표시
             """)
             sys.exit(0)
         else:
-            print(f"[X] 알 수 없는 옵션: {sys.argv[1]}")
-            print("사용법: python generate_html_report.py [--no-open|--help]")
+            print(f"[X] 알 수 없는 옵션: {option}")
+            print("사용법: python generate_html_report.py [--no-open] [--profile [cprofile|sample]] [--help]")
             sys.exit(1)
     
-    # HTML 리포트 생성
-    result = generate_html_report(open_browser=open_browser)
+    # HTML 리포트 생성 (프로파일 결과는 리포트 파일 이름 옆에 저장)
+    if profile:
+        from profiling import profiled
+        with profiled(profile, "bitcoin_analysis_report") as profiler:
+            result = generate_html_report(open_browser=open_browser)
+            if result:
+                profiler.output = os.path.splitext(result)[0]
+    else:
+        result = generate_html_report(open_browser=open_browser)
     
     if result:
         print(f"\n리포트가 성공적으로 생성되었습니다: {result}")
@@ -0,0 +1,118 @@
+"""
+지표 계산 결과 디스크 캐시 (내용 주소 기반)
+
+입력 OHLCV 데이터와 지표 계산 조건의 해시를 키로 계산 결과 DataFrame을
+pickle(프로토콜 5)로 저장합니다. 같은 봉 안에서 리포트를 다시 만들면
+지표 계산을 건너뛰고 저장된 결과를 그대로 사용합니다.
+전체 용량이 한도를 넘으면 가장 오래 사용하지 않은 파일부터 삭제합니다. (LRU)
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+# 캐시 위치 (환경 변수로 변경 가능)
+INDICATOR_CACHE_DIR = os.getenv(
+    "INDICATOR_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bitcoin-analysis", "indicators")
+)
+
+# 캐시 최대 용량 (MB)
+INDICATOR_CACHE_MAX_BYTES = int(float(os.getenv("INDICATOR_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+# 캐시 파일 형식 버전 (형식이 바뀌면 올림)
+CACHE_FORMAT_VERSION = 1
+
+
+# 캐시 키 생성 (OHLCV 원본 + 계산 조건)
+def make_cache_key(df, params):
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}".encode())
+
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(np.ascontiguousarray(index.asi8).tobytes())
+    else:
+        digest.update(pd.util.hash_pandas_object(index).to_numpy().tobytes())
+
+    for column in df.columns:
+        digest.update(str(column).encode())
+        digest.update(np.ascontiguousarray(df[column].to_numpy(dtype=np.float64)).tobytes())
+
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(INDICATOR_CACHE_DIR, f"{key}.pkl")
+
+
+# 캐시에서 불러오기 (없거나 손상되었으면 None)
+def load_cached_frame(key):
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            df = pickle.load(f)
+    except Exception:
+        # 손상된 캐시 파일은 삭제
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+    # 최근 사용 시각 갱신 (LRU 기준)
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return df
+
+
+# 캐시에 저장 후 용량 한도 초과분 정리
+def store_cached_frame(key, df):
+    os.makedirs(INDICATOR_CACHE_DIR, exist_ok=True)
+    path = _cache_path(key)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(df, f, protocol=5)
+    os.replace(tmp_path, path)
+
+    evict_cache(keep=path)
+
+
+# 오래 사용하지 않은 캐시부터 삭제하여 용량 한도 유지
+def evict_cache(max_bytes=None, keep=None):
+    max_bytes = INDICATOR_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    entries = []
+    for name in os.listdir(INDICATOR_CACHE_DIR):
+        if not name.endswith(".pkl"):
+            continue
+        path = os.path.join(INDICATOR_CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+    return total
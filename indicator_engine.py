@@ -0,0 +1,480 @@
+"""
+증분(스트리밍) 기술적 지표 엔진
+
+새 캔들이 추가되거나 마지막 캔들(진행 중인 봉)이 갱신될 때
+전체 기록을 다시 계산하지 않고 지표별 상태만 갱신합니다. (캔들당 O(1))
+계산 방식은 calculate_indicators (ta 라이브러리)와 동일하게 맞췄습니다.
+
+사용 예:
+    engine = IncrementalIndicatorEngine.from_frame(df)   # 기존 데이터로 상태 준비
+    latest = engine.update(timestamp, o, h, l, c, v)      # 같은 시각이면 마지막 봉 갱신
+"""
+
+import math
+import operator
+from collections import deque
+
+NAN = float('nan')
+
+
+# 윈도우 최대값/최소값 후보 큐 (단조 큐, 맨 앞이 최대/최소 - 갱신당 분할 상환 O(1))
+class MonotonicQueue:
+    """
+    (순번, 값)을 값이 단조롭게 유지되도록 보관합니다. NaN은 후보에서 제외합니다.
+    마지막 push 한 번을 되돌릴 수 있도록 그때 밀려난 후보를 기록합니다.
+    """
+
+    def __init__(self, window, keep):
+        self.window = window
+        self.keep = keep  # keep(뒤쪽 후보, 새 값)이 거짓이면 뒤쪽 후보 제거
+        self.items = deque()
+        self._undo = None
+
+    def push(self, index, x):
+        appended = not math.isnan(x)
+        dominated = []
+        if appended:
+            while self.items and not self.keep(self.items[-1][1], x):
+                dominated.append(self.items.pop())
+            self.items.append((index, x))
+        expired = None
+        if self.items and self.items[0][0] <= index - self.window:
+            expired = self.items.popleft()
+        self._undo = (appended, dominated, expired)
+
+    # 마지막 push 되돌리기
+    def undo(self):
+        appended, dominated, expired = self._undo
+        if appended:
+            self.items.pop()
+        self.items.extend(reversed(dominated))
+        if expired is not None:
+            self.items.appendleft(expired)
+        self._undo = None
+
+    def first(self):
+        return self.items[0][1] if self.items else NAN
+
+
+# 최근 N개 값 윈도우 (마지막 값 교체 지원)
+class RollingWindow:
+    """
+    이동 합계를 유지하는 고정 길이 윈도우.
+    부동소수점 오차 누적을 막기 위해 window번 갱신마다 합계를 다시 계산합니다.
+    track_max / track_min이면 최대/최소 후보(단조 큐)도 유지합니다. (없으면 max/min은 윈도우 전체 탐색)
+    """
+
+    def __init__(self, window, track_max=False, track_min=False):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        self._evicted = None
+        self._updates = 0
+        self._index = -1
+        self._max = MonotonicQueue(window, operator.gt) if track_max else None
+        self._min = MonotonicQueue(window, operator.lt) if track_min else None
+        self._queues = [queue for queue in (self._max, self._min) if queue is not None]
+
+    def _add(self, x):
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            self.total += x
+            self.total_sq += x * x
+
+    def _remove(self, x):
+        if math.isnan(x):
+            self.nan_count -= 1
+        else:
+            self.total -= x
+            self.total_sq -= x * x
+
+    def push(self, x, replace=False):
+        if replace and self.values:
+            # 마지막 값을 되돌리고, 밀려났던 값을 복원
+            self._remove(self.values.pop())
+            if self._evicted is not None:
+                self.values.appendleft(self._evicted)
+                self._add(self._evicted)
+            for queue in self._queues:
+                queue.undo()
+        else:
+            self._index += 1
+
+        for queue in self._queues:
+            queue.push(self._index, x)
+        self.values.append(x)
+        self._add(x)
+        self._evicted = None
+        if len(self.values) > self.window:
+            self._evicted = self.values.popleft()
+            self._remove(self._evicted)
+
+        self._updates += 1
+        if self._updates >= self.window:
+            self._resync()
+
+    def _resync(self):
+        valid = [v for v in self.values if not math.isnan(v)]
+        self.total = math.fsum(valid)
+        self.total_sq = math.fsum(v * v for v in valid)
+        self._updates = 0
+
+    def full(self):
+        return len(self.values) == self.window and self.nan_count == 0
+
+    def mean(self):
+        return self.total / self.window if self.full() else NAN
+
+    def std(self):
+        """모표준편차 (ddof=0)"""
+        if not self.full():
+            return NAN
+        mean = self.total / self.window
+        return math.sqrt(max(0.0, self.total_sq / self.window - mean * mean))
+
+    def max(self, min_periods=None):
+        if len(self.values) < (self.window if min_periods is None else min_periods):
+            return NAN
+        if self._max is None:
+            return max((v for v in self.values if not math.isnan(v)), default=NAN)
+        return self._max.first()
+
+    def min(self, min_periods=None):
+        if len(self.values) < (self.window if min_periods is None else min_periods):
+            return NAN
+        if self._min is None:
+            return min((v for v in self.values if not math.isnan(v)), default=NAN)
+        return self._min.first()
+
+
+# 지수이동평균 (pandas ewm(adjust=False, min_periods)와 동일)
+class EMAState:
+
+    def __init__(self, span=None, alpha=None, min_periods=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.min_periods = min_periods if min_periods is not None else span
+        self._state = (NAN, 0)  # (값, 관측 수)
+        self._prev = self._state
+
+    def update(self, x, replace=False):
+        if replace:
+            self._state = self._prev
+        else:
+            self._prev = self._state
+
+        value, count = self._state
+        if not math.isnan(x):
+            count += 1
+            value = x if math.isnan(value) else (1 - self.alpha) * value + self.alpha * x
+        self._state = (value, count)
+
+        return value if count >= self.min_periods else NAN
+
+
+# RSI (Wilder 평활, ta.momentum.RSIIndicator와 동일)
+class RSIState:
+
+    def __init__(self, window=14):
+        self.up = EMAState(alpha=1.0 / window, min_periods=window)
+        self.down = EMAState(alpha=1.0 / window, min_periods=window)
+
+    def update(self, close, prev_close, replace=False):
+        diff = close - prev_close
+        up = self.up.update(diff if diff > 0 else 0.0, replace)
+        down = self.down.update(-diff if diff < 0 else 0.0, replace)
+
+        if math.isnan(down):
+            return NAN
+        if down == 0:
+            return 100.0
+        return 100 - (100 / (1 + up / down))
+
+
+# ATR (ta.volatility.AverageTrueRange와 동일: 첫 window-1개는 0, 이후 Wilder 평활)
+class ATRState:
+
+    def __init__(self, window=14):
+        self.window = window
+        self._state = (0, 0.0, 0.0)  # (봉 수, 초기 TR 합계, ATR)
+        self._prev = self._state
+
+    def update(self, true_range, replace=False):
+        if replace:
+            self._state = self._prev
+        else:
+            self._prev = self._state
+
+        count, tr_sum, atr = self._state
+        count += 1
+        if count < self.window:
+            tr_sum += true_range
+            atr = 0.0
+        elif count == self.window:
+            tr_sum += true_range
+            atr = tr_sum / self.window
+        else:
+            atr = (atr * (self.window - 1) + true_range) / float(self.window)
+        self._state = (count, tr_sum, atr)
+
+        return atr
+
+
+# ADX / +DI / -DI (ta.trend.ADXIndicator와 동일한 초기화 및 평활)
+class ADXState:
+
+    def __init__(self, window=14):
+        self.window = window
+        # (봉 수, TR 합, +DM 합, -DM 합, DX 초기 합, ADX)
+        self._state = (0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        self._prev = self._state
+
+    def update(self, high, low, close, prev_high, prev_low, prev_close, replace=False):
+        if replace:
+            self._state = self._prev
+        else:
+            self._prev = self._state
+
+        w = self.window
+        count, trs, dip, din, dx_sum, adx = self._state
+        row = count  # 현재 봉의 위치 (0부터)
+        count += 1
+
+        # 첫 봉은 직전 종가가 없어 계산 불가
+        if row == 0:
+            self._state = (count, trs, dip, din, dx_sum, adx)
+            return 0.0, 0.0, 0.0
+
+        true_range = max(high, prev_close) - min(low, prev_close)
+        diff_up = high - prev_high
+        diff_down = prev_low - low
+        pos = diff_up if (diff_up > diff_down and diff_up > 0) else 0.0
+        neg = diff_down if (diff_down > diff_up and diff_down > 0) else 0.0
+
+        if row <= w:
+            trs += true_range
+            dip += pos
+            din += neg
+        else:
+            trs = trs - trs / float(w) + true_range
+            dip = dip - dip / float(w) + pos
+            din = din - din / float(w) + neg
+
+        adx_pos = adx_neg = 0.0
+        if row >= w:
+            di_pos = 100 * (dip / trs) if trs != 0 else 0.0
+            di_neg = 100 * (din / trs) if trs != 0 else 0.0
+            dx = 100 * abs((di_pos - di_neg) / (di_pos + di_neg)) if di_pos + di_neg != 0 else 0.0
+
+            if row > w:
+                adx_pos, adx_neg = di_pos, di_neg
+
+            if row < 2 * w - 1:
+                dx_sum += dx
+            elif row == 2 * w - 1:
+                dx_sum += dx
+                adx = dx_sum / w
+            else:
+                adx = ((adx * (w - 1)) + dx) / float(w)
+
+        self._state = (count, trs, dip, din, dx_sum, adx)
+        return (adx if row >= 2 * w - 1 else 0.0), adx_pos, adx_neg
+
+
+# OBV (ta.volume.OnBalanceVolumeIndicator와 동일)
+class OBVState:
+
+    def __init__(self):
+        self._state = 0.0
+        self._prev = self._state
+
+    def update(self, close, prev_close, volume, replace=False):
+        if replace:
+            self._state = self._prev
+        else:
+            self._prev = self._state
+
+        self._state += -volume if close < prev_close else volume
+        return self._state
+
+
+# 증분 지표 엔진
+class IncrementalIndicatorEngine:
+    """
+    RSI, MACD, 이동평균(20/50/200), EMA(12/26/50/100), 볼린저밴드, 스토캐스틱,
+    ATR, OBV, ADX, 일목균형표, 피보나치(최근 52봉), 공포/탐욕 지수의
+    최신 값을 캔들 하나당 상수 시간에 갱신합니다.
+    """
+
+    def __init__(self):
+        self.last_timestamp = None
+        self.count = 0
+        self.latest = {}
+        self._last_candle = None
+        self._prev_candle = None
+
+        self.rsi = RSIState(14)
+        self.ema = {window: EMAState(span=window) for window in (12, 26, 50, 100)}
+        self.macd_signal = EMAState(span=9)
+        self.sma = {window: RollingWindow(window) for window in (20, 50, 200)}
+        self.atr = ATRState(14)
+        self.adx = ADXState(14)
+        self.obv = OBVState()
+        self.obv_window = RollingWindow(20)
+        self.stoch_high = RollingWindow(14, track_max=True)
+        self.stoch_low = RollingWindow(14, track_min=True)
+        self.stoch_k_window = RollingWindow(3)
+        self.ichimoku_high = {window: RollingWindow(window, track_max=True) for window in (9, 26, 52)}
+        self.ichimoku_low = {window: RollingWindow(window, track_min=True) for window in (9, 26, 52)}
+        self.volume_window = RollingWindow(21)  # 직전 20봉 + 현재 봉
+
+    # 기존 DataFrame으로 엔진 상태 준비 (최초 1회 O(n))
+    @classmethod
+    def from_frame(cls, df):
+        engine = cls()
+        engine.sync(df)
+        return engine
+
+    # DataFrame의 새 봉만 반영 (마지막 저장 봉과 같은 시각이면 갱신)
+    def sync(self, df):
+        if self.last_timestamp is not None:
+            df = df[df.index >= self.last_timestamp]
+        for row in df.itertuples():
+            self.update(row.Index, row.open, row.high, row.low, row.close, row.volume)
+        return self.latest
+
+    # 시각에 따라 새 봉 추가 또는 마지막 봉 갱신
+    def update(self, timestamp, open_, high, low, close, volume):
+        if self.last_timestamp is not None and timestamp == self.last_timestamp:
+            return self.revise(open_, high, low, close, volume)
+        return self.append(timestamp, open_, high, low, close, volume)
+
+    # 새 봉 추가
+    def append(self, timestamp, open_, high, low, close, volume):
+        self._prev_candle = self._last_candle
+        self._last_candle = (open_, high, low, close, volume)
+        self.last_timestamp = timestamp
+        self.count += 1
+        return self._compute(replace=False)
+
+    # 마지막 봉 갱신 (진행 중인 봉의 가격 변동 반영)
+    def revise(self, open_, high, low, close, volume):
+        if self._last_candle is None:
+            raise ValueError("갱신할 봉이 없습니다. 먼저 append를 호출하세요.")
+        self._last_candle = (open_, high, low, close, volume)
+        return self._compute(replace=True)
+
+    def _compute(self, replace):
+        _, high, low, close, volume = self._last_candle
+        if self._prev_candle is not None:
+            _, prev_high, prev_low, prev_close, _ = self._prev_candle
+        else:
+            prev_high = prev_low = prev_close = NAN
+
+        values = {}
+
+        # 1. RSI
+        values['rsi'] = self.rsi.update(close, prev_close, replace)
+
+        # 2. EMA 및 MACD
+        for window, state in self.ema.items():
+            values[f'ema{window}'] = state.update(close, replace)
+        macd = values['ema12'] - values['ema26']
+        macd_signal = self.macd_signal.update(macd, replace)
+        values['macd'] = macd
+        values['macd_signal'] = macd_signal
+        values['macd_histogram'] = macd - macd_signal
+
+        # 3. 이동평균선
+        for window, state in self.sma.items():
+            state.push(close, replace)
+            values[f'ma{window}'] = state.mean()
+
+        # 4. 볼린저 밴드 (20일 이동평균/표준편차 공유)
+        bb_middle = values['ma20']
+        bb_std = self.sma[20].std()
+        values['bb_upper'] = bb_middle + 2 * bb_std
+        values['bb_middle'] = bb_middle
+        values['bb_lower'] = bb_middle - 2 * bb_std
+        values['bb_width'] = (values['bb_upper'] - values['bb_lower']) / bb_middle if bb_middle else NAN
+
+        # 5. 스토캐스틱
+        self.stoch_high.push(high, replace)
+        self.stoch_low.push(low, replace)
+        smax, smin = self.stoch_high.max(), self.stoch_low.min()
+        stoch_k = 100 * (close - smin) / (smax - smin) if smax != smin else NAN
+        self.stoch_k_window.push(stoch_k, replace)
+        values['stoch_k'] = stoch_k
+        values['stoch_d'] = self.stoch_k_window.mean()
+
+        # 6. ATR
+        true_range = high - low if math.isnan(prev_close) else max(high - low, abs(high - prev_close), abs(low - prev_close))
+        values['atr'] = self.atr.update(true_range, replace)
+
+        # 7. OBV
+        values['obv'] = self.obv.update(close, prev_close, volume, replace)
+        self.obv_window.push(values['obv'], replace)
+        values['obv_ma'] = self.obv_window.mean()
+
+        # 8. ADX
+        values['adx'], values['adx_pos'], values['adx_neg'] = self.adx.update(
+            high, low, close, prev_high, prev_low, prev_close, replace
+        )
+
+        # 9. 일목균형표
+        for window in (9, 26, 52):
+            self.ichimoku_high[window].push(high, replace)
+            self.ichimoku_low[window].push(low, replace)
+        conversion = 0.5 * (self.ichimoku_high[9].max() + self.ichimoku_low[9].min())
+        base = 0.5 * (self.ichimoku_high[26].max() + self.ichimoku_low[26].min())
+        values['ichimoku_a'] = 0.5 * (conversion + base)
+        values['ichimoku_b'] = 0.5 * (self.ichimoku_high[52].max(min_periods=1) + self.ichimoku_low[52].min(min_periods=1))
+        values['ichimoku_base'] = base
+        values['ichimoku_conversion'] = conversion
+
+        # 10. 피보나치 되돌림 (최근 52봉 고가/저가)
+        recent_high = self.ichimoku_high[52].max(min_periods=1)
+        recent_low = self.ichimoku_low[52].min(min_periods=1)
+        diff = recent_high - recent_low
+        values['fib_236'] = recent_high - 0.236 * diff
+        values['fib_382'] = recent_high - 0.382 * diff
+        values['fib_500'] = recent_high - 0.500 * diff
+        values['fib_618'] = recent_high - 0.618 * diff
+
+        # 11. 공포/탐욕 지수
+        self.volume_window.push(volume, replace)
+        values['fear_greed'] = self._fear_greed(values, close, volume)
+
+        self.latest = values
+        return values
+
+    # 공포/탐욕 지수 (calculate_fear_greed_index와 같은 계산을 최신 봉에만 적용)
+    def _fear_greed(self, values, close, volume):
+        if self.count <= 20:
+            return 50.0
+
+        rsi = values['rsi']
+        rsi_score = rsi if not math.isnan(rsi) else 50
+
+        bb_upper, bb_lower = values['bb_upper'], values['bb_lower']
+        if not math.isnan(bb_upper) and not math.isnan(bb_lower) and bb_upper != bb_lower:
+            bb_position = ((close - bb_lower) / (bb_upper - bb_lower)) * 100
+        else:
+            bb_position = 50
+
+        prior = list(self.volume_window.values)[:-1]
+        prior = [v for v in prior if not math.isnan(v)]
+        vol_ma = sum(prior) / len(prior) if prior else NAN
+        vol_ratio = (volume / vol_ma * 50) if vol_ma > 0 else 50
+        vol_score = min(100, max(0, vol_ratio))
+
+        ma20, ma50 = values['ma20'], values['ma50']
+        if not math.isnan(ma20) and not math.isnan(ma50) and ma50 != 0:
+            trend_score = min(100, max(0, ((ma20 - ma50) / ma50 * 500) + 50))
+        else:
+            trend_score = 50
+
+        return (rsi_score * 0.3 + bb_position * 0.3 +
+                vol_score * 0.2 + trend_score * 0.2)
@@ -0,0 +1,315 @@
+"""
+NumPy 단일 패스 지표 커널
+
+calculate_indicators의 ta 라이브러리 호출(지표마다 pandas 중간 객체 생성)을 대신해
+연속된 NumPy 배열 위에서 모든 지표 컬럼을 한 번에 계산합니다.
+공통 중간값은 한 번만 계산해 공유합니다.
+  - True Range: ATR과 ADX가 공유
+  - 20일 이동 합계/제곱합: 20일 이동평균과 볼린저밴드가 공유
+  - 52일 최고가/최저가: 일목균형표 선행스팬B와 피보나치가 공유
+
+결과는 ta 경로와 부동소수점 오차 범위 내에서 일치합니다.
+float32 모드에서는 누적 계산만 float64로 하고 결과 배열은 float32로 저장합니다.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# 1차 선형 점화식 y[i] = decay * y[i-1] + gain * x[i] (y[-1] = init)
+def linear_recurrence(x, decay, gain=1.0, init=0.0):
+    """
+    지수평활(EMA, Wilder 평활)을 반복문 없이 계산합니다.
+    배열을 블록으로 나누어 블록 내부는 누적합으로, 블록 간 연결값만 순차 계산합니다.
+    (블록 길이는 decay^-block이 오버플로우하지 않도록 제한)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return np.empty(0)
+    if decay <= 0:
+        return gain * x
+
+    block = int(min(n, max(1, 30.0 / -np.log(decay)))) if decay < 1 else n
+    n_blocks = -(-n // block)
+    padded = np.zeros(n_blocks * block)
+    padded[:n] = x
+    padded = padded.reshape(n_blocks, block)
+
+    k = np.arange(block)
+    growth = decay ** -k.astype(np.float64)   # decay^-k
+    shrink = decay ** k.astype(np.float64)    # decay^k
+
+    # 연결값이 0일 때의 블록 내부 결과
+    partial = np.cumsum(padded * (gain * growth), axis=1) * shrink
+
+    # 블록 간 연결값 전파 (블록 수만큼만 반복)
+    carry_decay = shrink * decay  # decay^(k+1)
+    carries = np.empty(n_blocks)
+    carry = init
+    last_decay = carry_decay[-1]
+    for b in range(n_blocks):
+        carries[b] = carry
+        carry = last_decay * carry + partial[b, -1]
+
+    result = partial + carries[:, None] * carry_decay
+    return result.reshape(-1)[:n]
+
+
+# 지수이동평균 (pandas ewm(adjust=False, min_periods)와 동일)
+def ewm_mean(x, alpha, min_periods):
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return out
+
+    # 첫 관측값부터 시작 (그 이전 NaN은 건너뜀)
+    start = valid[0]
+    out[start:] = linear_recurrence(x[start:], 1.0 - alpha, alpha, init=x[start])
+    out[start:start + min_periods - 1] = np.nan
+    return out
+
+
+# 이동 합계 (윈도우마다 직접 합산하여 누적합 방식의 오차 누적 방지)
+def rolling_sum(x, window):
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).sum(axis=1)
+    return out
+
+
+# 이동 평균 (pandas rolling(window).mean()과 동일, 윈도우에 NaN이 있으면 NaN)
+def rolling_mean(x, window):
+    return rolling_sum(x, window) / window
+
+
+def _rolling_extreme(x, window, min_periods, ufunc):
+    """
+    van Herk/Gil-Werman 방식의 O(n) 이동 최대/최소.
+    window 길이 블록마다 앞에서부터의 누적값(prefix)과 뒤에서부터의 누적값(suffix)을 구하면
+    [i-window+1, i] 구간 값은 suffix[i-window+1]과 prefix[i]의 최대/최소입니다.
+    ufunc는 NaN을 무시하는 np.fmax/np.fmin이고, min_periods는 pandas처럼 NaN이 아닌 값의 개수로 판단합니다.
+    """
+    x = np.asarray(x)
+    n = len(x)
+    min_periods = window if min_periods is None else min_periods
+    out = np.full(n, np.nan, dtype=np.result_type(x.dtype, np.float32))
+    if n == 0:
+        return out
+
+    n_blocks = -(-n // window)
+    padded = np.full(n_blocks * window, np.nan, dtype=out.dtype)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, window)
+
+    prefix = ufunc.accumulate(blocks, axis=1).reshape(-1)
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1)
+
+    if n >= window:
+        out[window - 1:] = ufunc(suffix[:n - window + 1], prefix[window - 1:n])
+
+    # 윈도우가 다 차기 전 구간은 첫 블록의 누적값
+    head = min(n, window - 1)
+    out[:head] = prefix[:head]
+
+    # 윈도우 안의 NaN이 아닌 값이 min_periods개 미만이면 NaN
+    valid = np.concatenate(([0], np.cumsum(~np.isnan(x))))
+    counts = valid[1:] - valid[np.maximum(np.arange(1, n + 1) - window, 0)]
+    out[counts < max(min_periods, 1)] = np.nan
+
+    return out
+
+
+# 이동 최대값 (pandas rolling(window, min_periods).max()와 동일, NaN 제외)
+def rolling_max(x, window, min_periods=None):
+    return _rolling_extreme(x, window, min_periods, np.fmax)
+
+
+# 이동 최소값 (pandas rolling(window, min_periods).min()과 동일, NaN 제외)
+def rolling_min(x, window, min_periods=None):
+    return _rolling_extreme(x, window, min_periods, np.fmin)
+
+
+# 직전 값 (첫 값은 NaN)
+def shift1(x):
+    out = np.empty(len(x))
+    out[:1] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+
+# 커널이 계산하는 지표 묶음 (calculate_indicators의 INDICATOR_GRAPH와 같은 이름)
+KERNEL_FAMILIES = ('rsi', 'macd', 'sma', 'ema', 'bollinger', 'stoch', 'atr', 'obv', 'adx', 'ichimoku', 'fibonacci')
+
+
+# 전체 지표 계산
+def compute_indicator_arrays(df, dtype=np.float64, families=None):
+    """
+    OHLCV DataFrame에서 calculate_indicators와 같은 컬럼(공포/탐욕 지수 제외)을
+    {컬럼명: 배열} 형태로 반환합니다.
+    families를 지정하면 해당 지표 묶음과 그에 필요한 공통 중간값만 계산합니다.
+    """
+    families = set(KERNEL_FAMILIES if families is None else families)
+    close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+    high = np.ascontiguousarray(df['high'].to_numpy(dtype=np.float64))
+    low = np.ascontiguousarray(df['low'].to_numpy(dtype=np.float64))
+    volume = np.ascontiguousarray(df['volume'].to_numpy(dtype=np.float64))
+    n = len(close)
+    prev_close = shift1(close)
+
+    # 공통 중간값 (처음 필요할 때 한 번만 계산)
+    shared = {}
+
+    def get_shared(name, compute):
+        if name not in shared:
+            shared[name] = compute()
+        return shared[name]
+
+    def ema(window):
+        return get_shared(f'ema{window}', lambda: ewm_mean(close, 2 / (window + 1), window))
+
+    def ma20():
+        return get_shared('ma20', lambda: rolling_sum(close, 20) / 20)
+
+    def high52():
+        return get_shared('high52', lambda: rolling_max(high, 52, min_periods=1))
+
+    def low52():
+        return get_shared('low52', lambda: rolling_min(low, 52, min_periods=1))
+
+    def true_range():
+        # 첫 봉은 고가-저가
+        return get_shared('true_range', lambda: np.fmax(high, prev_close) - np.fmin(low, prev_close))
+
+    out = {}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 1. RSI (14)
+        if 'rsi' in families:
+            diff = close - prev_close
+            ema_up = ewm_mean(np.where(diff > 0, diff, 0.0), 1 / 14, 14)
+            ema_down = ewm_mean(np.where(diff < 0, -diff, 0.0), 1 / 14, 14)
+            out['rsi'] = np.where(ema_down == 0, 100, 100 - (100 / (1 + ema_up / ema_down)))
+
+        # 2. MACD (EMA12/26을 EMA 지표와 공유)
+        if 'macd' in families:
+            macd = ema(12) - ema(26)
+            macd_signal = ewm_mean(macd, 2 / 10, 9)
+            out['macd'] = macd
+            out['macd_signal'] = macd_signal
+            out['macd_histogram'] = macd - macd_signal
+
+        # 3. 이동평균선 (20일 이동평균은 볼린저밴드와 공유)
+        if 'sma' in families:
+            out['ma20'] = ma20()
+            out['ma50'] = rolling_mean(close, 50)
+            out['ma200'] = rolling_mean(close, 200)
+
+        # 4. 지수 이동평균선 (12, 26, 50, 100)
+        if 'ema' in families:
+            for window in (12, 26, 50, 100):
+                out[f'ema{window}'] = ema(window)
+
+        # 5. 볼린저 밴드 (20일 합계/제곱합)
+        if 'bollinger' in families:
+            middle = ma20()
+            std20 = np.sqrt(np.maximum(rolling_sum(close * close, 20) / 20 - middle * middle, 0.0))
+            out['bb_upper'] = middle + 2 * std20
+            out['bb_middle'] = middle
+            out['bb_lower'] = middle - 2 * std20
+            out['bb_width'] = (out['bb_upper'] - out['bb_lower']) / middle
+
+        # 6. 스토캐스틱 (14, 3)
+        if 'stoch' in families:
+            stoch_low = rolling_min(low, 14)
+            stoch_high = rolling_max(high, 14)
+            stoch_k = 100 * (close - stoch_low) / (stoch_high - stoch_low)
+            out['stoch_k'] = stoch_k
+            out['stoch_d'] = rolling_mean(stoch_k, 3)
+
+        # 7. ATR (14) - 첫 13개는 0, 14번째는 단순평균, 이후 Wilder 평활 (True Range는 ADX와 공유)
+        if 'atr' in families:
+            window = 14
+            atr = np.zeros(n)
+            if n >= window:
+                tr = true_range()
+                first = tr[:window].mean()
+                atr[window - 1] = first
+                atr[window:] = linear_recurrence(tr[window:], (window - 1) / window, 1 / window, init=first)
+            out['atr'] = atr
+
+        # 8. OBV 및 OBV 이동평균
+        if 'obv' in families:
+            obv = np.cumsum(np.where(close < prev_close, -volume, volume))
+            out['obv'] = obv
+            out['obv_ma'] = rolling_mean(obv, 20)
+
+        # 9. ADX (14) - ta와 같은 Wilder 합계 초기화
+        if 'adx' in families:
+            out['adx'], out['adx_pos'], out['adx_neg'] = _adx(high, low, true_range(), window=14)
+
+        # 10. 일목균형표 (9, 26, 52) - 52일 최고/최저가는 피보나치와 공유
+        if 'ichimoku' in families:
+            conversion = 0.5 * (rolling_max(high, 9) + rolling_min(low, 9))
+            base = 0.5 * (rolling_max(high, 26) + rolling_min(low, 26))
+            out['ichimoku_a'] = 0.5 * (conversion + base)
+            out['ichimoku_b'] = 0.5 * (high52() + low52())
+            out['ichimoku_base'] = base
+            out['ichimoku_conversion'] = conversion
+
+        # 11. 피보나치 되돌림 (봉마다 최근 52봉 고가/저가 기준)
+        if 'fibonacci' in families:
+            recent_high = high52()
+            diff = recent_high - low52()
+            for name, ratio in (('fib_236', 0.236), ('fib_382', 0.382), ('fib_500', 0.500), ('fib_618', 0.618)):
+                out[name] = recent_high - ratio * diff
+
+    return {name: values.astype(dtype, copy=False) for name, values in out.items()}
+
+
+# ADX / +DI / -DI (ta.trend.ADXIndicator와 같은 인덱스 정렬)
+def _adx(high, low, true_range, window=14):
+    n = len(high)
+    adx = np.zeros(n)
+    adx_pos = np.zeros(n)
+    adx_neg = np.zeros(n)
+    if n <= window:
+        return adx, adx_pos, adx_neg
+
+    diff_up = high - shift1(high)
+    diff_down = shift1(low) - low
+    pos = np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)
+    neg = np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)
+
+    # 봉 window의 값 = 1~window번째 봉 합계, 이후 Wilder 합계 평활
+    decay = 1 - 1 / window
+
+    def wilder_sum(values):
+        smoothed = np.empty(n - window)
+        first = values[1:window + 1].sum()
+        smoothed[0] = first
+        smoothed[1:] = linear_recurrence(values[window + 1:], decay, 1.0, init=first)
+        return smoothed
+
+    trs = wilder_sum(true_range)
+    dip = wilder_sum(pos)
+    din = wilder_sum(neg)
+
+    di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+    di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+    di_sum = di_pos + di_neg
+    dx = np.where(di_sum != 0, 100 * np.abs((di_pos - di_neg) / di_sum), 0.0)
+
+    # +DI/-DI는 window+1번째 봉부터 표시
+    adx_pos[window + 1:] = di_pos[1:]
+    adx_neg[window + 1:] = di_neg[1:]
+
+    # ADX: 2*window-1번째 봉에 DX 단순평균, 이후 Wilder 평활
+    if n >= 2 * window:
+        first = dx[:window].mean()
+        adx[2 * window - 1] = first
+        adx[2 * window:] = linear_recurrence(dx[window:], decay, 1 / window, init=first)
+
+    return adx, adx_pos, adx_neg
@@ -0,0 +1,116 @@
+"""
+몬테카를로 목표가 엔진
+
+최근 일간 로그수익률을 부트스트랩으로 뽑고 현재 ATR 기준 변동성으로 스케일하여
+(경로 수 x 기간) 배열 하나로 미래 가격 경로를 한 번에 생성합니다.
+경로별 최고가/최저가 분포에서 도달 확률별 목표가, 손절가와
+확률 가중 예상 고점을 계산합니다. (기본 20,000개 경로 x 90일, 수십 ms)
+"""
+
+import os
+import numpy as np
+
+# 시뮬레이션 경로 수
+MC_PATHS = int(os.getenv("MC_PATHS", "20000"))
+
+# 시뮬레이션 기간 (일)
+MC_HORIZON_DAYS = int(os.getenv("MC_HORIZON_DAYS", "90"))
+
+# 부트스트랩에 사용할 최근 수익률 개수 (일)
+MC_LOOKBACK_DAYS = int(os.getenv("MC_LOOKBACK_DAYS", "365"))
+
+# 난수 시드 (같은 데이터면 같은 결과가 나오도록 고정)
+MC_SEED = int(os.getenv("MC_SEED", "42"))
+
+# 목표가 도달 확률 (높은 확률 = 가까운 목표가)
+TARGET_PROBABILITIES = (0.75, 0.50, 0.25)
+
+# 손절가 이탈 확률
+STOP_PROBABILITY = 0.10
+
+
+# 과거 일간 로그수익률 (현재 ATR 비율에 맞춰 변동성 스케일)
+def scaled_log_returns(close, atr, lookback=None):
+    """
+    평균(추세)은 유지하고 평균과의 편차만 (현재 ATR% / 기간 평균 ATR%) 배로 늘리거나 줄입니다.
+    (수익률 배열, 변동성 배수) 반환
+    """
+    lookback = MC_LOOKBACK_DAYS if lookback is None else lookback
+    close = np.asarray(close, dtype=float)[-(lookback + 1):]
+    atr = np.asarray(atr, dtype=float)[-(lookback + 1):]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(close))
+        atr_pct = atr / close
+    returns = returns[np.isfinite(returns)]
+    valid_atr = atr_pct[np.isfinite(atr_pct) & (atr_pct > 0)]
+
+    scale = 1.0
+    if len(valid_atr) and np.isfinite(atr_pct[-1]) and atr_pct[-1] > 0:
+        scale = float(atr_pct[-1] / valid_atr.mean())
+
+    drift = returns.mean() if len(returns) else 0.0
+    return drift + (returns - drift) * scale, scale
+
+
+# 가격 경로 생성 (n_paths x horizon, 각 값은 해당 일의 종가)
+def simulate_price_paths(price, returns, n_paths=None, horizon=None, seed=None):
+    n_paths = MC_PATHS if n_paths is None else n_paths
+    horizon = MC_HORIZON_DAYS if horizon is None else horizon
+    rng = np.random.default_rng(MC_SEED if seed is None else seed)
+
+    samples = rng.integers(0, len(returns), size=(n_paths, horizon))
+    log_paths = np.cumsum(returns[samples], axis=1)
+    return price * np.exp(log_paths)
+
+
+# 경로별로 가격이 level에 처음 닿은 날 (닿지 않으면 horizon)
+def first_touch(paths, level, above=True):
+    touched = paths >= level if above else paths <= level
+    return np.where(touched.any(axis=1), touched.argmax(axis=1), paths.shape[1])
+
+
+# 몬테카를로 목표가/손절가 계산
+def monte_carlo_targets(df, n_paths=None, horizon=None, seed=None, lookback=None):
+    """
+    df: 지표가 계산된 OHLCV DataFrame (close, atr 필요)
+
+    반환:
+        targets: [(목표가, 도달 확률, 손절 전 도달 확률), ...] (TARGET_PROBABILITIES 순서)
+        stop_loss: (손절가, 이탈 확률)
+        expected_peak / expected_low: 기간 중 최고가/최저가의 확률 가중 평균
+        final_range: 기간 말 가격의 (5%, 50%, 95%) 분위수
+    """
+    close = df['close'].to_numpy(dtype=float)
+    price = close[-1]
+    returns, scale = scaled_log_returns(close, df['atr'].to_numpy(dtype=float), lookback)
+    if len(returns) == 0:
+        return None
+
+    paths = simulate_price_paths(price, returns, n_paths, horizon, seed)
+    path_high = paths.max(axis=1)
+    path_low = paths.min(axis=1)
+
+    # 손절가: 경로 최저가 분포의 하위 STOP_PROBABILITY 분위수
+    stop_level = float(np.quantile(path_low, STOP_PROBABILITY))
+    stop_day = first_touch(paths, stop_level, above=False)
+
+    # 목표가: 경로 최고가 분포에서 도달 확률이 p가 되는 가격
+    targets = []
+    for probability in TARGET_PROBABILITIES:
+        level = float(np.quantile(path_high, 1 - probability))
+        target_day = first_touch(paths, level)
+        hit = target_day < paths.shape[1]
+        targets.append((level, float(hit.mean()), float((hit & (target_day < stop_day)).mean())))
+
+    return {
+        'price': price,
+        'paths': paths.shape[0],
+        'horizon': paths.shape[1],
+        'volatility_scale': scale,
+        'targets': targets,
+        'stop_loss': (stop_level, float((stop_day < paths.shape[1]).mean())),
+        'expected_peak': float(path_high.mean()),
+        'expected_low': float(path_low.mean()),
+        'final_range': tuple(float(q) for q in np.quantile(paths[:, -1], [0.05, 0.50, 0.95])),
+    }
@@ -0,0 +1,280 @@
+"""
+종합 점수 가중치/판단 구간 walk-forward 최적화
+
+analyze_market_position_history로 봉별 지표 점수 행렬을 한 번만 계산해 공유 메모리에 올리고,
+후보(지표 가중치, 4년 주기 가중치, 고점 감점 계수, 판단 구간) 묶음을 프로세스 풀에 나눠
+backtest.simulate로 평가합니다. 학습 구간에서 가장 좋은 후보를 고른 뒤
+바로 다음 검증 구간에서 현재 기본값(SCORE_WEIGHTS 등)과 비교합니다.
+
+사용법:
+    python optimize_weights.py                          # 최근 6년 실제 데이터 (캔들 저장소에 과거 기록을 채워 사용)
+    python optimize_weights.py --synthetic 5000         # 합성 데이터
+    python optimize_weights.py --candidates 4000 --workers 8 --output weights.json
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+from bitcoin_analysis import (
+    SCORE_WEIGHTS, CYCLE_SCORE_WEIGHT, PEAK_PENALTY_DIVISOR,
+    CATEGORY_THRESHOLDS, PEAK_OVERRIDE_THRESHOLDS,
+    analyze_market_position_history, analyze_bitcoin_cycle, analyze_bitcoin_cycle_history,
+)
+from backtest import (
+    BARS_PER_YEAR, CATEGORY_RANK, DEFAULT_PARAMS, WARMUP_BARS, prepare_market, require_history, simulate,
+)
+from rolling_stats import RollingStatsCache
+
+# 목적 함수: log(1 + 수익률) - 최대 낙폭 x 계수
+DRAWDOWN_PENALTY = 1.0
+
+# 한 작업에서 평가할 후보 수
+BATCH_SIZE = 256
+
+# 공유 메모리에 올리는 가격 배열 (backtest.prepare_market 결과)
+MARKET_COLUMNS = ['open', 'high', 'low', 'close', 'bb_lower', 'ma200', 'predicted_peak']
+
+# 워커 프로세스에서 공유 메모리로 연결한 배열
+_SHARED = {}
+
+
+# 후보 생성 (0번 후보는 현재 기본값)
+def sample_candidates(n_candidates, seed=0, spread=0.5):
+    """
+    가중치와 계수는 기본값에 로그정규 배수를 곱하고,
+    판단 구간은 기본값에 잡음을 더한 뒤 내림차순으로 정렬합니다.
+    """
+    rng = np.random.default_rng(seed)
+    base_weights = np.array(list(SCORE_WEIGHTS.values()))
+    base_thresholds = np.array(list(CATEGORY_THRESHOLDS.values()), dtype=float)
+
+    weights = base_weights * rng.lognormal(0.0, spread, (n_candidates, len(base_weights)))
+    cycle_weight = CYCLE_SCORE_WEIGHT * rng.lognormal(0.0, spread, n_candidates)
+    peak_divisor = PEAK_PENALTY_DIVISOR * rng.lognormal(0.0, spread, n_candidates)
+    thresholds = base_thresholds + rng.normal(0.0, spread * 2, (n_candidates, len(base_thresholds)))
+    thresholds = -np.sort(-thresholds, axis=1)
+
+    weights[0] = base_weights
+    cycle_weight[0] = CYCLE_SCORE_WEIGHT
+    peak_divisor[0] = PEAK_PENALTY_DIVISOR
+    thresholds[0] = base_thresholds
+
+    return {
+        'weights': weights,
+        'cycle_weight': cycle_weight,
+        'peak_divisor': peak_divisor,
+        'thresholds': thresholds,
+    }
+
+
+# 후보 일부 선택
+def take_candidates(candidates, index):
+    return {key: values[index] for key, values in candidates.items()}
+
+
+# 후보별 봉별 카테고리 순위 (n_candidates, n_bars)
+def candidate_ranks(scores, cycle_phase, peak_score, candidates):
+    # analyze_market_position과 같은 합산 순서 (기본값 후보는 같은 카테고리)
+    weights = candidates['weights']
+    total = np.zeros((len(weights), len(scores)))
+    for k in range(scores.shape[1]):
+        total += scores[None, :, k] * weights[:, k, None]
+    total += cycle_phase[None, :] * candidates['cycle_weight'][:, None]
+    total -= peak_score[None, :] / candidates['peak_divisor'][:, None]
+
+    # 내림차순 구간을 몇 개 넘었는지로 순위 결정 (모두 미만이면 STRONG_SELL)
+    thresholds = candidates['thresholds']
+    rank = CATEGORY_RANK["STRONG_SELL"] + (total[:, None, :] >= thresholds[:, :, None]).sum(axis=1)
+
+    # 고점 근접도 강제 판단
+    overrides = [peak_score >= threshold for threshold in PEAK_OVERRIDE_THRESHOLDS.values()]
+    override_ranks = [CATEGORY_RANK[category] for category in PEAK_OVERRIDE_THRESHOLDS]
+    return np.select([mask[None, :] for mask in overrides], override_ranks, rank)
+
+
+# 후보 평가 결과를 목적 함수 값으로 변환
+def objective(result):
+    return np.log1p(result['total_return'].to_numpy()) - DRAWDOWN_PENALTY * result['max_drawdown'].to_numpy()
+
+
+# 후보 묶음을 [start, end) 구간에서 평가
+def evaluate(arrays, candidates, start, end, fee):
+    window = slice(start, end)
+    ranks = candidate_ranks(arrays['scores'][window], arrays['cycle_phase'][window],
+                            arrays['peak_score'][window], candidates)
+    market = {name: arrays[name][window] for name in MARKET_COLUMNS}
+    n_candidates = len(candidates['weights'])
+    params = pd.DataFrame({key: np.full(n_candidates, value) for key, value in DEFAULT_PARAMS.items()})
+    return simulate(market, ranks, params, fee)
+
+
+# 공유 메모리에 배열 올리기
+def share_arrays(arrays):
+    handles = []
+    spec = {}
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)[...] = values
+        handles.append(shm)
+        spec[name] = (shm.name, values.shape)
+    return handles, spec
+
+
+# 워커 초기화: 공유 메모리 배열 연결 (복사 없음)
+def _attach_shared(spec):
+    for name, (shm_name, shape) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _SHARED[name] = (shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf))
+
+
+def _evaluate_batch(candidates, start, end, fee):
+    arrays = {name: values for name, (_, values) in _SHARED.items()}
+    return objective(evaluate(arrays, candidates, start, end, fee))
+
+
+# 후보 전체를 묶음으로 나눠 프로세스 풀에서 평가
+def evaluate_parallel(executor, candidates, start, end, fee):
+    n_candidates = len(candidates['weights'])
+    batches = [np.arange(i, min(i + BATCH_SIZE, n_candidates)) for i in range(0, n_candidates, BATCH_SIZE)]
+    futures = [executor.submit(_evaluate_batch, take_candidates(candidates, batch), start, end, fee)
+               for batch in batches]
+    return np.concatenate([future.result() for future in futures])
+
+
+# 후보 하나를 bitcoin_analysis 상수 형식으로 변환
+def candidate_to_config(candidates, index):
+    return {
+        'SCORE_WEIGHTS': {name: round(float(w), 4) for name, w in zip(SCORE_WEIGHTS, candidates['weights'][index])},
+        'CYCLE_SCORE_WEIGHT': round(float(candidates['cycle_weight'][index]), 4),
+        'PEAK_PENALTY_DIVISOR': round(float(candidates['peak_divisor'][index]), 4),
+        'CATEGORY_THRESHOLDS': {name: round(float(t), 2) for name, t in zip(CATEGORY_THRESHOLDS, candidates['thresholds'][index])},
+    }
+
+
+# walk-forward 최적화
+def walk_forward(df, n_candidates=2000, train_bars=730, test_bars=180, workers=None, fee=0.001, seed=0,
+                 cycle="bar"):
+    """
+    [학습 train_bars봉 -> 검증 test_bars봉] 구간을 test_bars씩 밀며 반복하고,
+    마지막 train_bars봉으로 다시 학습한 후보를 추천값으로 반환합니다.
+    cycle: 4년 주기 점수 기준 ("bar": 봉 날짜별, "now": 현재 시점)
+
+    준비 구간(WARMUP_BARS)을 빼고 학습+검증 구간 하나도 만들 수 없으면 SystemExit으로 중단합니다.
+    (검증되지 않은 추천값을 내지 않음)
+    """
+    require_history(df, train_bars + test_bars, label="walk-forward")
+    stats = RollingStatsCache(df)
+    history = analyze_market_position_history(df, stats, cycle)
+    n_bars = len(df)
+
+    arrays = prepare_market(df, stats)
+    arrays['scores'] = history[[f'{name}_score' for name in SCORE_WEIGHTS]].to_numpy(dtype=float)
+    if cycle == "bar":
+        arrays['cycle_phase'] = np.nan_to_num(analyze_bitcoin_cycle_history(df.index)['phase_score'].to_numpy())
+    else:
+        cycle_info = analyze_bitcoin_cycle()
+        arrays['cycle_phase'] = np.full(n_bars, cycle_info['phase_score'] if cycle_info else 0.0)
+    arrays['peak_score'] = history['peak_score'].to_numpy(dtype=float)
+
+    candidates = sample_candidates(n_candidates, seed=seed)
+    handles, spec = share_arrays(arrays)
+    windows = []
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared, initargs=(spec,)) as executor:
+            for train_start in range(WARMUP_BARS, n_bars - train_bars - test_bars + 1, test_bars):
+                train_end = train_start + train_bars
+                test_end = train_end + test_bars
+
+                train_scores = evaluate_parallel(executor, candidates, train_start, train_end, fee)
+                best = int(np.nanargmax(train_scores))
+
+                # 검증 구간: 기본값(0번) vs 학습 최적 후보
+                test = evaluate(arrays, take_candidates(candidates, [0, best]), train_end, test_end, fee)
+                windows.append({
+                    'train': [str(df.index[train_start]), str(df.index[train_end - 1])],
+                    'test': [str(df.index[train_end]), str(df.index[test_end - 1])],
+                    'train_objective': {'default': float(train_scores[0]), 'best': float(train_scores[best])},
+                    'test_return': {'default': float(test['total_return'].iloc[0]), 'best': float(test['total_return'].iloc[1])},
+                    'test_drawdown': {'default': float(test['max_drawdown'].iloc[0]), 'best': float(test['max_drawdown'].iloc[1])},
+                    'best': candidate_to_config(candidates, best),
+                })
+                print(f"[walk-forward] 검증 {windows[-1]['test'][0][:10]} ~ {windows[-1]['test'][1][:10]} | "
+                      f"기본값 {windows[-1]['test_return']['default'] * 100:+7.1f}% | "
+                      f"최적 {windows[-1]['test_return']['best'] * 100:+7.1f}%")
+
+            # 최근 구간으로 다시 학습한 추천값
+            final_start = max(WARMUP_BARS, n_bars - train_bars)
+            final_scores = evaluate_parallel(executor, candidates, final_start, n_bars, fee)
+            recommended = int(np.nanargmax(final_scores))
+    finally:
+        for shm in handles:
+            shm.close()
+            shm.unlink()
+
+    out_of_sample = {
+        name: float(np.prod([1 + w['test_return'][name] for w in windows]) - 1)
+        for name in ('default', 'best')
+    }
+
+    return {
+        'candidates': n_candidates,
+        'train_bars': train_bars,
+        'test_bars': test_bars,
+        'windows': windows,
+        'out_of_sample_return': out_of_sample,
+        'recommended': candidate_to_config(candidates, recommended),
+        'recommended_objective': {'default': float(final_scores[0]), 'best': float(final_scores[recommended])},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="종합 점수 가중치 walk-forward 최적화")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="실제 데이터 대신 사용할 합성 데이터 봉 개수")
+    parser.add_argument("--years", type=float, default=6, help="사용할 실제 데이터 기간 (년, 준비 구간 제외)")
+    parser.add_argument("--candidates", type=int, default=2000, help="후보 수")
+    parser.add_argument("--train", type=int, default=730, help="학습 구간 봉 수")
+    parser.add_argument("--test", type=int, default=180, help="검증 구간 봉 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="프로세스 수")
+    parser.add_argument("--fee", type=float, default=0.001, help="매매 1회당 수수료율")
+    parser.add_argument("--seed", type=int, default=0, help="후보 생성 시드")
+    parser.add_argument("--cycle", choices=["bar", "now"], default="bar",
+                        help="4년 주기 점수 기준 (bar: 봉 날짜별, now: 현재 시점)")
+    parser.add_argument("--output", default="optimized_weights.json", help="결과 JSON 파일")
+    args = parser.parse_args()
+
+    from bitcoin_analysis import calculate_indicators, get_bitcoin_history
+
+    if args.synthetic:
+        from benchmark import make_synthetic_ohlcv
+        raw = make_synthetic_ohlcv(args.synthetic)
+    else:
+        # 학습+검증 구간 하나 이상은 항상 포함
+        bars = max(math.ceil(args.years * BARS_PER_YEAR), args.train + args.test)
+        raw = get_bitcoin_history(WARMUP_BARS + bars)
+        if raw is None:
+            raise SystemExit(1)
+
+    df = calculate_indicators(raw)
+
+    start = time.perf_counter()
+    result = walk_forward(df, n_candidates=args.candidates, train_bars=args.train, test_bars=args.test,
+                          workers=args.workers, fee=args.fee, seed=args.seed, cycle=args.cycle)
+    elapsed = time.perf_counter() - start
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    oos = result['out_of_sample_return']
+    print(f"{len(df):,}개 봉, 후보 {args.candidates:,}개, 검증 구간 {len(result['windows'])}개: {elapsed:.1f}초")
+    print(f"검증 구간 누적 수익률 - 기본값 {oos['default'] * 100:+.1f}% | 최적 {oos['best'] * 100:+.1f}%")
+    print(f"추천값 저장: {args.output}")
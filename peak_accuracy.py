@@ -0,0 +1,162 @@
+"""
+예상 고점 정확도 추적
+
+predict_peak_components_history로 모든 과거 봉의 예상 고점(항목별 + 가중 평균)을 계산하고
+이후 horizon일 동안 실제 최고가와 비교해 항목별 오차 분포와 도달률을 집계합니다.
+항목별 가중치(PEAK_BLEND_WEIGHTS)를 실제 최고가에 맞춰 다시 추정할 수도 있습니다.
+
+사용법:
+    python peak_accuracy.py                         # 실제 데이터
+    python peak_accuracy.py --synthetic 3000        # 합성 데이터
+    python peak_accuracy.py --horizon 60 --output peak_accuracy.json
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+
+from bitcoin_analysis import PEAK_BLEND_WEIGHTS, predict_peak_components_history
+from indicator_kernel import rolling_max
+
+# 평가 대상 (항목별 예상 고점 + 최종 예상 고점)
+PEAK_COLUMNS = list(PEAK_BLEND_WEIGHTS) + ['predicted_peak']
+
+# 평가 기간 기본값 (일)
+DEFAULT_HORIZON = 90
+
+
+# 이후 horizon봉 동안의 실제 최고가 (i+1 ~ i+horizon, 기간이 부족하면 NaN)
+def realized_peak(df, horizon=DEFAULT_HORIZON):
+    high = df['high'].to_numpy(dtype=float)
+    future_max = np.full(len(high), np.nan)
+    if len(high) > horizon:
+        future_max[:-horizon] = rolling_max(high, horizon)[horizon:]
+    return future_max
+
+
+# 봉별 예상 고점과 실제 최고가
+def evaluate_peak_predictions(df, horizon=DEFAULT_HORIZON, stats=None):
+    """
+    predict_peak_components_history 결과에 price, realized_peak 컬럼을 더한 DataFrame 반환
+    (실제 최고가를 알 수 없는 마지막 horizon봉과 지표가 채워지지 않은 봉은 제외)
+    """
+    evaluation = predict_peak_components_history(df, stats)
+    evaluation['price'] = df['close'].to_numpy(dtype=float)
+    evaluation['realized_peak'] = realized_peak(df, horizon)
+    return evaluation.dropna(subset=PEAK_COLUMNS + ['realized_peak'])
+
+
+# 항목별 오차 분포 (오차 = 예상 / 실제 - 1, %)
+def error_summary(evaluation, columns=None):
+    columns = PEAK_COLUMNS if columns is None else columns
+    realized = evaluation['realized_peak'].to_numpy()
+    rows = {}
+    for column in columns:
+        predicted = evaluation[column].to_numpy()
+        error = (predicted / realized - 1) * 100
+        rows[column] = {
+            'count': len(error),
+            'mean': error.mean() if len(error) else np.nan,
+            'median': np.median(error) if len(error) else np.nan,
+            'std': error.std() if len(error) else np.nan,
+            'p10': np.percentile(error, 10) if len(error) else np.nan,
+            'p90': np.percentile(error, 90) if len(error) else np.nan,
+            'mae': np.abs(error).mean() if len(error) else np.nan,
+            # 예상 고점에 실제로 도달한 비율
+            'hit_rate': (realized >= predicted).mean() if len(error) else np.nan,
+        }
+    return pd.DataFrame(rows).T
+
+
+# confidence 라벨별 최종 예상 고점 오차
+def confidence_summary(evaluation):
+    return pd.concat({
+        label: error_summary(group, ['predicted_peak']).iloc[0]
+        for label, group in evaluation.groupby('confidence')
+    }, axis=1).T
+
+
+# 항목별 가중치 재추정 (음수 가중치 없는 최소제곱)
+def refit_blend_weights(evaluation):
+    """
+    실제 최고가 / (현재가 x RSI 조정 배수)를 항목별 예상 고점 / 현재가의 선형 결합으로 맞춥니다.
+    음수 가중치가 나오면 가장 작은 항목을 빼고 다시 풉니다.
+    (가중치, 기존/새 가중치의 최종 예상 고점 평균 절대 오차 %) 반환
+    """
+    names = list(PEAK_BLEND_WEIGHTS)
+    price = evaluation['price'].to_numpy()
+    multiplier = evaluation['rsi_multiplier'].to_numpy()
+    realized = evaluation['realized_peak'].to_numpy()
+    X = evaluation[names].to_numpy() / price[:, None]
+    y = realized / (price * multiplier)
+
+    active = list(range(len(names)))
+    weights = np.zeros(len(names))
+    while active:
+        solution, *_ = np.linalg.lstsq(X[:, active], y, rcond=None)
+        if (solution >= 0).all():
+            weights[active] = solution
+            break
+        active.pop(int(np.argmin(solution)))
+
+    # predict_peak_price와 같은 현실성 체크 후 오차 비교
+    def blended_error(blend):
+        predicted = (evaluation[names].to_numpy() @ blend) * multiplier
+        predicted = np.clip(predicted, price * 1.05, price * 1.80)
+        return float(np.abs(predicted / realized - 1).mean() * 100) if len(realized) else np.nan
+
+    current = np.array(list(PEAK_BLEND_WEIGHTS.values()))
+    return {
+        'weights': {name: round(float(w), 4) for name, w in zip(names, weights)},
+        'mae_current': blended_error(current),
+        'mae_refit': blended_error(weights),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="예상 고점 정확도 평가")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="실제 데이터 대신 사용할 합성 데이터 봉 개수")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON, help="실제 최고가 비교 기간 (일)")
+    parser.add_argument("--output", default=None, help="결과 JSON 파일")
+    args = parser.parse_args()
+
+    from bitcoin_analysis import calculate_indicators, get_bitcoin_data
+
+    if args.synthetic:
+        from benchmark import make_synthetic_ohlcv
+        raw = make_synthetic_ohlcv(args.synthetic)
+    else:
+        raw = get_bitcoin_data()
+        if raw is None:
+            raise SystemExit(1)
+
+    df = calculate_indicators(raw)
+
+    start = time.perf_counter()
+    evaluation = evaluate_peak_predictions(df, args.horizon)
+    errors = error_summary(evaluation)
+    by_confidence = confidence_summary(evaluation)
+    refit = refit_blend_weights(evaluation)
+    elapsed = time.perf_counter() - start
+
+    pd.set_option('display.float_format', '{:.2f}'.format)
+    print(f"{len(evaluation):,}개 봉 평가 ({args.horizon}일 이후 실제 최고가 기준): {elapsed * 1000:.0f}ms\n")
+    print("항목별 오차 (%, 예상 / 실제 - 1)")
+    print(errors.to_string())
+    print("\nconfidence별 최종 예상 고점 오차 (%)")
+    print(by_confidence.to_string())
+    print(f"\n가중치 재추정: {refit['weights']}")
+    print(f"평균 절대 오차: 현재 {refit['mae_current']:.2f}% -> 재추정 {refit['mae_refit']:.2f}%")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'horizon': args.horizon,
+                'bars': len(evaluation),
+                'errors': errors.to_dict(orient='index'),
+                'by_confidence': by_confidence.to_dict(orient='index'),
+                'refit': refit,
+            }, f, ensure_ascii=False, indent=2, default=float)
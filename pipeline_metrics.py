@@ -0,0 +1,307 @@
+"""
+파이프라인 단계별 실행 지표
+
+데이터 수집 -> 지표 계산(지표 묶음별) -> 시장 위치 분석 -> HTML 렌더링 -> 저장/이메일 전송의
+단계마다 실제 경과 시간(wall), CPU 시간, 최대 메모리(프로세스 최대 RSS, 선택 시 tracemalloc 증가량)를 기록합니다.
+실행이 끝나면 JSON 실행 기록(최신 + 최근 PIPELINE_METRICS_HISTORY개 누적 jsonl)과 Prometheus 텍스트 형식(.prom) 파일을 씁니다.
+(.prom 파일이 있는 디렉토리를 node_exporter의 textfile collector로 지정하면 수집할 수 있습니다)
+
+사용법:
+    with pipeline_run("report"):
+        with measure("fetch"):
+            df = get_bitcoin_data()
+        set_label(bars=len(df))
+
+실행 중이 아니면 measure / set_label은 아무것도 하지 않습니다.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows에는 resource 모듈이 없음 (프로세스 최대 RSS 생략)
+
+# 실행 지표 기록 여부
+PIPELINE_METRICS = os.getenv("PIPELINE_METRICS", "true").lower() == "true"
+
+# 실행 지표 파일 위치 (환경 변수로 변경 가능, 배포 디렉토리와 분리)
+PIPELINE_METRICS_DIR = os.getenv(
+    "PIPELINE_METRICS_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bitcoin-analysis", "metrics")
+)
+
+# 누적 실행 기록(.jsonl)에 남길 최근 실행 개수 (0 이하면 제한 없음)
+PIPELINE_METRICS_HISTORY = int(os.getenv("PIPELINE_METRICS_HISTORY", "1000"))
+
+# 단계별 최대 메모리 증가량 측정 여부 (tracemalloc - ta 지표처럼 파이썬 반복문이 많은 단계는 수 배 느려짐)
+PIPELINE_TRACE_MEMORY = os.getenv("PIPELINE_TRACE_MEMORY", "false").lower() == "true"
+
+# Prometheus 지표 이름 접두사
+METRIC_PREFIX = "bitcoin_analysis"
+
+# 실행 기록 형식 버전 (필드 구조가 바뀌면 올림)
+METRICS_FORMAT_VERSION = 1
+
+# 현재 실행 중인 기록기 (없으면 None)
+_active_run = None
+
+
+# 프로세스 최대 RSS (바이트, 측정할 수 없으면 None)
+def max_rss_bytes():
+    if resource is None:
+        return None
+    # Linux는 KB 단위
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# 실행 하나의 단계별 지표 기록기
+class PipelineMetrics:
+    def __init__(self, name, trace_memory=None):
+        self.name = name
+        self.trace_memory = PIPELINE_TRACE_MEMORY if trace_memory is None else trace_memory
+        self.labels = {}
+        self.stages = []
+        self.status = "ok"
+        self.thread_id = threading.get_ident()
+        self._stack = []
+        self._started_tracing = False
+
+    def start(self):
+        self.started_at = datetime.now(timezone.utc)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._enter(None)
+        return self
+
+    def finish(self):
+        self.wall_seconds, self.cpu_seconds, self.peak_memory_bytes = self._exit()
+        self.finished_at = datetime.now(timezone.utc)
+        self.max_rss_bytes = max_rss_bytes()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    # 구간 시작 (경과 시간, CPU 시간, 현재 메모리 기록)
+    def _enter(self, name):
+        current = 0
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # 바깥 구간에 지금까지의 최대값을 넘긴 뒤 이 구간의 최대값 측정 시작
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+        self._stack.append({'name': name, 'wall': time.perf_counter(), 'cpu': time.process_time(),
+                            'memory': current, 'peak': current})
+
+    # 구간 종료 -> (경과 시간, CPU 시간, 시작 대비 최대 메모리 증가량 - tracemalloc을 쓰지 않으면 None)
+    def _exit(self):
+        frame = self._stack.pop()
+        wall = time.perf_counter() - frame['wall']
+        cpu = time.process_time() - frame['cpu']
+
+        peak_memory = None
+        if self.trace_memory:
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            peak_memory = peak - frame['memory']
+        return wall, cpu, peak_memory
+
+    @contextmanager
+    def stage(self, name):
+        # 중첩 단계는 "indicators/rsi"처럼 바깥 단계 이름을 붙임 (시작 순서대로 기록)
+        path = "/".join([frame['name'] for frame in self._stack[1:]] + [name])
+        record = {'stage': path, 'depth': len(self._stack) - 1}
+        self.stages.append(record)
+        self._enter(name)
+        try:
+            yield record
+        finally:
+            record['wall_seconds'], record['cpu_seconds'], record['peak_memory_bytes'] = self._exit()
+            record['max_rss_bytes'] = max_rss_bytes()
+
+    def to_dict(self):
+        return {
+            'version': METRICS_FORMAT_VERSION,
+            'run': self.name,
+            'status': self.status,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': self.finished_at.isoformat(),
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'peak_memory_bytes': self.peak_memory_bytes,
+            'max_rss_bytes': self.max_rss_bytes,
+            'labels': self.labels,
+            'stages': self.stages,
+        }
+
+    # Prometheus 텍스트 형식 (gauge)
+    def to_prometheus(self):
+        run = self.to_dict()
+        run_labels = {'run': self.name}
+        lines = []
+
+        def metric(name, help_text, samples):
+            samples = [(labels, value) for labels, value in samples if value is not None]
+            if not samples:
+                return
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                lines.append(f"{METRIC_PREFIX}_{name}{format_labels(labels)} {float(value)!r}")
+
+        metric("run_wall_seconds", "Pipeline run wall time", [(run_labels, run['wall_seconds'])])
+        metric("run_cpu_seconds", "Pipeline run process CPU time", [(run_labels, run['cpu_seconds'])])
+        metric("run_peak_memory_bytes", "Pipeline run peak traced memory above start",
+               [(run_labels, run['peak_memory_bytes'])])
+        metric("run_max_rss_bytes", "Process maximum resident set size", [(run_labels, run['max_rss_bytes'])])
+        metric("run_success", "1 if the last run finished without error",
+               [(run_labels, 0 if run['status'].startswith("error") else 1)])
+        metric("run_finished_timestamp_seconds", "Unix time the last run finished",
+               [(run_labels, self.finished_at.timestamp())])
+        metric("run_bars", "Number of OHLCV bars analyzed", [(run_labels, run['labels'].get('bars'))])
+
+        # 같은 단계가 여러 번 실행되었으면 시간은 합계, 메모리는 최대값 (라벨 중복 방지)
+        stages = {}
+        for stage in run['stages']:
+            total = stages.setdefault(stage['stage'], {'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                                                       'peak_memory_bytes': None, 'max_rss_bytes': None})
+            total['wall_seconds'] += stage.get('wall_seconds') or 0.0
+            total['cpu_seconds'] += stage.get('cpu_seconds') or 0.0
+            for field in ('peak_memory_bytes', 'max_rss_bytes'):
+                if stage.get(field) is not None:
+                    total[field] = max(total[field] or 0, stage[field])
+
+        def stage_samples(field):
+            return [({**run_labels, 'stage': name}, total[field]) for name, total in stages.items()]
+
+        metric("stage_wall_seconds", "Pipeline stage wall time", stage_samples('wall_seconds'))
+        metric("stage_cpu_seconds", "Pipeline stage process CPU time", stage_samples('cpu_seconds'))
+        metric("stage_peak_memory_bytes", "Pipeline stage peak traced memory above stage start",
+               stage_samples('peak_memory_bytes'))
+        metric("stage_max_rss_bytes", "Process maximum resident set size at stage end",
+               stage_samples('max_rss_bytes'))
+        return "\n".join(lines) + "\n"
+
+    # 최신 실행 기록(.json), 누적 기록(.jsonl), Prometheus(.prom) 저장, 저장한 경로 목록 반환
+    def write(self, directory=None):
+        directory = PIPELINE_METRICS_DIR if directory is None else directory
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.name)
+        record = json.dumps(self.to_dict(), ensure_ascii=False)
+
+        atomic_write(f"{base}.json", record)
+        append_history(f"{base}.jsonl", record)
+        atomic_write(f"{base}.prom", self.to_prometheus())
+        return [f"{base}.json", f"{base}.jsonl", f"{base}.prom"]
+
+    # 단계별 소요 시간 요약 (콘솔 출력용)
+    def summary(self):
+        lines = [f"[지표] {self.name}: 전체 {self.wall_seconds * 1000:.1f}ms (CPU {self.cpu_seconds * 1000:.1f}ms)"]
+        for stage in self.stages:
+            memory, rss = stage.get('peak_memory_bytes'), stage.get('max_rss_bytes')
+            memory_text = "" if memory is None else f", 메모리 +{memory / 1e6:.1f}MB"
+            memory_text += "" if rss is None else f", 최대 RSS {rss / 1e6:.0f}MB"
+            lines.append(f"{'  ' * (stage['depth'] + 1)}{stage['stage']}: {stage['wall_seconds'] * 1000:.1f}ms"
+                         f" (CPU {stage['cpu_seconds'] * 1000:.1f}ms{memory_text})")
+        return "\n".join(lines)
+
+
+# Prometheus 라벨 값 이스케이프 (역슬래시, 따옴표, 줄바꿈)
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Prometheus 라벨 표기 ({key="value",...})
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+# 임시 파일에 쓴 뒤 교체 (textfile collector가 쓰는 중인 파일을 읽지 않도록)
+def atomic_write(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# 누적 기록에 한 줄 추가 (최근 limit줄만 남기고 임시 파일로 교체)
+def append_history(path, line, limit=None):
+    limit = PIPELINE_METRICS_HISTORY if limit is None else limit
+    if limit <= 0:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+        return
+
+    lines = []
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            lines = [existing for existing in f.read().splitlines() if existing]
+    lines = lines[-(limit - 1):] if limit > 1 else []
+    lines.append(line)
+    atomic_write(path, "\n".join(lines) + "\n")
+
+
+# 현재 실행 중인 기록기 (다른 스레드나 실행 밖이면 None)
+def current_run():
+    run = _active_run
+    if run is None or run.thread_id != threading.get_ident():
+        return None
+    return run
+
+
+# 단계 측정 (실행 중이 아니면 아무것도 하지 않음)
+def measure(name):
+    run = current_run()
+    if run is None:
+        return nullcontext()
+    return run.stage(name)
+
+
+# 실행 기록에 라벨 추가 (봉 개수, 거래소, 결과 상태 등)
+def set_label(**labels):
+    run = current_run()
+    if run is not None:
+        run.labels.update(labels)
+
+
+# 파이프라인 실행 하나를 측정하고 끝나면 파일로 저장
+@contextmanager
+def pipeline_run(name, directory=None):
+    """
+    이미 실행 중이면(상주 서비스 안에서 리포트 생성 등) 새 기록을 만들지 않고 단계 하나로 측정합니다.
+    함수 데코레이터로도 사용할 수 있습니다.
+    """
+    global _active_run
+    if not PIPELINE_METRICS:
+        yield None
+        return
+    if _active_run is not None:
+        with measure(name) as record:
+            yield record
+        return
+
+    run = PipelineMetrics(name).start()
+    _active_run = run
+    try:
+        yield run
+    except BaseException as e:
+        run.status = f"error: {type(e).__name__}"
+        raise
+    finally:
+        _active_run = None
+        run.finish()
+        try:
+            run.write(directory)
+            print(run.summary())
+        except OSError as e:
+            print(f"[지표] 실행 기록 저장 실패: {str(e)[:100]}")
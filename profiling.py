@@ -0,0 +1,209 @@
+"""
+분석 진입점 프로파일링
+
+generate_for_github.py, generate_html_report.py, bitcoin_analysis.py의 --profile 옵션에서 사용합니다.
+옵션을 주지 않으면 이 모듈은 import되지 않으므로 평소 실행에는 아무 영향이 없습니다.
+
+- cprofile (기본): 모든 함수 호출 기록. <이름>.pstats, 누적/자체 시간 순 <이름>.profile.txt,
+  호출 관계로 추정한 <이름>.collapsed (flamegraph) 저장
+- sample: 메인 스레드의 호출 스택을 일정 간격으로 수집 (호출이 많은 코드도 오버헤드가 작음).
+  자체/누적 샘플 순 <이름>.profile.txt, 실제 스택 기준 <이름>.collapsed 저장
+
+.collapsed 파일은 "함수;함수;함수 값" 형식(Brendan Gregg의 stackcollapse 형식)이라
+flamegraph.pl, speedscope(https://www.speedscope.app), inferno 등에서 바로 열 수 있습니다.
+
+사용법:
+    python generate_for_github.py --profile            # cProfile
+    python generate_html_report.py --profile sample    # 샘플링
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# 프로파일링 방식
+PROFILE_MODES = ('cprofile', 'sample')
+
+# 샘플링 간격 (초)
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.001"))
+
+# 요약 파일에 출력할 함수 개수
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "40"))
+
+# cProfile flamegraph에서 생략할 경로 비율 (전체 시간 대비, 작은 경로가 너무 많아지지 않도록)
+COLLAPSE_MIN_FRACTION = 0.0005
+
+
+# flamegraph 프레임 이름 (stackcollapse 형식에서 ';'는 구분자)
+def frame_label(filename, line, name):
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":")
+
+
+# 스택별 값 -> stackcollapse 형식 텍스트 (값은 정수)
+def format_collapsed(stacks):
+    lines = [f"{';'.join(stack)} {value}" for stack, value in sorted(stacks.items()) if value > 0]
+    return "\n".join(lines) + "\n"
+
+
+# cProfile 호출 관계 -> 스택별 자체 시간 (마이크로초)
+def collapse_pstats(stats):
+    """
+    cProfile은 호출자-피호출자 쌍의 시간만 기록하므로, 함수의 시간을 호출 경로별
+    누적 시간 비율로 나누어 스택을 추정합니다. (재귀 호출은 한 번만 펼침)
+    """
+    callees = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    total = sum(stats.stats[func][3] for func in roots) or 1.0
+    min_time = total * COLLAPSE_MIN_FRACTION
+    stacks = Counter()
+
+    def walk(func, stack, path, scale):
+        _, _, self_time, _, _ = stats.stats[func]
+        stack = stack + (frame_label(*func),)
+        own = self_time * scale
+        for callee, edge_time in callees.get(func, ()):
+            callee_total = stats.stats[callee][3]
+            if callee in path or callee_total <= 0:
+                continue
+            if edge_time * scale < min_time:
+                # 생략한 작은 경로의 시간은 호출한 함수에 포함 (전체 합계 유지)
+                own += edge_time * scale
+                continue
+            walk(callee, stack, path | {callee}, scale * edge_time / callee_total)
+        stacks[stack] += int(own * 1e6)
+
+    for root in roots:
+        if stats.stats[root][3] >= min_time:
+            walk(root, (), {root}, 1.0)
+    return stacks
+
+
+# cProfile (결정적 프로파일러)
+class CProfileProfiler:
+    mode = 'cprofile'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    # .pstats, .profile.txt, .collapsed 저장, 저장한 경로 목록 반환
+    def write(self, output):
+        stats = pstats.Stats(self.profile)
+        stats.dump_stats(f"{output}.pstats")
+
+        stream = io.StringIO()
+        report = pstats.Stats(self.profile, stream=stream)
+        report.strip_dirs()
+        stream.write("=== 누적 시간 순 (cumulative) ===\n")
+        report.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP)
+        stream.write("=== 자체 시간 순 (tottime) ===\n")
+        report.sort_stats(pstats.SortKey.TIME).print_stats(PROFILE_TOP)
+        with open(f"{output}.profile.txt", 'w', encoding='utf-8') as f:
+            f.write(stream.getvalue())
+
+        with open(f"{output}.collapsed", 'w', encoding='utf-8') as f:
+            f.write(format_collapsed(collapse_pstats(stats)))
+        return [f"{output}.profile.txt", f"{output}.pstats", f"{output}.collapsed"]
+
+
+# 샘플링 프로파일러 (메인 스레드 호출 스택을 주기적으로 수집)
+class SamplingProfiler:
+    mode = 'sample'
+
+    def __init__(self, interval=None):
+        self.interval = PROFILE_SAMPLE_INTERVAL if interval is None else interval
+        self.samples = Counter()
+        self.target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def start(self):
+        # 메인 스레드가 GIL을 넘겨주는 간격을 샘플링 간격에 맞춤 (기본 5ms)
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        sys.setswitchinterval(self._switch_interval)
+
+    # .profile.txt, .collapsed 저장, 저장한 경로 목록 반환
+    def write(self, output):
+        total = sum(self.samples.values())
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                inclusive[frame] += count
+
+        # 샘플 하나가 대표하는 시간 (실제 간격은 GIL 대기로 설정값보다 길 수 있음)
+        per_sample = self.elapsed / total if total else 0.0
+        lines = [f"샘플 {total:,}개, {self.elapsed:.3f}초 (샘플당 {per_sample * 1000:.2f}ms)", ""]
+        for title, counter in (("자체 시간 순 (해당 함수 실행 중)", own), ("누적 시간 순 (호출한 함수 포함)", inclusive)):
+            lines.append(f"=== {title} ===")
+            lines.append(f"{'샘플':>8} {'비율':>7} {'초':>9}  함수")
+            for frame, count in counter.most_common(PROFILE_TOP):
+                lines.append(f"{count:8d} {count / total:7.1%} {count * per_sample:9.3f}  {frame}")
+            lines.append("")
+        with open(f"{output}.profile.txt", 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines))
+
+        with open(f"{output}.collapsed", 'w', encoding='utf-8') as f:
+            f.write(format_collapsed(self.samples))
+        return [f"{output}.profile.txt", f"{output}.collapsed"]
+
+
+def make_profiler(mode='cprofile'):
+    if mode == 'cprofile':
+        return CProfileProfiler()
+    if mode == 'sample':
+        return SamplingProfiler()
+    raise ValueError(f"지원하지 않는 프로파일링 방식입니다: {mode} ({', '.join(PROFILE_MODES)})")
+
+
+# 블록 실행을 프로파일링하고 끝나면 결과 파일 저장 (예외/sys.exit로 끝나도 저장)
+@contextmanager
+def profiled(mode, output):
+    """
+    output: 결과 파일 경로 (확장자 제외). 블록 안에서 profiler.output을 바꿀 수 있습니다.
+    """
+    profiler = make_profiler(mode)
+    profiler.output = output
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        paths = profiler.write(profiler.output)
+        print(f"[프로파일] {profiler.mode}: {', '.join(paths)}")
@@ -0,0 +1,89 @@
+"""
+리포트 배포 매니페스트
+
+generate_for_github.py가 마지막으로 파일을 생성한 분석 결과의 내용 해시를 저장합니다.
+다음 실행의 해시(생성 시각 제외 분석 결과 + 리포트 생성 코드)가 같으면
+index.html 등을 다시 쓰지 않고 NO_CHANGE_EXIT_CODE로 종료해 배포 단계를 건너뜁니다.
+"""
+
+import hashlib
+import json
+import os
+
+# 매니페스트 위치 (환경 변수로 변경 가능, 배포 디렉토리와 분리 - CI에서는 캐시로 유지)
+REPORT_MANIFEST_PATH = os.getenv(
+    "REPORT_MANIFEST_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "bitcoin-analysis", "report_manifest.json")
+)
+
+# 변경 없음 종료 코드 (워크플로에서 배포 생략 판단에 사용)
+NO_CHANGE_EXIT_CODE = 3
+
+# 리포트 내용에 영향을 주는 소스 파일 (코드가 바뀌면 분석 결과가 같아도 다시 생성)
+REPORT_SOURCE_FILES = ("bitcoin_analysis.py", "analysis_result.py", "generate_for_github.py")
+
+# 매니페스트 형식 버전 (형식이 바뀌면 올림)
+MANIFEST_FORMAT_VERSION = 1
+
+
+# 리포트 생성 코드 지문
+def report_code_fingerprint():
+    digest = hashlib.sha256()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in REPORT_SOURCE_FILES:
+        digest.update(name.encode())
+        try:
+            with open(os.path.join(base_dir, name), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+    return digest.hexdigest()[:16]
+
+
+# 리포트 내용 해시 (분석 결과 + 코드 지문)
+def report_content_hash(result):
+    return hashlib.sha256(f"{result.content_hash()}:{report_code_fingerprint()}".encode()).hexdigest()
+
+
+# 이전 매니페스트 불러오기 (없거나 손상되었거나 형식이 다르면 None)
+def load_manifest(path=None):
+    path = REPORT_MANIFEST_PATH if path is None else path
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+# 매니페스트 저장 (임시 파일에 쓴 뒤 교체)
+def save_manifest(result, content_hash, files, path=None):
+    path = REPORT_MANIFEST_PATH if path is None else path
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    manifest = {
+        'version': MANIFEST_FORMAT_VERSION,
+        'content_hash': content_hash,
+        'candle_time': str(result.candle_time),
+        'generated_at': result.generated_at.isoformat(),
+        'files': list(files),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+# 이전 실행과 같은 내용인지 확인
+def is_unchanged(content_hash, manifest=None):
+    manifest = load_manifest() if manifest is None else manifest
+    return manifest is not None and manifest.get('content_hash') == content_hash
@@ -0,0 +1,124 @@
+"""
+프레임 단위 이동 통계 캐시
+
+calculate_indicators 직후 한 번 만들어 분석 함수들에 넘기면
+(컬럼, 윈도우)별 이동 최대/최소/평균/개수를 처음 요청할 때 한 번만 계산하고
+이후에는 저장된 배열을 그대로 돌려줍니다.
+각 배열의 i번째 값은 i번째 봉까지의 df.tail(window) 통계와 같습니다.
+마지막 봉의 값만 필요하면 last()로 마지막 윈도우만 계산합니다 (전체 배열이 이미 있으면 재사용).
+"""
+
+import numpy as np
+
+from indicator_kernel import rolling_max, rolling_min
+
+
+# 원본에 없는 파생 컬럼 (이름 -> 계산 함수)
+DERIVED_COLUMNS = {
+    # 볼린저밴드 내 위치 (0%: 하단, 100%: 상단)
+    'bb_position': lambda stats: (stats.column('close') - stats.column('bb_lower'))
+                                 / (stats.column('bb_upper') - stats.column('bb_lower')) * 100,
+}
+
+
+class RollingStatsCache:
+    """(컬럼, 윈도우)별 이동 통계를 메모이즈하는 캐시 (window=None이면 전체 기간 누적)"""
+
+    def __init__(self, df):
+        self.df = df
+        self._columns = {}
+        self._stats = {}
+
+    # 주어진 프레임용 캐시 반환 (다른 프레임의 캐시면 새로 생성)
+    @classmethod
+    def for_frame(cls, df, stats=None):
+        if stats is not None and stats.df is df:
+            return stats
+        return cls(df)
+
+    # 컬럼 값 (float 배열)
+    def column(self, name):
+        values = self._columns.get(name)
+        if values is None:
+            if name in DERIVED_COLUMNS:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    values = np.asarray(DERIVED_COLUMNS[name](self), dtype=float)
+            else:
+                values = self.df[name].to_numpy(dtype=float)
+            self._columns[name] = values
+        return values
+
+    def _memoize(self, key, compute):
+        values = self._stats.get(key)
+        if values is None:
+            values = compute()
+            self._stats[key] = values
+        return values
+
+    # 이동 최대값 (NaN 제외)
+    def max(self, column, window=None):
+        def compute():
+            values = self.column(column)
+            if window is None:
+                return np.fmax.accumulate(values) if len(values) else values.copy()
+            return rolling_max(values, window, min_periods=1)
+        return self._memoize(('max', column, window), compute)
+
+    # 이동 최소값 (NaN 제외)
+    def min(self, column, window=None):
+        def compute():
+            values = self.column(column)
+            if window is None:
+                return np.fmin.accumulate(values) if len(values) else values.copy()
+            return rolling_min(values, window, min_periods=1)
+        return self._memoize(('min', column, window), compute)
+
+    # 이동 평균 (NaN 제외, 누적합 차이로 O(n) - tail(window).mean()과 부동소수점 오차 수준 차이)
+    def mean(self, column, window=None):
+        def compute():
+            values = self.column(column)
+            valid = ~np.isnan(values)
+            sums = np.cumsum(np.where(valid, values, 0.0))
+            counts = np.cumsum(valid, dtype=np.int64)
+            if window is not None:
+                sums[window:] -= sums[:-window].copy()
+                counts[window:] -= counts[:-window].copy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return sums / counts
+        return self._memoize(('mean', column, window), compute)
+
+    # 이동 개수 (above가 있으면 above 초과 값의 개수, 없으면 NaN이 아닌 값의 개수)
+    def count(self, column, window=None, above=None):
+        def compute():
+            values = self.column(column)
+            with np.errstate(invalid='ignore'):
+                mask = ~np.isnan(values) if above is None else values > above
+            counts = np.cumsum(mask, dtype=np.int64)
+            if window is not None:
+                counts[window:] -= counts[:-window].copy()
+            return counts
+        return self._memoize(('count', column, window, above), compute)
+
+    # 마지막 봉의 통계 (stat: 'max', 'min', 'mean', 'count' - 전체 배열 없이 마지막 윈도우만 계산)
+    def last(self, stat, column, window=None, above=None):
+        key = ('count', column, window, above) if stat == 'count' else (stat, column, window)
+        values = self._stats.get(key)
+        if values is not None:
+            return values[-1]
+        if stat == 'mean' and window is None:
+            return self.mean(column)[-1]  # 전체 기간 평균은 배열과 같은 합산 순서 유지
+
+        tail = self.column(column)
+        if window is not None:
+            tail = tail[-window:]
+        if stat == 'max':
+            return np.fmax.reduce(tail) if len(tail) else np.nan
+        if stat == 'min':
+            return np.fmin.reduce(tail) if len(tail) else np.nan
+        if stat == 'mean':
+            valid = tail[~np.isnan(tail)]
+            return valid.sum() / len(valid) if len(valid) else np.nan
+        if stat == 'count':
+            with np.errstate(invalid='ignore'):
+                return np.count_nonzero(~np.isnan(tail) if above is None else tail > above)
+        raise ValueError(f"지원하지 않는 통계입니다: {stat}")
@@ -0,0 +1,104 @@
+"""
+신호 상태 저장 및 변화 감지
+
+마지막으로 알림을 보낸 시점의 판단(position_category, 종합 점수, 고점 근접도)을
+JSON 파일에 저장해 두고, 다음 실행 결과와 비교해 의미 있는 변화가 있을 때만 알림을 보냅니다.
+- 포지션 카테고리 변경
+- 종합 점수가 SIGNAL_SCORE_DELTA 이상 변동
+- 고점 근접도가 PEAK_ALERT_LEVELS 구간 경계를 넘음
+변화가 없으면 HTML 생성과 이메일 전송을 건너뜁니다.
+"""
+
+import bisect
+import json
+import os
+
+# 상태 파일 위치 (환경 변수로 변경 가능, 배포 디렉토리와 분리)
+SIGNAL_STATE_PATH = os.getenv(
+    "SIGNAL_STATE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "bitcoin-analysis", "signal_state.json")
+)
+
+# 알림을 보낼 종합 점수 변동폭 (마지막 알림 대비)
+SIGNAL_SCORE_DELTA = float(os.getenv("SIGNAL_SCORE_DELTA", "2.0"))
+
+# 고점 근접도 구간 경계 (analyze_peak_proximity의 과열 단계와 동일)
+PEAK_ALERT_LEVELS = (20, 40, 60, 80)
+
+# 상태 파일 형식 버전 (형식이 바뀌면 올림)
+STATE_FORMAT_VERSION = 1
+
+
+# 분석 결과 -> 저장할 상태
+def state_from_result(result):
+    peak_score = result.peak_info['peak_score'] if result.peak_info else None
+    return {
+        'version': STATE_FORMAT_VERSION,
+        'position_category': result.position_category,
+        'total_score': float(result.total_score),
+        'peak_score': None if peak_score is None else float(peak_score),
+        'candle_time': str(result.candle_time),
+        'notified_at': result.generated_at.isoformat(),
+    }
+
+
+# 마지막 알림 상태 불러오기 (없거나 손상되었거나 형식이 다르면 None)
+def load_state(path=None):
+    path = SIGNAL_STATE_PATH if path is None else path
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(state, dict) or state.get('version') != STATE_FORMAT_VERSION:
+        return None
+    return state
+
+
+# 알림 상태 저장 (임시 파일에 쓴 뒤 교체)
+def save_state(state, path=None):
+    path = SIGNAL_STATE_PATH if path is None else path
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# 고점 근접도 구간 (0: 20점 미만, 4: 80점 이상)
+def peak_level(peak_score):
+    if peak_score is None:
+        return None
+    return bisect.bisect_right(PEAK_ALERT_LEVELS, peak_score)
+
+
+# 이전 상태 대비 변화 목록 (빈 목록이면 알림 불필요)
+def detect_transitions(previous, current, score_delta=None):
+    score_delta = SIGNAL_SCORE_DELTA if score_delta is None else score_delta
+    if previous is None:
+        return ["이전 알림 기록 없음"]
+
+    transitions = []
+
+    if current['position_category'] != previous.get('position_category'):
+        transitions.append(f"포지션 변경: {previous.get('position_category')} -> {current['position_category']}")
+
+    previous_score = previous.get('total_score')
+    if previous_score is None or abs(current['total_score'] - previous_score) >= score_delta:
+        previous_text = "없음" if previous_score is None else f"{previous_score:.1f}"
+        transitions.append(f"종합 점수 변동: {previous_text} -> {current['total_score']:.1f}")
+
+    previous_level = peak_level(previous.get('peak_score'))
+    current_level = peak_level(current['peak_score'])
+    if current_level != previous_level:
+        direction = "상승" if (current_level or 0) > (previous_level or 0) else "하락"
+        transitions.append(f"고점 근접도 구간 {direction}: {previous.get('peak_score')} -> {current['peak_score']}")
+
+    return transitions